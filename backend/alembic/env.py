@@ -1,13 +1,20 @@
+import logging
+import time
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy.exc import OperationalError
 
 from alembic import context
 
 from app.config import settings
 from app.database import Base
 from app.models.task import Task, TaskLog  # noqa: F401
+from app.models.archive import ArchivedTask  # noqa: F401
+from app.models.tombstone import TaskTombstone  # noqa: F401
+from app.models.digest import TaskDigest  # noqa: F401
+from app.online_migrations import is_lock_timeout, set_lock_timeout
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -39,20 +46,42 @@ def run_migrations_offline() -> None:
 
 
 def run_migrations_online() -> None:
-    """Run migrations in 'online' mode."""
+    """
+    Run migrations in 'online' mode.
+
+    Each migration commits on its own, so locks are not held across the whole
+    upgrade, and gives up waiting for a lock after MIGRATION_LOCK_TIMEOUT_SECONDS
+    rather than queueing every writer behind it. A migration that timed out is
+    retried from where the upgrade stopped, with backoff.
+    """
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
 
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+    for attempt in range(settings.migration_lock_retries + 1):
+        try:
+            with connectable.connect() as connection:
+                set_lock_timeout(connection, settings.migration_lock_timeout_seconds)
+                connection.commit()
+                context.configure(
+                    connection=connection,
+                    target_metadata=target_metadata,
+                    transaction_per_migration=True,
+                )
+
+                with context.begin_transaction():
+                    context.run_migrations()
+            return
+        except OperationalError as exc:
+            if not is_lock_timeout(exc) or attempt == settings.migration_lock_retries:
+                raise
+            delay = 2**attempt
+            logging.getLogger("alembic.env").warning(
+                "Migration timed out waiting for a lock, retrying in %s s", delay
+            )
+            time.sleep(delay)
 
 
 if context.is_offline_mode():
@@ -0,0 +1,32 @@
+"""Add initial_impact to tasks and index task_logs by task
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.online_migrations import backfill, create_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("tasks", sa.Column("initial_impact", sa.Float(), nullable=True))
+    # Best available starting point for existing tasks
+    backfill("tasks", "initial_impact = impact", "initial_impact IS NULL")
+    create_index_concurrently("ix_task_logs_task_id", "task_logs", ["task_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_task_logs_task_id", table_name="task_logs")
+    op.drop_column("tasks", "initial_impact")
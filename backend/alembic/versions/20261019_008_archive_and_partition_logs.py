@@ -0,0 +1,152 @@
+"""Add archived_tasks and partition task_logs by month on Postgres
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.online_migrations import create_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+
+def next_month(month: date) -> date:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "archived_tasks",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column(
+            "task_type",
+            postgresql.ENUM("ENDING", "ENDLESS", name="tasktype", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("impact", sa.Float(), nullable=False),
+        sa.Column("initial_impact", sa.Float(), nullable=True),
+        sa.Column("effort", sa.Float(), nullable=False),
+        sa.Column("not_doing_hourly_rate", sa.Float(), nullable=False),
+        sa.Column("doing_hourly_rate", sa.Float(), nullable=True),
+        sa.Column("impact_set_to", sa.Float(), nullable=True),
+        sa.Column("deadline", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_updated", sa.DateTime(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_archived_tasks_user_completed", "archived_tasks", ["user_id", "completed_at", "id"]
+    )
+    create_index_concurrently("ix_tasks_user_completed", "tasks", ["user_id", "completed_at", "id"])
+
+    if op.get_bind().dialect.name == "postgresql":
+        partition_task_logs()
+
+
+def partition_task_logs() -> None:
+    """
+    Rebuild task_logs as a table range-partitioned by month on logged_at.
+
+    The primary key of a partitioned table must include the partition key, so it
+    becomes (id, logged_at); ids still come from the same sequence. Rows outside the
+    created months land in the default partition.
+    """
+    bind = op.get_bind()
+    op.execute("ALTER SEQUENCE task_logs_id_seq OWNED BY NONE")
+    # An existing table cannot be partitioned in place, so task_logs is copied into a new
+    # one and log writes wait until this commits: run it in a quiet period
+    # migration-check: ignore - no online way to partition a table
+    op.execute("ALTER TABLE task_logs RENAME TO task_logs_old")
+    op.execute("ALTER INDEX ix_task_logs_id RENAME TO ix_task_logs_old_id")
+    op.execute("ALTER INDEX ix_task_logs_task_id RENAME TO ix_task_logs_old_task_id")
+    op.execute("ALTER TABLE task_logs_old RENAME CONSTRAINT task_logs_pkey TO task_logs_old_pkey")
+
+    op.execute(
+        """
+        CREATE TABLE task_logs (
+            id INTEGER NOT NULL DEFAULT nextval('task_logs_id_seq'),
+            task_id INTEGER NOT NULL REFERENCES tasks (id),
+            logged_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            duration_minutes INTEGER NOT NULL,
+            PRIMARY KEY (id, logged_at)
+        ) PARTITION BY RANGE (logged_at)
+        """
+    )
+    op.execute("CREATE TABLE task_logs_default PARTITION OF task_logs DEFAULT")
+
+    first = bind.execute(sa.text("SELECT min(logged_at) FROM task_logs_old")).scalar()
+    today = datetime.now(timezone.utc).date()
+    month = (first.date() if first else today).replace(day=1)
+    last = today.replace(day=1)
+    for _ in range(MONTHS_AHEAD):
+        last = next_month(last)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE task_logs_{month:%Y_%m} PARTITION OF task_logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+        )
+        month = next_month(month)
+
+    op.execute(
+        "INSERT INTO task_logs (id, task_id, logged_at, duration_minutes) "
+        "SELECT id, task_id, logged_at, duration_minutes FROM task_logs_old"
+    )
+    op.execute("DROP TABLE task_logs_old")
+    op.execute("ALTER SEQUENCE task_logs_id_seq OWNED BY task_logs.id")
+    op.create_index("ix_task_logs_id", "task_logs", ["id"])
+    op.create_index("ix_task_logs_task_id", "task_logs", ["task_id"])
+
+
+def unpartition_task_logs() -> None:
+    op.execute("ALTER SEQUENCE task_logs_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE task_logs RENAME TO task_logs_partitioned")
+    op.execute("ALTER INDEX ix_task_logs_id RENAME TO ix_task_logs_partitioned_id")
+    op.execute("ALTER INDEX ix_task_logs_task_id RENAME TO ix_task_logs_partitioned_task_id")
+    op.execute(
+        """
+        CREATE TABLE task_logs (
+            id INTEGER NOT NULL DEFAULT nextval('task_logs_id_seq') PRIMARY KEY,
+            task_id INTEGER NOT NULL REFERENCES tasks (id),
+            logged_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            duration_minutes INTEGER NOT NULL
+        )
+        """
+    )
+    op.execute(
+        "INSERT INTO task_logs (id, task_id, logged_at, duration_minutes) "
+        "SELECT id, task_id, logged_at, duration_minutes FROM task_logs_partitioned"
+    )
+    # Dropping the parent drops its partitions
+    op.execute("DROP TABLE task_logs_partitioned")
+    op.execute("ALTER SEQUENCE task_logs_id_seq OWNED BY task_logs.id")
+    op.create_index("ix_task_logs_id", "task_logs", ["id"])
+    op.create_index("ix_task_logs_task_id", "task_logs", ["task_id"])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        unpartition_task_logs()
+    op.drop_index("ix_tasks_user_completed", table_name="tasks")
+    op.drop_index("ix_archived_tasks_user_completed", table_name="archived_tasks")
+    op.drop_table("archived_tasks")
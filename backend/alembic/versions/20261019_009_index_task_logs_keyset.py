@@ -0,0 +1,30 @@
+"""Index task_logs for keyset pagination
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.online_migrations import create_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Covers lookups by task_id too, so the single-column index goes
+    create_index_concurrently("ix_task_logs_task_logged", "task_logs", ["task_id", "logged_at", "id"])
+    op.drop_index("ix_task_logs_task_id", table_name="task_logs")
+
+
+def downgrade() -> None:
+    op.create_index("ix_task_logs_task_id", "task_logs", ["task_id"])
+    op.drop_index("ix_task_logs_task_logged", table_name="task_logs")
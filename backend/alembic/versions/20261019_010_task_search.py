@@ -0,0 +1,49 @@
+"""Full-text search vector on tasks
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.online_migrations import backfill, create_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same expression as app.models.task.SEARCH_VECTOR_SQL at the time of this revision
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # A plain column kept up to date by a trigger: a STORED generated column would
+    # rewrite tasks under an ACCESS EXCLUSIVE lock to fill in existing rows
+    op.execute("ALTER TABLE tasks ADD COLUMN search_vector tsvector")
+    op.execute(
+        "CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$ BEGIN "
+        f"NEW.search_vector := {SEARCH_VECTOR_SQL.format(row='NEW.')}; RETURN NEW; "
+        "END $$ LANGUAGE plpgsql"
+    )
+    op.execute(
+        "CREATE TRIGGER tasks_search_vector BEFORE INSERT OR UPDATE OF title, description "
+        "ON tasks FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()"
+    )
+    backfill("tasks", f"search_vector = {SEARCH_VECTOR_SQL.format(row='')}", "search_vector IS NULL")
+    create_index_concurrently("ix_tasks_search_vector", "tasks", ["search_vector"], using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_search_vector", table_name="tasks")
+    op.execute("DROP TRIGGER tasks_search_vector ON tasks")
+    op.execute("DROP FUNCTION tasks_search_vector_update()")
+    op.drop_column("tasks", "search_vector")
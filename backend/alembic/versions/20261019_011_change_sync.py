@@ -0,0 +1,76 @@
+"""Change sequence numbers and task tombstones for delta sync
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.online_migrations import backfill, create_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANGE_INDEXES = [
+    ("ix_tasks_user_change", "tasks"),
+    ("ix_archived_tasks_user_change", "archived_tasks"),
+    ("ix_task_logs_user_change", "task_logs"),
+]
+
+
+def upgrade() -> None:
+    # Columns with a constant default are added without rewriting the table
+    op.add_column("users", sa.Column("change_seq", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column(
+        "users", sa.Column("sync_floor_seq", sa.Integer(), nullable=False, server_default="0")
+    )
+    for table in ("tasks", "archived_tasks", "task_logs"):
+        op.add_column(
+            table, sa.Column("change_seq", sa.Integer(), nullable=False, server_default="0")
+        )
+    op.add_column("task_logs", sa.Column("user_id", sa.Integer(), nullable=True))
+
+    op.create_table(
+        "task_tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("change_seq", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_task_tombstones_user_change", "task_tombstones", ["user_id", "change_seq", "id"]
+    )
+    op.create_index("ix_task_tombstones_deleted_at", "task_tombstones", ["deleted_at"])
+
+    for name, table in CHANGE_INDEXES:
+        create_index_concurrently(name, table, ["user_id", "change_seq", "id"])
+
+    # Existing logs keep change_seq 0, so only a full sync returns them, by user_id
+    backfill(
+        "task_logs",
+        "user_id = (SELECT tasks.user_id FROM tasks WHERE tasks.id = task_logs.task_id)",
+        "user_id IS NULL",
+    )
+
+
+def downgrade() -> None:
+    for name, table in CHANGE_INDEXES:
+        op.drop_index(name, table_name=table)
+    op.drop_index("ix_task_tombstones_deleted_at", table_name="task_tombstones")
+    op.drop_index("ix_task_tombstones_user_change", table_name="task_tombstones")
+    op.drop_table("task_tombstones")
+    op.drop_column("task_logs", "user_id")
+    for table in ("tasks", "archived_tasks", "task_logs"):
+        op.drop_column(table, "change_seq")
+    op.drop_column("users", "sync_floor_seq")
+    op.drop_column("users", "change_seq")
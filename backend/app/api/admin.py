@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.models.user import User
+from app.services.auth import get_current_admin
+from app.services.memory import memory_tracker
+from app.services.metrics import metrics
+from app.services.profiling import profile_store
+from app.services.slow_queries import slow_query_log
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@router.get("/profiles")
+def list_profiles(admin: User = Depends(get_current_admin)):
+    """List captured request profiles, newest first."""
+    return profile_store.entries()
+
+
+@router.get("/profiles/{name}")
+def get_profile(name: str, admin: User = Depends(get_current_admin)):
+    """Download a captured profile in speedscope format."""
+    path = profile_store.path_for(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=path.name)
+
+
+@router.get("/metrics")
+def get_metrics(admin: User = Depends(get_current_admin)):
+    """In-process metrics of the worker that serves this request."""
+    return metrics.snapshot()
+
+
+@router.get("/memory")
+def get_memory(
+    limit: int = Query(default=25, ge=1, le=500),
+    admin: User = Depends(get_current_admin),
+):
+    """Per-route peak allocations and the top allocation sites currently traced."""
+    if not memory_tracker.tracing:
+        raise HTTPException(status_code=409, detail="Memory tracking is disabled")
+    return {
+        "route_peaks": memory_tracker.route_peaks,
+        "top_sites": memory_tracker.top_sites(limit),
+    }
+
+
+@router.get("/slow-queries")
+def get_slow_queries(
+    limit: int = Query(default=50, ge=1, le=500),
+    admin: User = Depends(get_current_admin),
+):
+    """Statements of this worker slower than the threshold, newest first, with sampled plans."""
+    if slow_query_log.threshold_ms is None:
+        raise HTTPException(status_code=409, detail="The slow-query log is disabled")
+    return slow_query_log.entries()[:limit]
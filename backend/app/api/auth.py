@@ -2,12 +2,17 @@ from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
-from app.database import get_db
+from app.database import get_user_db
 from app.models.user import User
-from app.schemas.user import UserCreate, UserResponse, Token
+from app.schemas.user import UserCreate, UserResponse, UserUpdate, Token
+from app.services.priority import SCORING_MODELS
+from app.services.invalidation import publish_invalidation
+from app.services.sharding import assign_shard
+from app.services.task_cache import task_cache
 from app.services.auth import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     create_access_token,
@@ -25,7 +30,7 @@ class GoogleLoginRequest(BaseModel):
 
 
 @router.post("/register", response_model=UserResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+def register(user: UserCreate, db: Session = Depends(get_user_db)):
     db_user = db.query(User).filter(User.email == user.email).first()
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -33,13 +38,18 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     hashed_password = get_password_hash(user.password)
     new_user = User(email=user.email, hashed_password=hashed_password)
     db.add(new_user)
+    db.flush()
+    assign_shard(db, new_user)
     db.commit()
     db.refresh(new_user)
+    # Ids can be reused after a user is deleted, so nothing cached under this one is theirs
+    task_cache.invalidate(new_user.id)
+    publish_invalidation(new_user.id)
     return new_user
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_user_db)):
     user = db.query(User).filter(User.email == form_data.username).first()
     if not user or not user.hashed_password or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
@@ -56,7 +66,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 
 
 @router.post("/google", response_model=Token)
-def google_login(request: GoogleLoginRequest, db: Session = Depends(get_db)):
+def google_login(request: GoogleLoginRequest, db: Session = Depends(get_user_db)):
     id_info = verify_google_token(request.token)
     if not id_info:
         raise HTTPException(status_code=400, detail="Invalid Google token")
@@ -70,8 +80,12 @@ def google_login(request: GoogleLoginRequest, db: Session = Depends(get_db)):
         # Create new user for Google login
         user = User(email=email, hashed_password=None)  # No password for Google users
         db.add(user)
+        db.flush()
+        assign_shard(db, user)
         db.commit()
         db.refresh(user)
+        task_cache.invalidate(user.id)
+        publish_invalidation(user.id)
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -83,3 +97,28 @@ def google_login(request: GoogleLoginRequest, db: Session = Depends(get_db)):
 @router.get("/me", response_model=UserResponse)
 def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
+
+
+@router.patch("/me", response_model=UserResponse)
+def update_users_me(
+    changes: UserUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_user_db),
+):
+    """
+    Change the current user's settings: the priority scoring model (null for the default).
+    Fields left out of the body are kept.
+    """
+    update_data = changes.model_dump(exclude_unset=True)
+    model_name = update_data.get("scoring_model")
+    if model_name is not None and model_name not in SCORING_MODELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown scoring model, expected one of: {', '.join(SCORING_MODELS)}",
+        )
+    if update_data:
+        db.execute(update(User).where(User.id == current_user.id).values(**update_data))
+        db.commit()
+        for field, value in update_data.items():
+            setattr(current_user, field, value)
+    return current_user
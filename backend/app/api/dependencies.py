@@ -0,0 +1,77 @@
+from datetime import datetime
+
+from fastapi import Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import replica_router, shard_of, shard_router
+from app.models.user import User
+from app.services.auth import get_current_user
+from app.services.fields import parse_fields
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor
+
+
+def get_db(current_user: User = Depends(get_current_user)):
+    """Session on the shard holding the current user's tasks and logs."""
+    db = shard_router.session(shard_of(current_user))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Session for read-only endpoints: a read replica when one is usable and the user
+    has not written recently, else the user's shard. Replicas are of the primary
+    database, so only shard 0 uses them.
+    """
+    session = None
+    if shard_of(current_user) == 0:
+        session = replica_router.replica_session(current_user.last_write_at)
+    if session is None:
+        yield db
+        return
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+class PageParams:
+    """`cursor` and `limit` query parameters of keyset-paginated endpoints."""
+
+    def __init__(
+        self,
+        cursor: str | None = None,
+        limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    ):
+        self.limit = limit
+        self.after: tuple[datetime, int] | None = None
+        if cursor:
+            try:
+                self.after = decode_cursor(cursor)
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+
+
+class FieldParams:
+    """
+    `fields` query parameter of list endpoints: a comma-separated subset of the task
+    response fields. Only those are returned, and only the columns they need are read.
+    """
+
+    def __init__(
+        self,
+        fields: str | None = Query(
+            default=None, description="Comma-separated task fields to return (default: all)"
+        ),
+    ):
+        self.fields: tuple[str, ...] | None = None
+        if fields:
+            try:
+                self.fields = parse_fields(fields)
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
@@ -1,9 +1,16 @@
-from datetime import datetime, timezone
-
-from fastapi import APIRouter, Depends, HTTPException, status
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.api.dependencies import FieldParams, PageParams, get_db, get_read_db
+from app.config import settings
+from app.models.archive import ArchivedTask
 from app.models.task import Task, TaskLog, TaskType
 from app.models.user import User
 from app.schemas.task import (
@@ -11,41 +18,252 @@ from app.schemas.task import (
     TaskUpdate,
     TaskResponse,
     TaskWithLogsResponse,
+    TaskPage,
+    TaskChanges,
+    TaskSearchPage,
     TaskLogCreate,
-    TaskLogResponse,
+    TaskLogPage,
+    ForecastResponse,
+    ImpactHistoryResponse,
+    PlanResponse,
+)
+from app.services import task_writes
+from app.services.priority import (
+    ScoringModel,
+    calculate_priority_score,
+    impact_at,
+    scoring_model,
+    update_task_impact,
 )
-from app.services.priority import update_task_impact, apply_activity_to_impact, calculate_priority_score
+from app.services.archive import completed_page
 from app.services.auth import get_current_user
+from app.services.compression import body_digest
+from app.services.fields import sparse_list, sparse_page, sparse_response, task_columns
+from app.services.concurrency import (
+    PreconditionFailed,
+    commit_with_retry,
+    etag,
+    none_match,
+    parse_if_match,
+)
+from app.services.forecast import forecast_scores, parse_duration
+from app.services.history import downsample, points_to_response, replay_tasks
+from app.services.invalidation import publish_invalidation
+from app.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_change_cursor,
+    decode_score_cursor,
+    encode_score_cursor,
+    keyset_query,
+    split_page,
+)
+from app.services.planner import plan_tasks
+from app.services.search import search_terms, search_tasks
+from app.services.singleflight import SingleFlight
+from app.services.sync import changes_since, next_change_seq, record_deletion
+from app.services.task_cache import (
+    SNAPSHOT_COLUMNS,
+    TEXT_COLUMNS,
+    CachedTask,
+    TaskSnapshot,
+    task_cache,
+)
+from app.services.timing import phase
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
+# Concurrent list requests for the same user and data version share one computation
+task_list_flights = SingleFlight("task_list")
+_task_list = TypeAdapter(list[TaskResponse])
+_task_page = TypeAdapter(TaskPage)
+
+
+def get_task_or_404(db: Session, task_id: int, user_id: int) -> Task:
+    task = db.query(Task).filter(Task.id == task_id, Task.user_id == user_id).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+
+def task_to_response(task: Task, model: ScoringModel | None = None) -> dict:
+    """Convert a task model to response dict with priority score from the scoring `model`."""
+    with phase("scoring"):
+        priority_score = calculate_priority_score(task, model=model)
+
+    with phase("build"):
+        return {
+            "id": task.id,
+            "title": task.title,
+            "description": task.description,
+            "task_type": task.task_type,
+            "impact": task.impact,
+            "effort": task.effort,
+            "not_doing_hourly_rate": task.not_doing_hourly_rate,
+            "doing_hourly_rate": task.doing_hourly_rate,
+            "impact_set_to": task.impact_set_to,
+            "deadline": task.deadline,
+            "created_at": task.created_at,
+            "last_updated": task.last_updated,
+            "completed_at": task.completed_at,
+            "priority_score": priority_score,
+            "version": task.version,
+        }
 
-def task_to_response(task: Task) -> dict:
-    """Convert a task model to response dict with priority score."""
-    return {
-        "id": task.id,
-        "title": task.title,
-        "description": task.description,
-        "task_type": task.task_type,
-        "impact": task.impact,
-        "effort": task.effort,
-        "not_doing_hourly_rate": task.not_doing_hourly_rate,
-        "doing_hourly_rate": task.doing_hourly_rate,
-        "impact_set_to": task.impact_set_to,
-        "deadline": task.deadline,
-        "created_at": task.created_at,
-        "last_updated": task.last_updated,
-        "completed_at": task.completed_at,
-        "priority_score": calculate_priority_score(task),
-    }
+
+def task_list_json(
+    db: Session,
+    user_id: int,
+    fields: tuple[str, ...] | None = None,
+    model: ScoringModel | None = None,
+) -> bytes:
+    """
+    A user's active tasks sorted by priority score from the scoring `model`, as
+    response JSON with just `fields` (default: all).
+
+    Served from the user's cached snapshot when there is one. Snapshots are loaded as
+    plain rows of the columns they hold; while caching is off, texts that were not
+    asked for are not read at all. Impacts are grown to the current time for the
+    response only; the stored (impact, last_updated) pair already determines them.
+    """
+    snapshot = task_cache.get(user_id)
+    if snapshot is None:
+        columns = SNAPSHOT_COLUMNS
+        cache = fields is None or task_cache.enabled
+        if not cache:
+            columns = [name for name in columns if name not in TEXT_COLUMNS or name in fields]
+        query = select(*(Task.__table__.c[name] for name in columns)).where(
+            Task.user_id == user_id, Task.completed_at.is_(None)
+        )
+        if cache:
+            token = task_cache.begin_load(user_id)
+            snapshot = task_cache.finish_load(user_id, token, db.execute(query))
+        else:
+            snapshot = TaskSnapshot.from_tasks(db.execute(query), time.monotonic())
+
+    now = datetime.now(timezone.utc)
+    with phase("scoring"):
+        impacts, priorities = snapshot.scores(now, model)
+    with phase("build"):
+        responses = snapshot.responses(now, impacts, priorities)
+    with phase("serialize"):
+        if fields is not None:
+            return sparse_list.dump_json([{name: r[name] for name in fields} for r in responses])
+        return _task_list.dump_json(_task_list.validate_python(responses))
 
 
 @router.get("", response_model=list[TaskResponse])
-def get_tasks(
+async def get_tasks(
+    selection: FieldParams = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all active tasks for current user sorted by priority score."""
+    """
+    Get all active tasks for current user sorted by priority score, with only the
+    `fields` asked for.
+
+    Identical requests that arrive while one is being computed (the same user and
+    fields, and no write in between) share its JSON; each still gets its own response.
+    """
+    user_id, fields = current_user.id, selection.fields
+    model = scoring_model(current_user.scoring_model)
+    key = (user_id, task_cache.version(user_id), fields, model.name)
+    body = await task_list_flights.do(
+        key, lambda: run_in_threadpool(task_list_json, db, user_id, fields, model)
+    )
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/completed", response_model=TaskPage)
+def get_completed_tasks(
+    page: PageParams = Depends(),
+    selection: FieldParams = Depends(),
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get completed ending tasks for current user, newest first, including archived ones,
+    with only the `fields` asked for.
+
+    Pages change rarely, so they carry an ETag of their content: clients can revalidate
+    with If-None-Match, and the compressed body is cached (see CompressionMiddleware).
+    """
+    fields, model = selection.fields, scoring_model(current_user.scoring_model)
+    columns = None if fields is None else task_columns(fields, "completed_at", "id")
+    tasks, next_cursor = split_page(
+        completed_page(db, current_user.id, page.limit, page.after, columns),
+        page.limit,
+        lambda task: (task.completed_at, task.id),
+    )
+    if fields is None:
+        items = [task_to_response(task, model) for task in tasks]
+        result = {"items": items, "next_cursor": next_cursor}
+        with phase("serialize"):
+            body = _task_page.dump_json(_task_page.validate_python(result))
+    else:
+        items = [sparse_response(row, fields, model) for row in tasks]
+        with phase("serialize"):
+            body = sparse_page.dump_json({"items": items, "next_cursor": next_cursor})
+    tag = f'"{body_digest(body).hex()}"'
+    if none_match(if_none_match, tag):
+        return Response(status_code=304, headers={"ETag": tag})
+    return Response(content=body, media_type="application/json", headers={"ETag": tag})
+
+
+@router.get("/changes", response_model=TaskChanges)
+def get_changes(
+    since: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get what changed since the `since` cursor, oldest change first: tasks created or
+    modified (including completed and archived ones), logs added, and ids of deleted
+    tasks. Without `since`, everything.
+
+    Pass `next_cursor` as `since` on the next sync; while `has_more` is set there are
+    more changes to fetch now. A 410 means deletions since the cursor were compacted
+    away, and the client has to sync from the start.
+    """
+    after = None
+    if since:
+        try:
+            after = decode_change_cursor(since)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    page = changes_since(db, current_user.id, after, limit)
+    model = scoring_model(current_user.scoring_model)
+    return {
+        "tasks": [task_to_response(task, model) for task in page.tasks],
+        "logs": page.logs,
+        "deleted": page.deleted,
+        "next_cursor": page.next_cursor,
+        "has_more": page.has_more,
+    }
+
+
+@router.get("/forecast", response_model=ForecastResponse)
+def get_forecast(
+    horizon: str = "7d",
+    step: str = "1h",
+    k: int = Query(default=5, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Forecast priority scores of active tasks over the next `horizon`, sampled every
+    `step`, assuming no time is logged. Returns the top `k` tasks per step and the
+    points where a task takes over a top-k rank.
+    """
+    try:
+        horizon_delta = parse_duration(horizon)
+        step_delta = parse_duration(step)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
     tasks = (
         db.query(Task)
         .filter(Task.user_id == current_user.id)
@@ -53,35 +271,148 @@ def get_tasks(
         .all()
     )
 
-    # Update impact for each task and collect responses
-    task_responses = []
-    for task in tasks:
-        update_task_impact(task)
-        task_responses.append(task_to_response(task))
-
-    # Commit the impact updates
-    db.commit()
+    start = datetime.now(timezone.utc)
+    with phase("scoring"):
+        try:
+            forecast = forecast_scores(
+                tasks, start, horizon_delta, step_delta, scoring_model(current_user.scoring_model)
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        top_rows, top_scores = forecast.top_k(k)
+        crossovers = forecast.crossovers(top_rows)
+
+    with phase("build"):
+        task_ids = forecast.task_ids.tolist()
+        top_ids = [[task_ids[row] for row in rows] for rows in top_rows.tolist()]
+        return {
+            "start": start,
+            "step_seconds": step_delta.total_seconds(),
+            "steps": [
+                {
+                    "at": at,
+                    "top": [
+                        {"task_id": task_id, "score": score}
+                        for task_id, score in zip(ids, scores)
+                    ],
+                }
+                for at, ids, scores in zip(forecast.times, top_ids, top_scores.tolist())
+            ],
+            "crossovers": [
+                {
+                    "at": forecast.times[step_index],
+                    "rank": rank + 1,
+                    "task_id": task_ids[row],
+                    "previous_task_id": task_ids[previous_row],
+                }
+                for step_index, rank, row, previous_row in crossovers
+            ],
+        }
 
-    # Sort by priority score
-    task_responses.sort(key=lambda t: t["priority_score"], reverse=True)
 
-    return task_responses
+@router.get("/history", response_model=list[ImpactHistoryResponse])
+def get_impact_histories(
+    points: int = Query(default=200, ge=3, le=5000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the impact history of all active tasks, each downsampled to `points` points."""
+    tasks = (
+        db.query(Task)
+        .filter(Task.user_id == current_user.id)
+        .filter(Task.completed_at.is_(None))
+        .order_by(Task.id)
+        .all()
+    )
+    curves = replay_tasks(db, tasks, datetime.now(timezone.utc))
+    return [
+        {"task_id": task_id, "points": points_to_response(downsample(curve, points))}
+        for task_id, curve in curves.items()
+    ]
 
 
-@router.get("/completed", response_model=list[TaskResponse])
-def get_completed_tasks(
-    db: Session = Depends(get_db),
+@router.get("/plan", response_model=PlanResponse)
+def get_plan(
+    hours: float = Query(..., gt=0, le=168),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all completed ending tasks for current user."""
+    """Choose the active tasks with the highest total priority whose effort fits in `hours`."""
     tasks = (
         db.query(Task)
         .filter(Task.user_id == current_user.id)
-        .filter(Task.completed_at.is_not(None))
-        .order_by(Task.completed_at.desc())
+        .filter(Task.completed_at.is_(None))
+        .order_by(Task.id)
         .all()
     )
-    return [task_to_response(task) for task in tasks]
+
+    now, model = datetime.now(timezone.utc), scoring_model(current_user.scoring_model)
+    with phase("scoring"):
+        # A zero-length forecast scores every task at `now` in one vectorized pass;
+        # its rows are in task id order, like `tasks`
+        scores = forecast_scores(tasks, now, timedelta(0), timedelta(hours=1), model).scores[:, 0]
+        efforts = np.fromiter((task.effort for task in tasks), dtype=np.float64, count=len(tasks))
+        plan = plan_tasks(efforts, scores, hours)
+
+    return {
+        "hours": hours,
+        "method": plan.method,
+        "total_effort": plan.total_effort,
+        "total_score": plan.total_score,
+        "tasks": [task_to_response(tasks[i], model) for i in plan.indices],
+    }
+
+
+@router.get("/search", response_model=TaskSearchPage)
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    include_completed: bool = False,
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Search task titles and descriptions for every word of `q` (prefixes match), ranked
+    by text relevance blended with the priority score. Active tasks only unless
+    `include_completed`; archived tasks are not searched.
+    """
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query must contain a word")
+
+    # Every page ranks at the time of the first, so scores stay comparable
+    now, after = datetime.now(timezone.utc), None
+    if cursor:
+        try:
+            now, *after = decode_score_cursor(cursor)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    model = scoring_model(current_user.scoring_model)
+    rows = search_tasks(
+        db,
+        current_user.id,
+        terms,
+        now,
+        settings.search_relevance_weight,
+        limit,
+        tuple(after) if after else None,
+        include_completed,
+        model,
+    )
+    rows, next_cursor = split_page(
+        rows, limit, lambda row: (now, row.score, row.Task.id), encode_score_cursor
+    )
+
+    items = []
+    for task, relevance, score in rows:
+        if not task.completed_at:
+            # In memory only, so the response shows the priority the ranking used
+            with phase("scoring"):
+                update_task_impact(task, now, model)
+        items.append(task_to_response(task, model) | {"relevance": relevance, "score": score})
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.post("", response_model=TaskResponse, status_code=201)
@@ -97,43 +428,55 @@ def create_task(
     if task_data.task_type == TaskType.ENDLESS and doing_rate is None and impact_set_to is None:
         doing_rate = 0.1
 
-    task = Task(
-        title=task_data.title,
-        description=task_data.description,
-        task_type=task_data.task_type,
-        impact=task_data.impact,
-        effort=task_data.effort,
-        not_doing_hourly_rate=task_data.not_doing_hourly_rate,
-        doing_hourly_rate=doing_rate,
-        impact_set_to=impact_set_to,
-        deadline=task_data.deadline,
-        user_id=current_user.id,
+    task = task_writes.insert_task(
+        db,
+        {
+            "title": task_data.title,
+            "description": task_data.description,
+            "task_type": task_data.task_type,
+            "impact": task_data.impact,
+            "initial_impact": task_data.impact,
+            "effort": task_data.effort,
+            "not_doing_hourly_rate": task_data.not_doing_hourly_rate,
+            "doing_hourly_rate": doing_rate,
+            "impact_set_to": impact_set_to,
+            "deadline": task_data.deadline,
+            "user_id": current_user.id,
+            "change_seq": next_change_seq(db, current_user.id),
+        },
     )
-    db.add(task)
+    # Serialize before commit, which would expire the returned row
+    task_response = task_to_response(task, scoring_model(current_user.scoring_model))
+    cached = CachedTask(task)
     db.commit()
-    db.refresh(task)
-    return task_to_response(task)
+    task_cache.put(current_user.id, cached)
+    publish_invalidation(current_user.id)
+    return task_response
 
 
 @router.get("/{task_id}", response_model=TaskWithLogsResponse)
 def get_task(
     task_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a task by ID with its logs."""
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    # Update impact if task is not completed
-    if not task.completed_at:
-        update_task_impact(task)
-        db.commit()
-
+    task = get_task_or_404(db, task_id, current_user.id)
+    model = scoring_model(current_user.scoring_model)
     logs = list(task.logs)
-    response = task_to_response(task)
-    response["logs"] = [
+    task_response = task_to_response(task, model)
+    if not task.completed_at:
+        # Grown in memory, as GET /api/tasks does: a read changes neither the task's
+        # version (its ETag) nor its change_seq
+        now = datetime.now(timezone.utc)
+        grown = Task(impact=impact_at(task, now), effort=task.effort, deadline=task.deadline)
+        task_response.update(
+            impact=grown.impact,
+            last_updated=now,
+            priority_score=calculate_priority_score(grown, now, model),
+        )
+    task_response["logs"] = [
         {
             "id": log.id,
             "task_id": log.task_id,
@@ -142,29 +485,39 @@ def get_task(
         }
         for log in logs
     ]
-    return response
+    response.headers["ETag"] = etag(task.version)
+    return task_response
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
 def update_task(
     task_id: int,
     task_data: TaskUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Update a task."""
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
+    """Update a task. With If-Match, the update only applies to the given version."""
+    expected_versions = parse_if_match(if_match)
     update_data = task_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(task, field, value)
+    update_data["change_seq"] = next_change_seq(db, current_user.id)
 
-    task.last_updated = datetime.now(timezone.utc)
+    task = task_writes.update_task_fields(
+        db, task_id, current_user.id, update_data, datetime.now(timezone.utc), expected_versions
+    )
+    if task is None:
+        # Only reached on failure: tell a missing task apart from a stale If-Match
+        get_task_or_404(db, task_id, current_user.id)
+        raise PreconditionFailed()
+
+    task_response = task_to_response(task, scoring_model(current_user.scoring_model))
+    cached = CachedTask(task)
     db.commit()
-    db.refresh(task)
-    return task_to_response(task)
+    task_cache.put(current_user.id, cached)
+    publish_invalidation(current_user.id)
+    response.headers["ETag"] = etag(task_response["version"])
+    return task_response
 
 
 @router.delete("/{task_id}", status_code=204)
@@ -173,13 +526,27 @@ def delete_task(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Delete a task."""
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    db.delete(task)
-    db.commit()
+    """Delete a task, leaving a tombstone for clients syncing changes."""
+
+    def apply_delete():
+        task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
+        if task:
+            db.delete(task)
+            record_deletion(db, current_user.id, task_id)
+            return
+        # Completed tasks may have been archived
+        archived = (
+            db.query(ArchivedTask)
+            .filter(ArchivedTask.id == task_id, ArchivedTask.user_id == current_user.id)
+            .delete()
+        )
+        if not archived:
+            raise HTTPException(status_code=404, detail="Task not found")
+        record_deletion(db, current_user.id, task_id)
+
+    commit_with_retry(db, apply_delete)
+    task_cache.invalidate(current_user.id)
+    publish_invalidation(current_user.id)
     return None
 
 
@@ -191,41 +558,64 @@ def complete_task(
     current_user: User = Depends(get_current_user)
 ):
     """Complete a task or log time."""
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    if task.task_type == TaskType.ENDING:
-        task.completed_at = datetime.now(timezone.utc)
-        db.commit()
-        db.refresh(task)
-    else:
-        if not log_data:
-            raise HTTPException(
-                status_code=400,
-                detail="duration_minutes is required for endless tasks",
-            )
-
-        apply_activity_to_impact(task, log_data.duration_minutes)
+    duration_minutes = log_data.duration_minutes if log_data else None
+
+    # Impact is recomputed in the UPDATE itself, so concurrent logs cannot overwrite each other
+    task = task_writes.complete_task(
+        db,
+        task_id,
+        current_user.id,
+        datetime.now(timezone.utc),
+        duration_minutes,
+        next_change_seq(db, current_user.id),
+    )
+    if task is None:
+        # Without a body only ending tasks match; endless ones need a duration
+        get_task_or_404(db, task_id, current_user.id)
+        raise HTTPException(
+            status_code=400,
+            detail="duration_minutes is required for endless tasks",
+        )
+
+    task_response = task_to_response(task, scoring_model(current_user.scoring_model))
+    cached = CachedTask(task)
+    db.commit()
+    task_cache.put(current_user.id, cached)
+    publish_invalidation(current_user.id)
+    return task_response
 
-        log = TaskLog(task_id=task.id, duration_minutes=log_data.duration_minutes)
-        db.add(log)
-        db.commit()
-        db.refresh(task)
 
-    return task_to_response(task)
+@router.get("/{task_id}/history", response_model=ImpactHistoryResponse)
+def get_impact_history(
+    task_id: int,
+    points: int = Query(default=200, ge=3, le=5000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the impact history of a task, replayed from its logs and downsampled to `points` points."""
+    task = get_task_or_404(db, task_id, current_user.id)
+    curve = replay_tasks(db, [task], datetime.now(timezone.utc))[task.id]
+    return {"task_id": task.id, "points": points_to_response(downsample(curve, points))}
 
 
-@router.get("/{task_id}/logs", response_model=list[TaskLogResponse])
+@router.get("/{task_id}/logs", response_model=TaskLogPage)
 def get_task_logs(
     task_id: int,
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all time logs for a task."""
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    logs = db.query(TaskLog).filter(TaskLog.task_id == task_id).order_by(TaskLog.logged_at.desc()).all()
-    return logs
+    """Get time logs for a task, newest first."""
+    get_task_or_404(db, task_id, current_user.id)
+
+    query = keyset_query(
+        select(TaskLog).where(TaskLog.task_id == task_id),
+        TaskLog.logged_at,
+        TaskLog.id,
+        page.limit,
+        page.after,
+    )
+    logs, next_cursor = split_page(
+        db.scalars(query).all(), page.limit, lambda log: (log.logged_at, log.id)
+    )
+    return {"items": logs, "next_cursor": next_cursor}
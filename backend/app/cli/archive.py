@@ -0,0 +1,46 @@
+"""
+Move old completed tasks into the archive table.
+
+Usage: python -m app.cli.archive [--days 90] [--batch-size 1000] [--tombstone-days 30]
+
+Meant to run periodically (cron, a scheduled dyno or a Kubernetes CronJob).
+Ending tasks completed more than `--days` ago move from `tasks` to
+`archived_tasks` in committed batches, so an interrupted run loses nothing and
+the next run continues. Tombstones of tasks deleted more than `--tombstone-days`
+ago are compacted the same way. On Postgres it also creates the upcoming monthly
+`task_logs` partitions. Every shard is processed in turn.
+"""
+import argparse
+from datetime import timedelta
+
+from app.config import settings
+from app.database import shard_router
+from app.models import user  # noqa: F401 - registers User for the Task relationship
+from app.services.archive import archive_completed_tasks, ensure_log_partitions
+from app.services.sync import compact_tombstones
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=settings.archive_after_days)
+    parser.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    parser.add_argument("--tombstone-days", type=int, default=settings.tombstone_retention_days)
+    args = parser.parse_args()
+
+    for shard in range(len(shard_router)):
+        prefix = f"shard {shard}: " if len(shard_router) > 1 else ""
+        db = shard_router.session(shard)
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                for name in ensure_log_partitions(db, settings.log_partition_months_ahead):
+                    print(f"{prefix}created partition {name}")
+            moved = archive_completed_tasks(db, timedelta(days=args.days), args.batch_size)
+            print(f"{prefix}archived {moved} task(s) completed more than {args.days} days ago")
+            removed = compact_tombstones(db, timedelta(days=args.tombstone_days), args.batch_size)
+            print(f"{prefix}compacted {removed} tombstone(s) older than {args.tombstone_days} days")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Flag migrations that would lock a table for as long as it takes to scan or rewrite it.
+
+Usage: python -m app.cli.check_migrations [--versions alembic/versions]
+
+Reads each migration's upgrade path (upgrade() and the module's functions it calls)
+without running it, and reports Alembic operations and SQL that block writes for
+the length of a scan, a rewrite or an index build: plain `op.create_index`, foreign
+keys and checks added without NOT VALID, SET NOT NULL, column type changes, stored
+generated columns and table renames. Operations on a table created earlier in the
+same migration are fine, since nothing else uses it yet. The safe alternatives are
+in `app.online_migrations`.
+
+Revisions in BASELINE_REVISIONS predate the check and are not reported. A statement
+that is known to be safe (a tiny table, say) can be marked with a
+`# migration-check: ignore` comment on or just above it. Exits with status 1 when
+anything is reported, so CI can run it.
+"""
+import argparse
+import ast
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+VERSIONS_DIR = Path(__file__).resolve().parents[2] / "alembic" / "versions"
+
+# Applied everywhere before this check existed
+BASELINE_REVISIONS = frozenset(f"{number:03d}" for number in range(1, 6))
+
+IGNORE_COMMENT = "# migration-check: ignore"
+
+INDEX_BUILD = "blocks writes while the index builds"
+SCAN = "scans the table under an ACCESS EXCLUSIVE lock"
+REWRITE = "rewrites the table under an ACCESS EXCLUSIVE lock"
+RENAME = "holds an ACCESS EXCLUSIVE lock until commit, and running code breaks"
+
+# Alembic operations: (table argument position and keyword, rule, advice)
+OPERATIONS = {
+    "create_index": (1, "table_name", "create-index", f"{INDEX_BUILD}; use create_index_concurrently"),
+    "create_foreign_key": (
+        1,
+        "source_table",
+        "foreign-key",
+        "scans both tables under lock; use add_foreign_key (NOT VALID, then VALIDATE)",
+    ),
+    "create_check_constraint": (
+        1, "table_name", "check-constraint", f"{SCAN}; use add_check_constraint"
+    ),
+    "create_unique_constraint": (
+        1, "table_name", "unique-constraint", f"{INDEX_BUILD}; build a unique index concurrently first"
+    ),
+    "rename_table": (0, "old_table_name", "rename-table", RENAME),
+}
+
+# Raw SQL: (pattern with a `table` group, rule, advice), matched case-insensitively
+SQL_RULES = [
+    (
+        r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?!CONCURRENTLY)(?:IF\s+NOT\s+EXISTS\s+)?\w+\s+"
+        r"ON\s+(?:ONLY\s+)?(?P<table>\w+)",
+        "create-index",
+        f"{INDEX_BUILD}; use CREATE INDEX CONCURRENTLY",
+    ),
+    (
+        r"ALTER\s+TABLE\s+(?P<table>\w+)\s+ADD\s+(?:CONSTRAINT\s+\w+\s+)?(?:FOREIGN\s+KEY|CHECK)"
+        r"(?!.*NOT\s+VALID)",
+        "constraint",
+        f"{SCAN}; add it NOT VALID and VALIDATE it separately",
+    ),
+    (
+        r"ALTER\s+TABLE\s+(?P<table>\w+)\s+.*SET\s+NOT\s+NULL",
+        "set-not-null",
+        f"{SCAN}; use set_not_null",
+    ),
+    (
+        r"ALTER\s+TABLE\s+(?P<table>\w+)\s+.*ALTER\s+COLUMN\s+\w+\s+(?:SET\s+DATA\s+)?TYPE",
+        "column-type",
+        f"{REWRITE}; add a new column and backfill it",
+    ),
+    (
+        r"ALTER\s+TABLE\s+(?P<table>\w+)\s+ADD\s+COLUMN\s+.*GENERATED\s+ALWAYS\s+AS\s+.*STORED",
+        "stored-generated",
+        f"{REWRITE}; add a plain column and backfill it",
+    ),
+    (r"ALTER\s+TABLE\s+(?P<table>\w+)\s+RENAME\s+TO", "rename-table", RENAME),
+    (r"(?:VACUUM\s+FULL|CLUSTER)\s+(?P<table>\w+)", "rewrite", REWRITE),
+]
+
+CREATE_TABLE_SQL = re.compile(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", re.IGNORECASE)
+
+
+@dataclass
+class Finding:
+    path: Path
+    line: int
+    rule: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path.name}:{self.line}: {self.rule}: {self.message}"
+
+
+def _string(node: ast.AST) -> str | None:
+    """Literal SQL of a call argument: a string, an f-string (holes as `?`) or text("...")."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return "".join(
+            part.value if isinstance(part, ast.Constant) else "?" for part in node.values
+        )
+    if isinstance(node, ast.Call) and _name(node.func) == "text" and node.args:
+        return _string(node.args[0])
+    return None
+
+
+def _name(func: ast.AST) -> str | None:
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    if isinstance(func, ast.Name):
+        return func.id
+    return None
+
+
+def _argument(call: ast.Call, position: int, keyword: str) -> str | None:
+    if len(call.args) > position:
+        return _string(call.args[position])
+    for kw in call.keywords:
+        if kw.arg == keyword:
+            return _string(kw.value)
+    return None
+
+
+def upgrade_calls(tree: ast.Module) -> list[ast.Call]:
+    """Calls made by upgrade() and the module-level functions it reaches, in source order."""
+    functions = {node.name: node for node in tree.body if isinstance(node, ast.FunctionDef)}
+    reached, pending = set(), ["upgrade"]
+    while pending:
+        name = pending.pop()
+        if name in reached or name not in functions:
+            continue
+        reached.add(name)
+        for node in ast.walk(functions[name]):
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+                pending.append(node.func.id)
+    calls = [
+        node
+        for name in reached
+        for node in ast.walk(functions[name])
+        if isinstance(node, ast.Call)
+    ]
+    return sorted(calls, key=lambda call: (call.lineno, call.col_offset))
+
+
+def revision_of(tree: ast.Module) -> str | None:
+    for node in tree.body:
+        target = node.target if isinstance(node, ast.AnnAssign) else (
+            node.targets[0] if isinstance(node, ast.Assign) else None
+        )
+        if isinstance(target, ast.Name) and target.id == "revision":
+            return _string(node.value)
+    return None
+
+
+def check_source(source: str, path: Path) -> list[Finding]:
+    tree = ast.parse(source)
+    lines = source.splitlines()
+    created: set[str] = set()
+    findings = []
+
+    def report(call: ast.Call, table: str | None, rule: str, message: str) -> None:
+        if table is not None and table.lower() in created:
+            return
+        nearby = lines[max(0, call.lineno - 2) : call.end_lineno]
+        if any(IGNORE_COMMENT in line for line in nearby):
+            return
+        findings.append(Finding(path, call.lineno, rule, message))
+
+    for call in upgrade_calls(tree):
+        name = _name(call.func)
+        if name == "create_table":
+            table = _argument(call, 0, "table_name")
+            if table:
+                created.add(table.lower())
+        elif name in OPERATIONS:
+            position, keyword, rule, message = OPERATIONS[name]
+            report(call, _argument(call, position, keyword), rule, message)
+        elif name == "alter_column":
+            keywords = {kw.arg for kw in call.keywords}
+            table = _argument(call, 0, "table_name")
+            nullable = next((kw.value for kw in call.keywords if kw.arg == "nullable"), None)
+            if isinstance(nullable, ast.Constant) and nullable.value is False:
+                report(call, table, "set-not-null", f"{SCAN}; use set_not_null")
+            if "type_" in keywords:
+                report(call, table, "column-type", f"{REWRITE}; add a new column and backfill it")
+        elif name == "execute" and call.args:
+            sql = _string(call.args[0])
+            if sql is None:
+                continue
+            sql = " ".join(sql.split())
+            for match in CREATE_TABLE_SQL.finditer(sql):
+                created.add(match.group(1).lower())
+            for pattern, rule, message in SQL_RULES:
+                match = re.search(pattern, sql, re.IGNORECASE)
+                if match:
+                    report(call, match.group("table"), rule, message)
+    return findings
+
+
+def check(versions_dir: Path = VERSIONS_DIR) -> list[Finding]:
+    findings = []
+    for path in sorted(versions_dir.glob("*.py")):
+        source = path.read_text()
+        if revision_of(ast.parse(source)) in BASELINE_REVISIONS:
+            continue
+        findings.extend(check_source(source, path))
+    return findings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--versions", type=Path, default=VERSIONS_DIR)
+    args = parser.parse_args()
+
+    findings = check(args.versions)
+    for finding in findings:
+        print(finding)
+    if findings:
+        sys.exit(1)
+    print("no locking migrations found")
+
+
+if __name__ == "__main__":
+    main()
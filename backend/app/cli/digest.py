@@ -0,0 +1,75 @@
+"""
+Write every user's top tasks by priority score into the digest table.
+
+Usage: python -m app.cli.digest [--date YYYY-MM-DD] [--top 5] [--chunk-size 1000]
+                                [--workers N] [--restart] [--keep-days 7]
+                                [--report-seconds 10]
+
+Meant to run daily before the digest emails go out. Users are streamed from every
+shard in chunks scored across `--workers` processes (default: one per CPU), reading
+tasks without updating their impact. Each chunk is committed as it finishes, so an
+interrupted run continues where it stopped when started again for the same date;
+`--restart` rebuilds the day from scratch. Progress and throughput are printed every
+`--report-seconds`. Digests older than `--keep-days` are deleted afterwards.
+"""
+import argparse
+import os
+import time
+from datetime import date, timedelta
+
+from app.config import settings
+from app.database import shard_router
+from app.models import user  # noqa: F401 - registers User for the Task relationship
+from app.services.digest import DigestStats, build_digests, prune_digests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--top", type=int, default=settings.digest_top_k)
+    parser.add_argument("--chunk-size", type=int, default=settings.digest_chunk_size)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--restart", action="store_true")
+    parser.add_argument("--keep-days", type=int, default=settings.digest_retention_days)
+    parser.add_argument("--report-seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    last_report = time.monotonic()
+
+    def report(shard: int, stats: DigestStats) -> None:
+        nonlocal last_report
+        if time.monotonic() - last_report >= args.report_seconds:
+            last_report = time.monotonic()
+            print(
+                f"shard {shard}: {stats.users} users, {stats.tasks} tasks so far "
+                f"({stats.users_per_second:.0f} users/s)",
+                flush=True,
+            )
+
+    stats = build_digests(
+        args.date,
+        args.top,
+        args.chunk_size,
+        workers=args.workers,
+        restart=args.restart,
+        progress=report,
+    )
+    print(
+        f"digests for {args.date}: {stats.users} users, {stats.tasks} tasks scored, "
+        f"{stats.digests} rows written in {stats.seconds:.1f}s "
+        f"({stats.users_per_second:.0f} users/s, {stats.tasks_per_second:.0f} tasks/s)"
+    )
+
+    before = args.date - timedelta(days=args.keep_days)
+    for shard in range(len(shard_router)):
+        db = shard_router.session(shard)
+        try:
+            removed = prune_digests(db, before, args.chunk_size)
+        finally:
+            db.close()
+        if removed:
+            print(f"shard {shard}: pruned {removed} digest row(s) from before {before}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Print an import-time breakdown for the API's startup.
+
+Usage: python -m app.cli.importtime [--module app.main] [--top 25]
+
+Runs the import in a fresh interpreter with `-X importtime` and summarises the
+result by top-level package (self time) and by slowest individual modules
+(cumulative time, which includes the module's own imports).
+"""
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append(ImportRecord(name.strip(), int(self_us), int(cumulative_us), depth))
+    return records
+
+
+def measure(module: str) -> list[ImportRecord]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def report(records: list[ImportRecord], module: str, top: int) -> str:
+    by_package: dict[str, int] = defaultdict(int)
+    for record in records:
+        by_package[record.module.split(".")[0]] += record.self_us
+    target = next((r for r in records if r.module == module and r.depth <= 1), None)
+    total_us = target.cumulative_us if target else sum(by_package.values())
+
+    lines = [f"import {module}: {total_us / 1000:.1f} ms", "", "By package (self time):"]
+    for package, self_us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        lines.append(f"  {self_us / 1000:8.1f} ms  {100 * self_us / total_us:5.1f}%  {package}")
+
+    lines += ["", "Slowest modules (cumulative):"]
+    for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        lines.append(f"  {record.cumulative_us / 1000:8.1f} ms  {record.module}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+    print(report(measure(args.module), args.module, args.top))
+
+
+if __name__ == "__main__":
+    main()
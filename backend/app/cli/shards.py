@@ -0,0 +1,59 @@
+"""
+Move users between shards and prepare shards' id sequences.
+
+Usage: python -m app.cli.shards move USER_ID SHARD [--batch-size 1000]
+       python -m app.cli.shards sequences [--stride 64]
+
+Shards are the primary database (shard 0) and SHARD_DATABASE_URLS (shards 1..N),
+each migrated with `alembic upgrade head` run against its URL. `move` copies one
+user's tasks, archived tasks, logs and tombstones to another shard while they keep
+using the app (see app.services.sharding.move_user); their writes wait for the final
+catch-up, a few seconds at most. Rows keep their ids, so before adding shards run
+`sequences` once: it makes each Postgres shard allocate ids in its own residue class.
+"""
+import argparse
+import sys
+
+from app.database import shard_router
+from app.services.invalidation import invalidation_bus, publish_invalidation
+from app.services.sharding import MoveError, interleave_id_sequences, move_user
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    move = commands.add_parser("move", help="move a user's tasks to another shard")
+    move.add_argument("user_id", type=int)
+    move.add_argument("shard", type=int)
+    move.add_argument("--batch-size", type=int, default=1000)
+    sequences = commands.add_parser("sequences", help="interleave the shards' id sequences")
+    sequences.add_argument("--stride", type=int, default=64)
+    args = parser.parse_args()
+
+    if args.command == "sequences":
+        if len(shard_router) > args.stride:
+            sys.exit(f"{len(shard_router)} shards do not fit in a stride of {args.stride}")
+        base = interleave_id_sequences(stride=args.stride)
+        print(f"new ids start at {base} + shard number, every {args.stride}")
+        return
+
+    if invalidation_bus is not None:
+        invalidation_bus.start()
+    try:
+        result = move_user(args.user_id, args.shard, args.batch_size)
+        # Processes that read the emptied source meanwhile may have cached it
+        publish_invalidation(args.user_id)
+    except MoveError as exc:
+        sys.exit(str(exc))
+    finally:
+        if invalidation_bus is not None:
+            invalidation_bus.stop()
+    if result.source == result.target:
+        print(f"user {args.user_id} is already on shard {args.shard}")
+        return
+    copied = ", ".join(f"{count} {table}" for table, count in result.copied.items())
+    print(f"moved user {args.user_id} from shard {result.source} to {result.target}: {copied}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,126 @@
 from pydantic_settings import BaseSettings
 
 
+def to_sqlalchemy_url(url: str) -> str:
+    # Heroku provides DATABASE_URL starting with postgres://
+    # SQLAlchemy 1.4+ requires postgresql://
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
 class Settings(BaseSettings):
     database_url: str = "postgresql://busyness:busyness@db:5432/busyness"
     jwt_secret: str = "your-secret-key-change-this-in-production"
     app_url: str = "http://localhost:5173"
+    environment: str = "development"
+    admin_emails: list[str] = []
+
+    # Read replicas for read-only endpoints; empty means all reads use the primary
+    read_database_urls: list[str] = []
+    # After a user writes, their reads stay on the primary for this long
+    read_your_writes_seconds: float = 5.0
+    # How long a failed replica is skipped before it is tried again
+    replica_retry_seconds: float = 30.0
+
+    # Databases holding some users' tasks and logs, shards 1..N; the primary database
+    # keeps users and is shard 0. Empty means everything is in the primary
+    shard_database_urls: list[str] = []
+
+    # Attempts for read-modify-write task updates that lose an optimistic version check
+    optimistic_retry_attempts: int = 10
+
+    # Completed tasks older than this are moved to the archive table by `app.cli.archive`
+    archive_after_days: int = 90
+    archive_batch_size: int = 1000
+    # Monthly task_logs partitions kept ahead of time on Postgres
+    log_partition_months_ahead: int = 3
+    # Tombstones of deleted tasks are compacted by `app.cli.archive` after this long;
+    # clients that have not synced for longer have to sync from the start
+    tombstone_retention_days: int = 30
+
+    # Daily digest of each user's top tasks, built by `app.cli.digest`
+    digest_top_k: int = 5
+    # Users scored per unit of work handed to a digest worker process
+    digest_chunk_size: int = 1000
+    digest_retention_days: int = 7
+
+    # Migrations give up waiting for a table lock after this long, and are retried
+    migration_lock_timeout_seconds: float = 5.0
+    migration_lock_retries: int = 5
+
+    # Per-process cache of each user's active tasks for GET /api/tasks
+    task_cache_max_users: int = 100_000
+    task_cache_max_bytes: int = 256 * 1024 * 1024
+    # Snapshots are reloaded after this long, a backstop for lost cross-process invalidations
+    task_cache_ttl_seconds: float = 30.0
+
+    # Cross-process cache invalidation: "auto" (Postgres LISTEN/NOTIFY on Postgres, Unix
+    # sockets otherwise), "postgres", "local" or "off" (which also turns the task cache off)
+    invalidation_bus: str = "auto"
+    # Shared by all worker processes on a host when the local bus is used
+    invalidation_socket_dir: str = "/tmp/busyness-invalidation"
+
+    # Response compression (gzip, and brotli when installed) of bodies at least this large
+    compression_minimum_size: int = 1024
+    # gzip level 4 output is within a fifth of level 6's size at under half the CPU
+    # (see benchmarks/bench_compression.py)
+    compression_gzip_level: int = 4
+    compression_brotli_quality: int = 4
+    # Compressed bodies of responses with an ETag, kept so repeats are not recompressed
+    compression_cache_max_bytes: int = 32 * 1024 * 1024
+
+    # Priority scoring model for users who have not picked one: "hyperbolic",
+    # "exponential" or "sigmoid" (see app.services.priority.SCORING_MODELS)
+    scoring_model: str = "hyperbolic"
+
+    # Weight of text relevance against priority when ranking /api/tasks/search results
+    search_relevance_weight: float = 0.7
+
+    # On-demand request profiling, disabled unless a token is configured
+    profiling_token: str | None = None
+    profiling_dir: str = "/tmp/busyness-profiles"
+    # Profiles kept on disk, oldest removed first; at least 1
+    profiling_max_files: int = 20
+    profiling_max_concurrent: int = 1
+    profiling_interval_ms: float = 1.0
+    profiling_max_seconds: float = 30.0
+
+    # Statements slower than this are kept in the slow-query log of each worker process
+    # (GET /api/admin/slow-queries); None turns it off
+    slow_query_threshold_ms: float | None = 200.0
+    slow_query_log_size: int = 200
+    # Share of slow statements whose plan is captured in the background (on Postgres,
+    # reads are run again under EXPLAIN ANALYZE), and how long that may take
+    slow_query_explain_rate: float = 0.1
+    slow_query_explain_timeout_seconds: float = 30.0
+    # Postgres statement_timeout by route, in seconds: {"GET /api/tasks/search": 2}
+    route_statement_timeouts: dict[str, float] = {}
+
+    # Server-Timing response header; defaults to on in development only
+    server_timing: bool | None = None
+
+    # tracemalloc-based per-request peak memory tracking (adds allocation overhead)
+    memory_tracking: bool = False
+    memory_tracking_frames: int = 10
 
     @property
     def sqlalchemy_database_url(self) -> str:
-        # Heroku provides DATABASE_URL starting with postgres://
-        # SQLAlchemy 1.4+ requires postgresql://
-        if self.database_url.startswith("postgres://"):
-            return self.database_url.replace("postgres://", "postgresql://", 1)
-        return self.database_url
+        return to_sqlalchemy_url(self.database_url)
+
+    @property
+    def sqlalchemy_read_database_urls(self) -> list[str]:
+        return [to_sqlalchemy_url(url) for url in self.read_database_urls]
+
+    @property
+    def sqlalchemy_shard_database_urls(self) -> list[str]:
+        return [to_sqlalchemy_url(url) for url in self.shard_database_urls]
+
+    @property
+    def server_timing_enabled(self) -> bool:
+        if self.server_timing is None:
+            return self.environment == "development"
+        return self.server_timing
 
     class Config:
         env_file = ".env"
@@ -1,20 +1,169 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import hashlib
+import itertools
+import logging
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
 
 from app.config import settings
 
 
-engine = create_engine(settings.sqlalchemy_database_url)
+def engine_options(url: str) -> dict:
+    # Sessions are used from threadpool threads other than the one that opened them
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return {}
+
+
+engine = create_engine(settings.sqlalchemy_database_url, **engine_options(settings.sqlalchemy_database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+logger = logging.getLogger(__name__)
+
 
 class Base(DeclarativeBase):
     pass
 
 
-def get_db():
+def get_user_db():
+    """
+    Session on the primary database, which keeps `users`: for authentication and
+    account changes. Task endpoints use the shard-aware `app.api.dependencies.get_db`.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+class ShardRouter:
+    """
+    Databases holding users' tasks and logs.
+
+    Shard 0 is the primary database, which also keeps `users`; `urls` are shards 1..N.
+    A user's shard is stored in `users.shard`, a directory, so moving a user between
+    shards (`app.services.sharding.move_user`) is a single update. New users are
+    placed by a stable hash of their id. Each other shard has a row in its own `users`
+    table for every user it holds, for the foreign keys and the user's change sequence,
+    so a write stays within one database transaction. Sessions carry their shard
+    number in `Session.info["shard"]`.
+    """
+
+    def __init__(self, primary: Engine, urls: list[str]):
+        self.engines = [
+            primary,
+            *(create_engine(url, pool_pre_ping=True, **engine_options(url)) for url in urls),
+        ]
+        self._sessionmakers = [
+            sessionmaker(autocommit=False, autoflush=False, bind=engine, info={"shard": shard})
+            for shard, engine in enumerate(self.engines)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def place(self, user_id: int) -> int:
+        """Shard for a new user: a hash of the id, the same in every process and release."""
+        digest = hashlib.blake2b(str(user_id).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % len(self.engines)
+
+    def session(self, shard: int) -> Session:
+        return self._sessionmakers[shard]()
+
+    def dispose(self) -> None:
+        for engine in self.engines[1:]:
+            engine.dispose(close=False)
+
+
+shard_router = ShardRouter(engine, settings.sqlalchemy_shard_database_urls)
+
+
+def shard_of(user) -> int:
+    # Rows created before sharding, and users not yet flushed, live on the primary
+    return user.shard or 0
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_engine(url, pool_pre_ping=True, **engine_options(url))
+        self.sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.down_until = 0.0
+
+
+class ReplicaRouter:
+    """
+    Route read-only sessions to read replicas.
+
+    Replicas are picked round-robin, skipping any that failed to hand out a
+    connection within the last `retry_seconds`. A user who wrote recently reads
+    from the primary for `read_your_writes_seconds` so they never see their own
+    write missing because of replication lag. The time of the last write is kept on
+    the user's row (`users.last_write_at`), which authentication reads from the
+    primary, so every worker process sees it.
+    """
+
+    def __init__(self, urls: list[str], read_your_writes_seconds: float, retry_seconds: float):
+        self.replicas = [Replica(url) for url in urls]
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.retry_seconds = retry_seconds
+        self._round_robin = itertools.count()
+
+    def wrote_recently(self, last_write_at: datetime | None) -> bool:
+        if last_write_at is None:
+            return False
+        if last_write_at.tzinfo is None:
+            last_write_at = last_write_at.replace(tzinfo=timezone.utc)
+        elapsed = (datetime.now(timezone.utc) - last_write_at).total_seconds()
+        return elapsed < self.read_your_writes_seconds
+
+    def replica_session(self, last_write_at: datetime | None) -> Session | None:
+        """
+        Return a session on a healthy replica, or None when the primary should be used:
+        also when the user's last write, at `last_write_at`, may not have replicated.
+        """
+        if not self.replicas or self.wrote_recently(last_write_at):
+            return None
+
+        start = next(self._round_robin)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.down_until > time.monotonic():
+                continue
+            session = replica.sessionmaker()
+            try:
+                session.connection()
+            except OperationalError:
+                session.close()
+                replica.down_until = time.monotonic() + self.retry_seconds
+                logger.warning("Read replica %s unavailable, skipping it", replica.engine.url)
+                continue
+            return session
+        return None
+
+    def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose(close=False)
+
+
+replica_router = ReplicaRouter(
+    settings.sqlalchemy_read_database_urls,
+    read_your_writes_seconds=settings.read_your_writes_seconds,
+    retry_seconds=settings.replica_retry_seconds,
+)
+
+
+def dispose_engine() -> None:
+    """
+    Drop pooled connections inherited from a parent process without closing them.
+
+    Called in each worker right after fork, so workers never share a socket with the
+    master or with each other.
+    """
+    engine.dispose(close=False)
+    replica_router.dispose()
+    shard_router.dispose()
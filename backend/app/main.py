@@ -1,11 +1,34 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import tasks, auth
-from app.database import engine, Base
+from app.api import tasks, auth, admin
 from app.config import settings
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.memory import MemoryTrackingMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.timing import ServerTimingMiddleware, configure_access_log
+from app.services.compression import compressed_cache
+from app.services.invalidation import attach, invalidation_bus
+from app.services.memory import memory_tracker
+from app.services.profiling import profile_store
+from app.services.task_cache import task_cache
+
+attach(task_cache, invalidation_bus)
+
 
-app = FastAPI(title="Busyness API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Per worker process, after any fork
+    if invalidation_bus is not None:
+        invalidation_bus.start()
+    yield
+    if invalidation_bus is not None:
+        invalidation_bus.stop()
+
+
+app = FastAPI(title="Busyness API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -16,8 +39,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.memory_tracking:
+    app.add_middleware(MemoryTrackingMiddleware, tracker=memory_tracker)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+    cache=compressed_cache,
+)
+
+configure_access_log()
+app.add_middleware(ServerTimingMiddleware, emit_header=settings.server_timing_enabled)
+
+# Only installed when a token is configured, so unflagged deployments pay nothing
+if settings.profiling_token:
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        token=settings.profiling_token,
+        max_concurrent=settings.profiling_max_concurrent,
+        interval_ms=settings.profiling_interval_ms,
+        max_seconds=settings.profiling_max_seconds,
+    )
+
 app.include_router(auth.router)
 app.include_router(tasks.router)
+app.include_router(admin.router)
 
 
 @app.get("/health")
@@ -0,0 +1,144 @@
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.compression import (
+    CompressedCache,
+    StreamCompressor,
+    body_digest,
+    compress,
+    compressible,
+    negotiate,
+)
+from app.services.concurrency import weak_etag
+from app.services.metrics import metrics
+
+# Bodies at least this large are compressed in a worker thread rather than on the event loop
+OFFLOAD_BYTES = 64 * 1024
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with gzip or brotli, whichever the client prefers.
+
+    Only compressible content types of at least `minimum_size` bytes are compressed;
+    smaller bodies gain little and cost a round of CPU. Responses that carry an ETag
+    are taken to repeat, and their compressed bodies are kept in `cache`, so a hit
+    skips the compression. Streamed bodies are compressed chunk by chunk and never
+    cached. A compressed body is not the bytes its ETag was made for, so the ETag is
+    made weak, on 304s too. Counted in `compressed_responses` by encoding and
+    `compression_bytes` by stage ("in" and "out").
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        gzip_level: int,
+        brotli_quality: int,
+        cache: CompressedCache | None = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: StreamCompressor | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                if message["status"] == 304 and "etag" in headers:
+                    MutableHeaders(scope=message)["etag"] = weak_etag(headers["etag"])
+                if "content-encoding" in headers or not compressible(headers.get("content-type", "")):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the body shows whether it is compressed
+                    start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                await self._send_chunk(send, compressor, body, more_body)
+                return
+
+            headers = MutableHeaders(scope=start)
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                compressor = StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+                del headers["content-length"]
+                headers["content-encoding"] = encoding
+                if "etag" in headers:
+                    headers["etag"] = weak_etag(headers["etag"])
+                metrics.increment("compressed_responses", encoding=encoding)
+                await send(start)
+                await self._send_chunk(send, compressor, body, more_body)
+            elif len(body) < self.minimum_size:
+                passthrough = True
+                await send(start)
+                await send(message)
+            else:
+                compressed = await self._compress(body, encoding, "etag" in headers)
+                headers["content-encoding"] = encoding
+                headers["content-length"] = str(len(compressed))
+                if "etag" in headers:
+                    headers["etag"] = weak_etag(headers["etag"])
+                metrics.increment("compressed_responses", encoding=encoding)
+                await send(start)
+                await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _compress(self, body: bytes, encoding: str, cacheable: bool) -> bytes:
+        metrics.increment("compression_bytes", len(body), stage="in")
+        digest = None
+        if cacheable and self.cache is not None:
+            digest = body_digest(body)
+            compressed = self.cache.get(digest, encoding)
+            if compressed is not None:
+                metrics.increment("compression_bytes", len(compressed), stage="out")
+                return compressed
+
+        if len(body) >= OFFLOAD_BYTES:
+            compressed = await anyio.to_thread.run_sync(
+                compress, body, encoding, self.gzip_level, self.brotli_quality
+            )
+        else:
+            compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+        metrics.increment("compression_bytes", len(compressed), stage="out")
+        if digest is not None:
+            self.cache.put(digest, encoding, compressed)
+        return compressed
+
+    async def _send_chunk(
+        self, send: Send, compressor: StreamCompressor, body: bytes, more_body: bool
+    ) -> None:
+        metrics.increment("compression_bytes", len(body), stage="in")
+        data = compressor.compress(body)
+        if not more_body:
+            data += compressor.finish()
+        metrics.increment("compression_bytes", len(data), stage="out")
+        await send({"type": "http.response.body", "body": data, "more_body": more_body})
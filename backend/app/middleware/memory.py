@@ -0,0 +1,50 @@
+import logging
+import tracemalloc
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.middleware.timing import route_template
+from app.services.memory import MemoryTracker
+from app.services.metrics import metrics
+from app.services.timing import current_timings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryTrackingMiddleware:
+    """
+    Measure the peak allocation of each request with tracemalloc.
+
+    The peak is recorded per route on the tracker, observed in the
+    `request_peak_memory_bytes` metric and added to the request's access log line.
+    Requests that overlap with others cannot be measured and are only counted, in
+    `request_peak_memory_skipped`. Must run inside ServerTimingMiddleware for the
+    access log to pick it up.
+    """
+
+    def __init__(self, app: ASGIApp, tracker: MemoryTracker):
+        self.app = app
+        self.tracker = tracker
+        tracker.start()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracemalloc.is_tracing():
+            await self.app(scope, receive, send)
+            return
+
+        token = self.tracker.begin()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            peak = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            route = route_template(scope)
+            if self.tracker.end(token):
+                self.tracker.record(route, peak)
+                metrics.observe("request_peak_memory_bytes", peak, route=route)
+                timings = current_timings()
+                if timings is not None:
+                    timings.peak_memory_bytes = peak
+            else:
+                metrics.increment("request_peak_memory_skipped", route=route)
@@ -0,0 +1,92 @@
+import hmac
+import logging
+import sys
+import threading
+from urllib.parse import parse_qs
+
+import anyio
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.profiling import ProfileStore, StackSampler, profiling_marker
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "profile"
+
+
+class ProfilingMiddleware:
+    """
+    Profile individual requests on demand.
+
+    A request is profiled when it carries the configured token in the `X-Profile`
+    header or the `profile` query parameter. At most `max_concurrent` requests are
+    profiled at a time; flagged requests over the limit are served unprofiled.
+    The stored profile's name is returned in the `X-Profile-Id` response header.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        token: str,
+        max_concurrent: int = 1,
+        interval_ms: float = 1.0,
+        max_seconds: float = 30.0,
+    ):
+        self.app = app
+        self.store = store
+        self.token = token.encode()
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.interval = interval_ms / 1000
+        self.max_seconds = max_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not self.slots.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            name = self.store.new_name(scope["method"], scope["path"])
+            sampler = StackSampler(name, sys._getframe(), self.interval, self.max_seconds)
+
+            async def send_with_profile_id(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-id", name.encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            marker_token = profiling_marker.set(name)
+            sampler.start()
+            try:
+                await self.app(scope, receive, send_with_profile_id)
+            finally:
+                sampler.stop()
+                profiling_marker.reset(marker_token)
+                title = f"{scope['method']} {scope['path']}"
+                # Off the event loop, and shielded so a disconnected client's profile is kept
+                with anyio.CancelScope(shield=True):
+                    await anyio.to_thread.run_sync(self._save, name, sampler, title)
+        finally:
+            self.slots.release()
+
+    def _save(self, name: str, sampler: StackSampler, title: str) -> None:
+        try:
+            self.store.save(name, sampler.to_speedscope(title))
+        except OSError:
+            logger.exception("Failed to store profile %s", name)
+
+    def _requested(self, scope: Scope) -> bool:
+        for key, value in scope["headers"]:
+            if key == PROFILE_HEADER:
+                return hmac.compare_digest(value, self.token)
+        query = scope.get("query_string", b"")
+        if PROFILE_QUERY_PARAM.encode() not in query:
+            return False
+        values = parse_qs(query.decode()).get(PROFILE_QUERY_PARAM, [])
+        return any(hmac.compare_digest(v.encode(), self.token) for v in values)
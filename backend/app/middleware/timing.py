@@ -0,0 +1,108 @@
+import json
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services import timing
+from app.services.timing import RequestTimings
+
+access_logger = logging.getLogger("app.access")
+
+# "build" is making response dicts; "serialize" is JSON encoding, which is only timed
+# where the route encodes its own body: FastAPI's response_model encoding is not
+SERVER_TIMING_PHASES = ("auth", "db", "scoring", "build", "serialize")
+
+
+def server_timing_header(timings: RequestTimings, total: float) -> str:
+    """Format timings as a Server-Timing header value (durations in milliseconds)."""
+    entries = []
+    for name in SERVER_TIMING_PHASES:
+        seconds = timings.phases.get(name)
+        if seconds is None:
+            continue
+        entry = f"{name};dur={seconds * 1000:.2f}"
+        if name == "db":
+            entry += f';desc="{timings.db_count} queries"'
+        entries.append(entry)
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """
+    Collect per-request phase timings.
+
+    Adds a `Server-Timing` header to every HTTP response when `emit_header` is set,
+    and writes one JSON line per request to the `app.access` logger with the same
+    numbers so they can be aggregated offline.
+    """
+
+    def __init__(self, app: ASGIApp, emit_header: bool = True):
+        self.app = app
+        self.emit_header = emit_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        token = timing.start_request(scope)
+        timings = timing.current_timings()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.emit_header:
+                    header = server_timing_header(timings, time.perf_counter() - start)
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", header.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            timing.end_request(token)
+            if access_logger.isEnabledFor(logging.INFO):
+                access_logger.info(
+                    json.dumps(
+                        access_log_record(scope, status_code, timings, time.perf_counter() - start)
+                    )
+                )
+
+
+def route_template(scope: Scope) -> str:
+    """Return the matched route's path template, falling back to the raw path."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope["path"]
+
+
+def access_log_record(scope: Scope, status_code: int, timings: RequestTimings, total: float) -> dict:
+    record = {
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": route_template(scope),
+        "status": status_code,
+        "user_id": timings.user_id,
+        "total_ms": round(total * 1000, 3),
+        "db_count": timings.db_count,
+    }
+    for name, seconds in timings.phases.items():
+        record[f"{name}_ms"] = round(seconds * 1000, 3)
+    if timings.peak_memory_bytes is not None:
+        record["peak_memory_bytes"] = timings.peak_memory_bytes
+    return record
+
+
+def configure_access_log() -> None:
+    """Give the access logger its own handler so it is emitted under uvicorn's logging setup."""
+    if access_logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    access_logger.addHandler(handler)
+    access_logger.setLevel(logging.INFO)
@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import String, Text, Float, Integer, DateTime, ForeignKey, Enum, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.task import TaskType
+
+
+class ArchivedTask(Base):
+    """
+    Completed ending tasks moved out of `tasks` by the archive job.
+
+    Mirrors the task columns (ids are kept) so archived rows serialize like tasks.
+    """
+
+    __tablename__ = "archived_tasks"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    task_type: Mapped[TaskType] = mapped_column(Enum(TaskType), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=True)
+    impact: Mapped[float] = mapped_column(Float, nullable=False)
+    initial_impact: Mapped[float | None] = mapped_column(Float, nullable=True)
+    effort: Mapped[float] = mapped_column(Float, nullable=False)
+    not_doing_hourly_rate: Mapped[float] = mapped_column(Float, nullable=False)
+    doing_hourly_rate: Mapped[float | None] = mapped_column(Float, nullable=True)
+    impact_set_to: Mapped[float | None] = mapped_column(Float, nullable=True)
+    deadline: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_updated: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    completed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    change_seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+    __table_args__ = (
+        Index("ix_archived_tasks_user_completed", "user_id", "completed_at", "id"),
+        Index("ix_archived_tasks_user_change", "user_id", "change_seq", "id"),
+    )
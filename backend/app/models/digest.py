@@ -0,0 +1,29 @@
+from datetime import date, datetime, timezone
+
+from sqlalchemy import Date, DateTime, Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class TaskDigest(Base):
+    """
+    One of a user's top tasks by priority score on a day, for the daily digest.
+
+    Written by `app.cli.digest` on the user's shard and rebuilt, never updated; the
+    scored tasks themselves are left untouched. Digests of users who move shards stay
+    behind until they are pruned, and the next run writes them on the new shard.
+    """
+
+    __tablename__ = "task_digests"
+
+    digest_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # 1 for the highest priority task
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True)
+    task_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    priority_score: Mapped[float] = mapped_column(Float, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from enum import Enum as PyEnum
 
-from sqlalchemy import String, Text, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import DDL, String, Text, Float, Integer, DateTime, ForeignKey, Enum, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -26,9 +26,12 @@ class Task(Base):
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=True)  # Nullable for migration
     user: Mapped["User"] = relationship("User", back_populates="tasks")
 
-    # Current impact value (0-10), updated on each fetch and activity log
+    # Impact value (0-10) as of last_updated; it grows from there until the next write
     impact: Mapped[float] = mapped_column(Float, nullable=False, default=5.0)
 
+    # Impact at creation, the starting point for replaying the impact history
+    initial_impact: Mapped[float | None] = mapped_column(Float, nullable=True)
+
     # Effort in hours to accomplish this task
     effort: Mapped[float] = mapped_column(Float, nullable=False, default=1.0)
 
@@ -63,6 +66,22 @@ class Task(Base):
         "TaskLog", back_populates="task", cascade="all, delete-orphan"
     )
 
+    # Row version for optimistic concurrency: every UPDATE is issued as
+    # "... WHERE id = ? AND version = ?" and bumps it, raising StaleDataError on conflict
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
+    # The owner's change_seq as of the last write to this task
+    change_seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        # Keyset pagination of completed tasks
+        Index("ix_tasks_user_completed", "user_id", "completed_at", "id"),
+        # Changes since a sequence number
+        Index("ix_tasks_user_change", "user_id", "change_seq", "id"),
+    )
+
     @property
     def is_completed(self) -> bool:
         return self.completed_at is not None
@@ -80,5 +99,63 @@ class TaskLog(Base):
     )
     duration_minutes: Mapped[int] = mapped_column(nullable=False)
 
+    # Copied from the task so a user's new logs can be found without going through tasks
+    user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # The owner's change_seq of the write that added the log
+    change_seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
     # Relationship back to task
     task: Mapped["Task"] = relationship("Task", back_populates="logs")
+
+    __table_args__ = (
+        # Keyset pagination of a task's logs
+        Index("ix_task_logs_task_logged", "task_id", "logged_at", "id"),
+        # Changes since a sequence number
+        Index("ix_task_logs_user_change", "user_id", "change_seq", "id"),
+    )
+
+
+# Full-text search over title and description, maintained by the database itself: a
+# tsvector column set by a trigger with a GIN index on Postgres, and on SQLite an
+# external-content FTS5 table kept in sync by triggers. Neither is mapped on Task.
+# `{row}` is the row prefix: "NEW." in the trigger, nothing in a plain UPDATE.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}description, '')), 'B')"
+)
+
+_postgres_search_ddl = [
+    "ALTER TABLE tasks ADD COLUMN search_vector tsvector",
+    "CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$ BEGIN "
+    f"NEW.search_vector := {SEARCH_VECTOR_SQL.format(row='NEW.')}; RETURN NEW; "
+    "END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER tasks_search_vector BEFORE INSERT OR UPDATE OF title, description "
+    "ON tasks FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()",
+    "CREATE INDEX ix_tasks_search_vector ON tasks USING GIN (search_vector)",
+]
+
+_sqlite_search_ddl = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, coalesce(new.description, '')); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, coalesce(old.description, '')); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, coalesce(old.description, '')); "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, coalesce(new.description, '')); END",
+]
+
+for statement in _postgres_search_ddl:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in _sqlite_search_ddl:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Task.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"),
+)
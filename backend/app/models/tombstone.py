@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class TaskTombstone(Base):
+    """
+    Record of a deleted task, so clients syncing changes learn about the deletion.
+
+    Kept for `tombstone_retention_days`; compacting them raises the owner's
+    `sync_floor_seq`.
+    """
+
+    __tablename__ = "task_tombstones"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    task_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    change_seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+    __table_args__ = (
+        Index("ix_task_tombstones_user_change", "user_id", "change_seq", "id"),
+        Index("ix_task_tombstones_deleted_at", "deleted_at"),
+    )
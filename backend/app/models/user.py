@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import String, DateTime, Boolean
+from sqlalchemy import String, DateTime, Boolean, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -17,6 +17,25 @@ class User(Base):
         DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
     )
 
+    # Shard holding the user's tasks and logs (see app.database.ShardRouter). On a shard's
+    # copy of the row, the shard itself: writes check it, so a user who moved away
+    # cannot write to the old shard
+    shard: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    # Sequence number of the user's latest write, stamped on every changed task, log and
+    # tombstone so clients can fetch what changed since a point (see app.services.sync)
+    change_seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # When change_seq was last taken: reads stay on the primary for a while after it
+    # (see app.database.ReplicaRouter)
+    last_write_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Highest change_seq whose tombstones may have been compacted away; clients that
+    # last synced before it have to start over
+    sync_floor_seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    # Priority scoring model picked by the user (see app.services.priority); None for
+    # the configured default
+    scoring_model: Mapped[str | None] = mapped_column(String(32), nullable=True)
+
     # Relationship to tasks (we will update Task model next)
     tasks: Mapped[list["Task"]] = relationship(
         "Task", back_populates="user", cascade="all, delete-orphan"
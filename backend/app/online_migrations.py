@@ -0,0 +1,222 @@
+"""
+Helpers for migrations that run while the app keeps serving.
+
+Plain `op.create_index`, `op.create_foreign_key` and the like hold locks that block
+writes (or all access) to the table for as long as they scan it. The helpers here
+do the same work in ways that only take brief locks on Postgres:
+
+- `create_index_concurrently` / `drop_index_concurrently`, outside the migration's
+  transaction
+- `add_foreign_key` and `add_check_constraint`, added NOT VALID and validated
+  separately, which scans without blocking writes
+- `set_not_null`, by way of a validated CHECK so the final ALTER does not scan
+- `backfill`, an UPDATE in committed, throttled batches
+
+On other databases they fall back to the plain operations. `alembic/env.py` runs
+each migration in its own transaction with `lock_timeout` set, so a migration that
+queues behind a long query fails fast instead of blocking writers behind it, and
+retries. `python -m app.cli.check_migrations` flags migrations that skip these.
+"""
+import time
+
+from alembic import op
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+# SQLSTATE of "could not obtain lock" (lock_not_available), raised when lock_timeout expires
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def set_lock_timeout(connection: Connection, seconds: float) -> None:
+    """Make statements on `connection` give up waiting for a lock after `seconds`."""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(f"SET lock_timeout = '{int(seconds * 1000)}ms'"))
+
+
+def is_lock_timeout(exc: OperationalError) -> bool:
+    return getattr(exc.orig, "pgcode", None) == LOCK_NOT_AVAILABLE
+
+
+def _index_validity(bind: Connection, name: str) -> bool | None:
+    """Whether the index `name` is valid; None when it does not exist."""
+    return bind.execute(
+        text(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name"
+        ),
+        {"name": name},
+    ).scalar()
+
+
+def _partitions(bind: Connection, table: str) -> list[str] | None:
+    """Names of the partitions of `table`; None when it is not partitioned."""
+    if bind.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar() != "p":
+        return None
+    return bind.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+        ),
+        {"table": table},
+    ).scalars().all()
+
+
+def _build_index(bind: Connection, name: str, table: str, definition: str) -> None:
+    valid = _index_validity(bind, name)
+    if valid:
+        return
+    if valid is not None:
+        bind.execute(text(f"DROP INDEX CONCURRENTLY {name}"))
+    bind.execute(text(f"CREATE {definition.format(name=name, table=table)}"))
+
+
+def create_index_concurrently(
+    name: str,
+    table: str,
+    columns: list[str],
+    unique: bool = False,
+    where: str | None = None,
+    using: str | None = None,
+) -> None:
+    """
+    Build an index (of the `using` method, e.g. "gin") without blocking writes to `table`. On Postgres this commits the
+    migration's transaction so far, since CONCURRENTLY cannot run inside one. An
+    invalid index left by an interrupted build is dropped and rebuilt.
+
+    Partitioned tables cannot build an index concurrently, so the index is created on
+    the parent alone (instant, and invalid until complete), built concurrently on
+    each partition and attached. Partitions created later get it automatically.
+    """
+    if not _is_postgres():
+        op.create_index(name, table, columns, unique=unique)
+        return
+    predicate = f" WHERE {where}" if where else ""
+    method = f"USING {using} " if using else ""
+    definition = (
+        f"{'UNIQUE ' if unique else ''}INDEX CONCURRENTLY {{name}} "
+        f"ON {{table}} {method}({', '.join(columns)}){predicate}"
+    )
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        partitions = _partitions(bind, table)
+        if partitions is None:
+            _build_index(bind, name, table, definition)
+            return
+        if _index_validity(bind, name):
+            return
+        bind.execute(
+            text(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} "
+                f"ON ONLY {table} {method}({', '.join(columns)}){predicate}"
+            )
+        )
+        for partition in partitions:
+            # The name Postgres itself gives the indexes it creates on new partitions
+            child = f"{partition}_{'_'.join(columns)}_idx"
+            _build_index(bind, child, partition, definition)
+            # Attaching the last partition's index makes the parent's valid
+            bind.execute(text(f"ALTER INDEX {name} ATTACH PARTITION {child}"))
+
+
+def drop_index_concurrently(name: str, table: str) -> None:
+    if not _is_postgres():
+        op.drop_index(name, table_name=table)
+        return
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def validate_constraint(table: str, name: str) -> None:
+    """
+    Check existing rows against a NOT VALID constraint. Takes a lock that lets reads
+    and writes continue, in its own transaction so the ADD's stronger lock is gone.
+    """
+    if not _is_postgres():
+        return
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+
+def add_foreign_key(
+    name: str,
+    source: str,
+    referent: str,
+    local_columns: list[str],
+    remote_columns: list[str],
+    ondelete: str | None = None,
+) -> None:
+    """Add a foreign key NOT VALID, which only checks new rows, then validate it."""
+    if not _is_postgres():
+        op.create_foreign_key(name, source, referent, local_columns, remote_columns, ondelete=ondelete)
+        return
+    on_delete = f" ON DELETE {ondelete}" if ondelete else ""
+    op.execute(
+        f"ALTER TABLE {source} ADD CONSTRAINT {name} FOREIGN KEY ({', '.join(local_columns)}) "
+        f"REFERENCES {referent} ({', '.join(remote_columns)}){on_delete} NOT VALID"
+    )
+    validate_constraint(source, name)
+
+
+def add_check_constraint(name: str, table: str, condition: str) -> None:
+    """Add a CHECK constraint NOT VALID, then validate it."""
+    if not _is_postgres():
+        op.create_check_constraint(name, table, condition)
+        return
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} CHECK ({condition}) NOT VALID")
+    validate_constraint(table, name)
+
+
+def set_not_null(table: str, column: str) -> None:
+    """
+    Make `column` NOT NULL without the full scan under an ACCESS EXCLUSIVE lock that
+    ALTER COLUMN ... SET NOT NULL does: Postgres skips the scan when a validated
+    CHECK already proves it. Existing NULLs must be backfilled first.
+    """
+    if not _is_postgres():
+        op.alter_column(table, column, nullable=False)
+        return
+    check = f"{table}_{column}_not_null"
+    add_check_constraint(check, table, f"{column} IS NOT NULL")
+    op.alter_column(table, column, nullable=False)
+    op.drop_constraint(check, table, type_="check")
+
+
+def backfill(
+    table: str,
+    assignments: str,
+    where: str,
+    batch_size: int = 1000,
+    pause_seconds: float = 0.1,
+    key: str = "id",
+) -> int:
+    """
+    `UPDATE table SET assignments WHERE where`, in batches of `batch_size` rows
+    walked in `key` order, each committed on its own so row locks are held briefly
+    and replicas keep up. Sleeps `pause_seconds` between batches. Safe to rerun: rows
+    already updated should no longer match `where`. Returns the number updated.
+    """
+    statement = text(
+        f"UPDATE {table} SET {assignments} WHERE {key} IN ("
+        f"SELECT {key} FROM {table} WHERE {key} > :after AND ({where}) "
+        f"ORDER BY {key} LIMIT :batch_size) RETURNING {key}"
+    )
+    updated = 0
+    with op.get_context().autocommit_block():
+        # Every statement commits on its own in here
+        bind = op.get_bind()
+        after = bind.execute(text(f"SELECT min({key}) - 1 FROM {table}")).scalar()
+        while after is not None:
+            keys = bind.execute(statement, {"after": after, "batch_size": batch_size}).scalars().all()
+            if not keys:
+                break
+            updated += len(keys)
+            after = max(keys)
+            time.sleep(pause_seconds)
+    return updated
@@ -65,9 +65,80 @@ class TaskResponse(TaskBase):
     last_updated: datetime
     completed_at: datetime | None = None
     priority_score: float = 0.0
+    version: int = 1
 
     model_config = {"from_attributes": True}
 
 
 class TaskWithLogsResponse(TaskResponse):
     logs: list[TaskLogResponse] = []
+
+
+class TaskLogPage(BaseModel):
+    items: list[TaskLogResponse]
+    next_cursor: str | None = Field(default=None, description="Pass as `cursor` to get the next page")
+
+
+class TaskPage(BaseModel):
+    items: list[TaskResponse]
+    next_cursor: str | None = Field(default=None, description="Pass as `cursor` to get the next page")
+
+
+class TaskChanges(BaseModel):
+    tasks: list[TaskResponse] = Field(..., description="Tasks created or modified, in their current state")
+    logs: list[TaskLogResponse] = Field(..., description="Logs added")
+    deleted: list[int] = Field(..., description="Ids of deleted tasks")
+    next_cursor: str = Field(..., description="Pass as `since` to get the changes after these")
+    has_more: bool = Field(..., description="More changes are waiting; fetch again right away")
+
+
+class TaskSearchResult(TaskResponse):
+    relevance: float = Field(..., description="Text relevance in [0, 1]")
+    score: float = Field(..., description="Relevance blended with the priority score, in [0, 1]")
+
+
+class TaskSearchPage(BaseModel):
+    items: list[TaskSearchResult]
+    next_cursor: str | None = Field(default=None, description="Pass as `cursor` to get the next page")
+
+
+class ForecastEntry(BaseModel):
+    task_id: int
+    score: float
+
+
+class ForecastStep(BaseModel):
+    at: datetime
+    top: list[ForecastEntry]
+
+
+class ForecastCrossover(BaseModel):
+    at: datetime
+    rank: int = Field(..., description="1-based rank taken over by task_id")
+    task_id: int
+    previous_task_id: int
+
+
+class ForecastResponse(BaseModel):
+    start: datetime
+    step_seconds: float
+    steps: list[ForecastStep]
+    crossovers: list[ForecastCrossover]
+
+
+class ImpactPoint(BaseModel):
+    at: datetime
+    impact: float
+
+
+class ImpactHistoryResponse(BaseModel):
+    task_id: int
+    points: list[ImpactPoint]
+
+
+class PlanResponse(BaseModel):
+    hours: float
+    method: str = Field(..., description="exact or greedy")
+    total_effort: float
+    total_score: float
+    tasks: list[TaskResponse]
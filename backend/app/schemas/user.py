@@ -13,9 +13,15 @@ class UserLogin(UserBase):
     password: str
 
 
+class UserUpdate(BaseModel):
+    # A name from app.services.priority.SCORING_MODELS, or None for the default
+    scoring_model: str | None = None
+
+
 class UserResponse(UserBase):
     id: int
     is_active: bool
+    scoring_model: str | None = None
 
     model_config = {"from_attributes": True}
 
@@ -0,0 +1,104 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import delete, exists, insert, literal, select, text
+from sqlalchemy.orm import Session
+
+from app.models.archive import ArchivedTask
+from app.models.task import Task, TaskLog, TaskType
+from app.services.pagination import keyset_query
+
+# Columns copied from `tasks` into `archived_tasks`
+ARCHIVED_COLUMNS = [column.name for column in Task.__table__.columns]
+
+
+def archive_completed_tasks(
+    db: Session, older_than: timedelta, batch_size: int, now: datetime | None = None
+) -> int:
+    """
+    Move ending tasks completed before `now - older_than` into `archived_tasks`.
+
+    Works in batches of `batch_size`, each an INSERT ... SELECT and a DELETE committed
+    together, so the job can be interrupted and rerun at any point. Tasks with logs are
+    left alone, since their logs reference the hot table. Returns the number moved.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - older_than
+    moved = 0
+    while True:
+        ids = db.scalars(
+            select(Task.id)
+            .where(Task.completed_at < cutoff, Task.task_type == TaskType.ENDING)
+            .where(~exists().where(TaskLog.task_id == Task.id))
+            .order_by(Task.completed_at)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            return moved
+
+        db.execute(
+            insert(ArchivedTask).from_select(
+                [*ARCHIVED_COLUMNS, "archived_at"],
+                select(*(Task.__table__.c[name] for name in ARCHIVED_COLUMNS), literal(now))
+                .where(Task.id.in_(ids)),
+            )
+        )
+        db.execute(delete(Task).where(Task.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
+
+
+def completed_page(
+    db: Session,
+    user_id: int,
+    limit: int,
+    after: tuple[datetime, int] | None,
+    columns: list[str] | None = None,
+):
+    """
+    One page of a user's completed tasks, newest first, from the hot table and the
+    archive together.
+
+    Each table is read with the same keyset query (served by the (user_id,
+    completed_at, id) indexes) and the two results merged, so the cost of a page does
+    not depend on how deep it is. Returns up to `limit + 1` rows, like `keyset_query`:
+    tasks, or plain rows of just `columns` (which must include completed_at and id).
+    """
+    rows = []
+    for model in (Task, ArchivedTask):
+        if columns is None:
+            query = select(model)
+        else:
+            query = select(*(model.__table__.c[name] for name in columns))
+        query = query.where(model.user_id == user_id, model.completed_at.is_not(None))
+        query = keyset_query(query, model.completed_at, model.id, limit, after)
+        rows.extend(db.scalars(query) if columns is None else db.execute(query))
+    rows.sort(key=lambda row: (row.completed_at, row.id), reverse=True)
+    return rows[: limit + 1]
+
+
+def log_partition_name(month: date) -> str:
+    return f"task_logs_{month:%Y_%m}"
+
+
+def ensure_log_partitions(db: Session, months_ahead: int, today: date | None = None) -> list[str]:
+    """
+    Create the monthly `task_logs` partitions from this month to `months_ahead` months
+    out. Postgres only; returns the names of the partitions that were created.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    month = today.replace(day=1)
+    created = []
+    for _ in range(months_ahead + 1):
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        name = log_partition_name(month)
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+            db.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF task_logs "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+                )
+            )
+            created.append(name)
+        month = next_month
+    db.commit()
+    return created
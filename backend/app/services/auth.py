@@ -1,36 +1,41 @@
 from datetime import datetime, timedelta, timezone
+from functools import cache
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from google.auth.transport import requests
-from google.oauth2 import id_token
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
-from app.config import Settings
-from app.database import get_db
+from app.config import settings
+from app.database import get_user_db
 from app.models.user import User
 from app.schemas.user import TokenData
-
-settings = Settings()
+from app.services.timing import current_timings, phase
 
 # Secret key and algorithm for JWT
 SECRET_KEY = settings.jwt_secret
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 
+@cache
+def get_pwd_context():
+    # passlib and bcrypt are only needed by login and registration, so they are
+    # imported on first use instead of on every worker start
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
@@ -45,6 +50,10 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
 
 
 def verify_google_token(token: str):
+    # google-auth pulls in requests and urllib3; imported lazily to keep cold start fast
+    from google.auth.transport import requests
+    from google.oauth2 import id_token
+
     try:
         # Verify the token using Google's libraries
         id_info = id_token.verify_oauth2_token(token, requests.Request())
@@ -53,22 +62,36 @@ def verify_google_token(token: str):
         return None
 
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)):
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_user_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+    with phase("auth"):
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            email: str = payload.get("sub")
+            if email is None:
+                raise credentials_exception
+            token_data = TokenData(email=email)
+        except JWTError:
             raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.email == token_data.email).first()
-    if user is None:
-        raise credentials_exception
+
+        user = db.query(User).filter(User.email == token_data.email).first()
+        if user is None:
+            raise credentials_exception
+
+    timings = current_timings()
+    if timings is not None:
+        timings.user_id = user.id
     return user
+
+
+def get_current_admin(current_user: User = Depends(get_current_user)):
+    if current_user.email not in settings.admin_emails:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return current_user
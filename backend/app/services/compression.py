@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from app.config import settings
+from app.services.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
+
+# In server preference order, for clients that accept several equally
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def negotiate(accept_encoding: str, available: tuple[str, ...] = ENCODINGS) -> str | None:
+    """
+    The encoding to use for an Accept-Encoding header value: the available one with
+    the highest q-value, ties going to the earlier in `available`. None for identity.
+    """
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in available:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compressible(content_type: str) -> bool:
+    # Event streams must reach the client as they are written, not as compressor blocks
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(
+        "text/event-stream"
+    )
+
+
+def compress(data: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    # mtime=0 keeps the output a function of the input
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compression of a response body that arrives in several chunks."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._compressor.process
+            self._flush = self._compressor.finish
+        else:
+            # wbits 16 + 15: gzip header and trailer
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = self._compressor.compress
+            self._flush = self._compressor.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._flush()
+
+
+def body_digest(body: bytes) -> bytes:
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class CompressedCache:
+    """
+    LRU of compressed response bodies, bounded by total bytes.
+
+    Keyed by a digest of the uncompressed body and the encoding, so an entry can only
+    ever be served for exactly the bytes it was made from, whichever route or user
+    produced them. Hits and misses are counted in `compression_cache`.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[bytes, str], bytes] = OrderedDict()
+        self._bytes = 0
+
+    def get(self, digest: bytes, encoding: str) -> bytes | None:
+        with self._lock:
+            compressed = self._entries.get((digest, encoding))
+            if compressed is not None:
+                self._entries.move_to_end((digest, encoding))
+        metrics.increment("compression_cache", result="hit" if compressed is not None else "miss")
+        return compressed
+
+    def put(self, digest: bytes, encoding: str, compressed: bytes) -> None:
+        if len(compressed) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop((digest, encoding), None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[(digest, encoding)] = compressed
+            self._bytes += len(compressed)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+            metrics.set_gauge("compression_cache_bytes", self._bytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+compressed_cache = CompressedCache(settings.compression_cache_max_bytes)
@@ -0,0 +1,83 @@
+import random
+import time
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.config import settings
+from app.services.metrics import metrics
+
+T = TypeVar("T")
+
+# Upper bound of the randomized sleep before the first retry, doubled for each further one
+RETRY_BACKOFF_SECONDS = 0.01
+
+
+class PreconditionFailed(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Task has been modified, reload it and try again",
+        )
+
+
+def commit_with_retry(db: Session, operation: Callable[[], T], attempts: int | None = None) -> T:
+    """
+    Run a read-modify-write operation and commit it, retrying on version conflicts.
+
+    `operation` must (re)load the rows it changes, since a conflict rolls the session
+    back and expires everything before the next attempt. Retries back off with jitter
+    so that colliding writers spread out. Raises 409 once the attempts are exhausted.
+    """
+    attempts = attempts or settings.optimistic_retry_attempts
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(random.uniform(0, RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)))
+        try:
+            result = operation()
+            db.commit()
+            return result
+        except StaleDataError:
+            db.rollback()
+            metrics.increment("optimistic_conflicts")
+    metrics.increment("optimistic_conflicts_exhausted")
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Task is being modified concurrently, please retry",
+    )
+
+
+def parse_if_match(header: str | None) -> set[int] | None:
+    """Return the versions listed in an If-Match header, or None when any version matches."""
+    if header is None or header.strip() == "*":
+        return None
+    versions = set()
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag.isdigit():
+            versions.add(int(tag))
+    return versions
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def weak_etag(tag: str) -> str:
+    return tag if tag.startswith("W/") else f"W/{tag}"
+
+
+def none_match(header: str | None, tag: str) -> bool:
+    """
+    Whether an If-None-Match header value names `tag`. The comparison is weak, as RFC
+    9110 has it for If-None-Match, so a compressed body's weak ETag still matches.
+    """
+    if header is None:
+        return False
+    opaque = tag.removeprefix("W/")
+    return any(
+        candidate.strip() == "*" or candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
@@ -0,0 +1,302 @@
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Callable, Iterator, Sequence
+
+import numpy as np
+from sqlalchemy import Engine, Row, create_engine, delete, func, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.database import ShardRouter, engine_options, shard_router
+from app.models.digest import TaskDigest
+from app.models.task import Task
+from app.models.user import User
+from app.services.forecast import utc_timestamp
+from app.services.priority import priority_scores, scoring_model
+
+# Task columns a digest is scored from
+DIGEST_COLUMNS = (
+    "user_id",
+    "id",
+    "title",
+    "impact",
+    "effort",
+    "not_doing_hourly_rate",
+    "deadline",
+    "last_updated",
+)
+
+# Engines of worker processes, by database URL
+_engines: dict[str, Engine] = {}
+
+
+def top_tasks(
+    rows: list, k: int, now: datetime, models: dict[int, str] | None = None
+) -> list[tuple]:
+    """
+    Each user's `k` highest priority tasks at `now` among `rows` (of `DIGEST_COLUMNS`),
+    as (user_id, rank, task_id, title, priority_score) with rank 1 the highest. Ties
+    go to the lower task id. Users in `models` are scored with the scoring model
+    named there, the rest with the default one.
+    """
+    count = len(rows)
+    if not count:
+        return []
+    user_ids = np.fromiter((row.user_id for row in rows), dtype=np.int64, count=count)
+    ids = np.fromiter((row.id for row in rows), dtype=np.int64, count=count)
+    inputs = (
+        np.fromiter((row.impact for row in rows), dtype=np.float64, count=count),
+        np.fromiter((row.not_doing_hourly_rate for row in rows), dtype=np.float64, count=count),
+        np.fromiter((row.effort for row in rows), dtype=np.float64, count=count),
+        np.fromiter(
+            (utc_timestamp(row.deadline) if row.deadline else np.nan for row in rows),
+            dtype=np.float64,
+            count=count,
+        ),
+        np.fromiter(
+            (utc_timestamp(row.last_updated) for row in rows), dtype=np.float64, count=count
+        ),
+    )
+    default = scoring_model()
+    chosen = {user_id: scoring_model(name) for user_id, name in (models or {}).items()}
+    if all(model is default for model in chosen.values()):
+        _, priorities = priority_scores(*inputs, utc_timestamp(now), default)
+    else:
+        # One batch per model in use
+        names = np.array([chosen.get(user_id, default).name for user_id in user_ids.tolist()])
+        priorities = np.empty(count)
+        for name in np.unique(names).tolist():
+            chunk = names == name
+            _, priorities[chunk] = priority_scores(
+                *(column[chunk] for column in inputs), utc_timestamp(now), scoring_model(name)
+            )
+
+    # By user, then priority descending; a task's rank is its offset from its user's first
+    order = np.lexsort((ids, -priorities, user_ids))
+    users = user_ids[order]
+    starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+    ranks = np.arange(count) - np.repeat(starts, np.diff(np.r_[starts, count]))
+    kept = ranks < k
+    return [
+        (int(user_ids[i]), rank + 1, int(ids[i]), rows[i].title, float(priorities[i]))
+        for i, rank in zip(order[kept].tolist(), ranks[kept].tolist())
+    ]
+
+
+def score_users(
+    db: Session,
+    first_user_id: int,
+    last_user_id: int,
+    k: int,
+    now: datetime,
+    models: dict[int, str] | None = None,
+) -> tuple[int, list[tuple]]:
+    """
+    Top `k` active tasks of the users with ids from `first_user_id` to `last_user_id`,
+    read without locking or changing them, each user's scored with their model in
+    `models` if any. Returns (tasks scored, `top_tasks` rows).
+    """
+    rows = db.execute(
+        select(*(Task.__table__.c[name] for name in DIGEST_COLUMNS)).where(
+            Task.user_id.between(first_user_id, last_user_id), Task.completed_at.is_(None)
+        )
+    ).all()
+    return len(rows), top_tasks(rows, k, now, models)
+
+
+def _score_chunk(
+    url: str,
+    first_user_id: int,
+    last_user_id: int,
+    k: int,
+    now: datetime,
+    models: dict[int, str],
+):
+    # Runs in a worker process, which keeps one engine per shard
+    if url not in _engines:
+        _engines[url] = create_engine(url, **engine_options(url))
+    with Session(_engines[url]) as db:
+        return score_users(db, first_user_id, last_user_id, k, now, models)
+
+
+def _user_chunks(engine: Engine, shard: int, after: int, chunk_size: int) -> Iterator[Sequence[Row]]:
+    """
+    (id, scoring_model) of the users on `shard` past `after`, ascending by id,
+    `chunk_size` at a time, from the directory (the primary's `users`) on `engine`.
+    """
+    query = (
+        select(User.id, User.scoring_model)
+        .where(User.shard == shard, User.id > after)
+        .order_by(User.id)
+    )
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            result = connection.execution_options(
+                stream_results=True, yield_per=chunk_size
+            ).execute(query)
+            yield from result.partitions()
+        return
+
+    # SQLite has no server-side cursors, and a statement left open would block the
+    # digest writes, so read it in keyset pages instead
+    with engine.connect() as connection:
+        while True:
+            users = connection.execute(query.where(User.id > after).limit(chunk_size)).all()
+            connection.rollback()
+            if not users:
+                return
+            yield users
+            after = users[-1].id
+
+
+def resume_point(db: Session, digest_date: date) -> int:
+    """Highest user id with a digest on `digest_date`; every user up to it is done."""
+    return db.scalar(
+        select(func.coalesce(func.max(TaskDigest.user_id), 0)).where(
+            TaskDigest.digest_date == digest_date
+        )
+    )
+
+
+@dataclass
+class DigestStats:
+    users: int = 0
+    tasks: int = 0
+    digests: int = 0
+    seconds: float = 0.0
+
+    @property
+    def users_per_second(self) -> float:
+        return self.users / self.seconds if self.seconds else 0.0
+
+    @property
+    def tasks_per_second(self) -> float:
+        return self.tasks / self.seconds if self.seconds else 0.0
+
+
+def _write(
+    db: Session,
+    digest_date: date,
+    user_ids: list[int],
+    scored: tuple[int, list[tuple]],
+    now: datetime,
+    stats: DigestStats,
+) -> None:
+    task_count, rows = scored
+    # Replaces whatever an interrupted run left for these users
+    db.execute(
+        delete(TaskDigest).where(
+            TaskDigest.digest_date == digest_date,
+            TaskDigest.user_id.between(user_ids[0], user_ids[-1]),
+        )
+    )
+    if rows:
+        db.execute(
+            insert(TaskDigest),
+            [
+                {
+                    "digest_date": digest_date,
+                    "user_id": user_id,
+                    "rank": rank,
+                    "task_id": task_id,
+                    "title": title,
+                    "priority_score": score,
+                    "computed_at": now,
+                }
+                for user_id, rank, task_id, title, score in rows
+            ],
+        )
+    db.commit()
+    stats.users += len(user_ids)
+    stats.tasks += task_count
+    stats.digests += len(rows)
+
+
+def build_digests(
+    digest_date: date,
+    k: int,
+    chunk_size: int,
+    workers: int = 0,
+    restart: bool = False,
+    now: datetime | None = None,
+    router: ShardRouter = shard_router,
+    progress: Callable[[int, DigestStats], None] | None = None,
+) -> DigestStats:
+    """
+    Write every user's top `k` active tasks at `now` into `task_digests` for
+    `digest_date`, shard by shard.
+
+    Users are streamed from the directory in id order (a server-side cursor on
+    Postgres) in chunks of `chunk_size`, along with their scoring model. Each chunk
+    is scored in one of `workers` processes (in this process when 0), which reads
+    the chunk's tasks itself; this process writes the results in chunk order, one
+    committed transaction per chunk, with at most two chunks per worker in flight.
+    Memory stays bounded by the chunk size whatever the number of users. An
+    interrupted run resumes after the last user with a digest for the day unless
+    `restart` is set. `progress` is called with the shard and the running totals
+    after every chunk.
+    """
+    now = now or datetime.now(timezone.utc)
+    stats = DigestStats()
+    started = time.monotonic()
+
+    def finish(db: Session, shard: int, user_ids: list[int], scored: tuple[int, list[tuple]]):
+        _write(db, digest_date, user_ids, scored, now, stats)
+        stats.seconds = time.monotonic() - started
+        if progress:
+            progress(shard, stats)
+
+    pool = None
+    if workers:
+        # Spawned, so workers inherit no connections or threads of this process
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        for shard, engine in enumerate(router.engines):
+            url = engine.url.render_as_string(hide_password=False)
+            db = router.session(shard)
+            try:
+                after = 0 if restart else resume_point(db, digest_date)
+                db.rollback()
+                pending: deque[tuple[list[int], Future]] = deque()
+                for users in _user_chunks(router.engines[0], shard, after, chunk_size):
+                    user_ids = [user.id for user in users]
+                    first, last = user_ids[0], user_ids[-1]
+                    models = {user.id: user.scoring_model for user in users if user.scoring_model}
+                    if pool is None:
+                        finish(db, shard, user_ids, score_users(db, first, last, k, now, models))
+                        continue
+                    pending.append(
+                        (user_ids, pool.submit(_score_chunk, url, first, last, k, now, models))
+                    )
+                    if len(pending) >= 2 * workers:
+                        user_ids, future = pending.popleft()
+                        finish(db, shard, user_ids, future.result())
+                while pending:
+                    user_ids, future = pending.popleft()
+                    finish(db, shard, user_ids, future.result())
+            finally:
+                db.close()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return stats
+
+
+def prune_digests(db: Session, before: date, batch_size: int) -> int:
+    """Delete digests of days before `before`, in committed batches. Returns the number deleted."""
+    key = tuple_(TaskDigest.digest_date, TaskDigest.user_id, TaskDigest.rank)
+    removed = 0
+    while True:
+        batch = (
+            select(TaskDigest.digest_date, TaskDigest.user_id, TaskDigest.rank)
+            .where(TaskDigest.digest_date < before)
+            .limit(batch_size)
+        )
+        deleted = db.execute(delete(TaskDigest).where(key.in_(batch))).rowcount
+        db.commit()
+        if not deleted:
+            return removed
+        removed += deleted
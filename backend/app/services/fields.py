@@ -0,0 +1,57 @@
+from typing import Any, Iterable
+
+from pydantic import TypeAdapter
+
+from app.models.task import Task
+from app.schemas.task import TaskResponse
+from app.services.priority import ScoringModel, calculate_priority_score
+from app.services.timing import phase
+
+# Fields of a task response, in response order
+TASK_FIELDS = tuple(TaskResponse.model_fields)
+
+# Columns `calculate_priority_score` reads
+SCORING_COLUMNS = ("impact", "effort", "deadline")
+
+# Sparse responses hold only some fields, so they cannot be validated as TaskResponse
+sparse_list = TypeAdapter(list[dict[str, Any]])
+sparse_page = TypeAdapter(dict[str, Any])
+
+
+def parse_fields(value: str) -> tuple[str, ...]:
+    """
+    Field names from a comma-separated `fields` parameter, in response order. `id` is
+    always included. Raises ValueError for names that are not task response fields.
+    """
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested.difference(TASK_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(name for name in TASK_FIELDS if name in requested)
+
+
+def task_columns(fields: Iterable[str], *extra: str) -> list[str]:
+    """
+    Names of the task columns a query has to select to answer with `fields`, plus
+    `extra` (ordering or keyset columns), in table order.
+    """
+    needed = set(extra).union(fields)
+    if "priority_score" in needed:
+        needed.update(SCORING_COLUMNS)
+    return [column.name for column in Task.__table__.columns if column.name in needed]
+
+
+def sparse_response(row: Any, fields: tuple[str, ...], model: ScoringModel | None = None) -> dict:
+    """
+    Response dict with only `fields` of a task or a row of its columns, scored with
+    the scoring `model`.
+    """
+    response = {}
+    for name in fields:
+        if name == "priority_score":
+            with phase("scoring"):
+                response[name] = calculate_priority_score(row, model=model)
+        else:
+            response[name] = getattr(row, name)
+    return response
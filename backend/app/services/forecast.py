@@ -0,0 +1,126 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.models.task import Task
+from app.services.priority import ScoringModel, scoring_model
+
+# Upper bound on the number of time steps in one forecast
+MAX_FORECAST_STEPS = 5000
+
+_DURATION_RE = re.compile(r"^(\d+)([mhdw])$")
+_DURATION_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+
+def parse_duration(value: str) -> timedelta:
+    """Parse a compact duration such as "30m", "1h", "7d" or "2w"."""
+    match = _DURATION_RE.match(value.strip())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid duration {value!r}, expected e.g. 30m, 1h, 7d or 2w")
+    amount, unit = match.groups()
+    return timedelta(**{_DURATION_UNITS[unit]: int(amount)})
+
+
+def utc_timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        # Naive datetimes from the database are UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@dataclass
+class Forecast:
+    """Priority scores of `task_ids` (rows) at `times` (columns)."""
+
+    task_ids: np.ndarray
+    times: list[datetime]
+    scores: np.ndarray
+
+    def top_k(self, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Row indices and scores of the k highest scores per step, best first, as
+        (steps x k) arrays. Ties go to the lower task id.
+        """
+        k = min(k, len(self.task_ids))
+        if k == 0:
+            empty = np.empty((len(self.times), 0))
+            return empty.astype(np.intp), empty
+        # Rows are sorted by task id, so a stable sort on -score breaks ties by id
+        if k < len(self.task_ids):
+            candidates = np.argpartition(-self.scores, k - 1, axis=0)[:k]
+            candidates.sort(axis=0)
+        else:
+            candidates = np.broadcast_to(
+                np.arange(len(self.task_ids))[:, None], self.scores.shape
+            )
+        candidate_scores = np.take_along_axis(self.scores, candidates, axis=0)
+        order = np.argsort(-candidate_scores, axis=0, kind="stable")
+        rows = np.take_along_axis(candidates, order, axis=0).T
+        return rows, np.take_along_axis(candidate_scores, order, axis=0).T
+
+    def crossovers(self, top_rows: np.ndarray) -> list[tuple[int, int, int, int]]:
+        """
+        Steps where the task at a top-k rank changes, as (step, rank, row, previous_row)
+        with rank counted from 0.
+        """
+        changed = top_rows[1:] != top_rows[:-1]
+        steps, ranks = np.nonzero(changed)
+        return [
+            (int(step) + 1, int(rank), int(top_rows[step + 1, rank]), int(top_rows[step, rank]))
+            for step, rank in zip(steps, ranks)
+        ]
+
+
+def forecast_scores(
+    tasks: list[Task],
+    start: datetime,
+    horizon: timedelta,
+    step: timedelta,
+    model: ScoringModel | None = None,
+) -> Forecast:
+    """
+    Score every task at each step from `start` to `start + horizon` in one pass.
+
+    Assumes no activity is logged in between, so impact grows linearly from its last
+    update at `not_doing_hourly_rate`. Each column equals `update_task_impact` followed
+    by `calculate_priority_score` with the scoring `model` evaluated at that time.
+    """
+    steps = int(horizon / step) + 1
+    if steps > MAX_FORECAST_STEPS:
+        raise ValueError(f"Forecast would have {steps} steps, the limit is {MAX_FORECAST_STEPS}")
+
+    tasks = sorted(tasks, key=lambda task: task.id)
+    count = len(tasks)
+    start_ts = utc_timestamp(start)
+    offsets = np.arange(steps) * step.total_seconds()
+
+    task_ids = np.fromiter((t.id for t in tasks), dtype=np.int64, count=count)
+    impact = np.fromiter((t.impact for t in tasks), dtype=np.float64, count=count)
+    rate = np.fromiter((t.not_doing_hourly_rate for t in tasks), dtype=np.float64, count=count)
+    effort = np.fromiter((max(0.1, t.effort) for t in tasks), dtype=np.float64, count=count)
+    last_updated = np.fromiter(
+        (utc_timestamp(t.last_updated) for t in tasks), dtype=np.float64, count=count
+    )
+    deadline = np.fromiter(
+        (utc_timestamp(t.deadline) if t.deadline else np.nan for t in tasks),
+        dtype=np.float64,
+        count=count,
+    )
+
+    # (tasks x steps) seconds between each task's last update and each step
+    elapsed = (start_ts - last_updated)[:, None] + offsets[None, :]
+    scores = impact[:, None] + (elapsed / 3600) * rate[:, None]
+    np.clip(scores, 0.0, 10.0, out=scores)
+    scores /= effort[:, None]
+
+    # In place, as in ScoringModel.scores, to spare a copy of the whole grid
+    has_deadline = ~np.isnan(deadline)
+    if has_deadline.any():
+        days_left = (deadline[has_deadline, None] - start_ts - offsets[None, :]) / 86400
+        scores[has_deadline] *= (model or scoring_model()).urgencies(days_left)
+    np.clip(scores, 0.0, 10.0, out=scores)
+
+    times = [start + step * i for i in range(steps)]
+    return Forecast(task_ids=task_ids, times=times, scores=scores)
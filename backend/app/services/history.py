@@ -0,0 +1,221 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.task import Task, TaskLog
+from app.services.forecast import utc_timestamp
+from app.services.metrics import metrics
+
+# (UTC timestamp, impact)
+Point = tuple[float, float]
+
+
+@dataclass(frozen=True, slots=True)
+class CurveKey:
+    """Everything a replayed curve depends on; a new log changes `last_log_id`."""
+
+    task_id: int
+    last_log_id: int | None
+    start: float
+    initial_impact: float
+    not_doing_hourly_rate: float
+    doing_hourly_rate: float | None
+    impact_set_to: float | None
+
+    @classmethod
+    def for_task(cls, task: Task, last_log_id: int | None) -> "CurveKey":
+        return cls(
+            task_id=task.id,
+            last_log_id=last_log_id,
+            start=utc_timestamp(task.created_at),
+            initial_impact=task.impact if task.initial_impact is None else task.initial_impact,
+            not_doing_hourly_rate=task.not_doing_hourly_rate,
+            doing_hourly_rate=task.doing_hourly_rate,
+            impact_set_to=task.impact_set_to,
+        )
+
+
+def _clamp(value: float) -> float:
+    return max(0.0, min(10.0, value))
+
+
+def _grow(points: list[Point], value: float, rate: float, until: float) -> float:
+    """
+    Append the growth segment from the last point to `until`, capped at 10; return
+    the impact there.
+    """
+    start = points[-1][0]
+    if until <= start:
+        return value
+    grown = value + (until - start) / 3600 * rate
+    if grown > 10.0 and value < 10.0:
+        # Breakpoint where growth hits the cap
+        points.append((start + (10.0 - value) / rate * 3600, 10.0))
+    points.append((until, min(10.0, grown)))
+    return min(10.0, grown)
+
+
+def replay(key: CurveKey, logs: Iterable[tuple[datetime, int]]) -> list[Point]:
+    """
+    Rebuild the piecewise-linear impact curve from creation up to the last log.
+
+    Walks `logs` ((logged_at, duration_minutes), oldest first) once. Between logs
+    impact grows at `not_doing_hourly_rate`, capped at 10; each log then applies the
+    same rule as `apply_activity_to_impact` to the capped value: jump to
+    `impact_set_to`, or drop by hours * `doing_hourly_rate`, then clamp to 0-10. A log
+    is a vertical step, so the curve has two points at its timestamp. Edits made
+    through PUT are not logged and so do not appear.
+    """
+    value = _clamp(key.initial_impact)
+    points = [(key.start, value)]
+    for logged_at, duration_minutes in logs:
+        grown = _grow(points, value, key.not_doing_hourly_rate, utc_timestamp(logged_at))
+        if key.impact_set_to is not None:
+            value = _clamp(key.impact_set_to)
+        elif key.doing_hourly_rate is not None:
+            value = _clamp(grown - duration_minutes / 60 * key.doing_hourly_rate)
+        else:
+            value = _clamp(grown)
+        points.append((points[-1][0], value))
+    return points
+
+
+def extend_curve(key: CurveKey, points: list[Point], until: float) -> list[Point]:
+    """Return the replayed `points` continued with growth up to `until`."""
+    extended = list(points)
+    _grow(extended, extended[-1][1], key.not_doing_hourly_rate, until)
+    return extended
+
+
+def downsample(points: list[Point], threshold: int) -> list[Point]:
+    """
+    Reduce a curve to `threshold` points with Largest-Triangle-Three-Buckets, which
+    keeps the first and last point and the visually significant ones in between.
+    """
+    if threshold >= len(points) or threshold < 3:
+        return points
+
+    sampled = [points[0]]
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    previous = points[0]
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, len(points))
+
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        following = points[end:next_end] or points[-1:]
+        avg_t = sum(p[0] for p in following) / len(following)
+        avg_v = sum(p[1] for p in following) / len(following)
+
+        best, best_area = points[start], -1.0
+        for point in points[start:end]:
+            area = abs(
+                (previous[0] - avg_t) * (point[1] - previous[1])
+                - (previous[0] - point[0]) * (avg_v - previous[1])
+            )
+            if area > best_area:
+                best, best_area = point, area
+        sampled.append(best)
+        previous = best
+    sampled.append(points[-1])
+    return sampled
+
+
+class CurveCache:
+    """
+    LRU of replayed curves keyed by `CurveKey`.
+
+    Logs are append-only, so a curve stays valid until the task gets a new log or its
+    rates change, both of which change the key.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._curves: OrderedDict[CurveKey, list[Point]] = OrderedDict()
+
+    def get(self, key: CurveKey) -> list[Point] | None:
+        with self._lock:
+            points = self._curves.get(key)
+            if points is not None:
+                self._curves.move_to_end(key)
+        metrics.increment("impact_history_cache", result="hit" if points is not None else "miss")
+        return points
+
+    def put(self, key: CurveKey, points: list[Point]) -> None:
+        with self._lock:
+            self._curves[key] = points
+            self._curves.move_to_end(key)
+            while len(self._curves) > self.max_entries:
+                self._curves.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._curves.clear()
+
+
+curve_cache = CurveCache()
+
+
+def replay_tasks(
+    db: Session, tasks: list[Task], until: datetime, cache: CurveCache = curve_cache
+) -> dict[int, list[Point]]:
+    """
+    Impact curves of `tasks` up to `until` (completion time for completed tasks).
+
+    One query finds each task's last log id; tasks without a cached curve are then
+    replayed together from a single streamed query over their logs.
+    """
+    task_ids = [task.id for task in tasks]
+    last_log_ids = dict(
+        db.execute(
+            select(TaskLog.task_id, func.max(TaskLog.id))
+            .where(TaskLog.task_id.in_(task_ids))
+            .group_by(TaskLog.task_id)
+        ).all()
+    ) if task_ids else {}
+
+    keys = {task.id: CurveKey.for_task(task, last_log_ids.get(task.id)) for task in tasks}
+    curves = {task_id: cache.get(key) for task_id, key in keys.items()}
+    stale = [task_id for task_id, points in curves.items() if points is None]
+
+    if stale:
+        rows = db.execute(
+            select(TaskLog.task_id, TaskLog.logged_at, TaskLog.duration_minutes)
+            .where(TaskLog.task_id.in_(stale))
+            .order_by(TaskLog.task_id, TaskLog.logged_at, TaskLog.id)
+            .execution_options(yield_per=1000)
+        )
+        logs_by_task = groupby(rows, key=lambda row: row.task_id)
+        replayed = {
+            task_id: replay(keys[task_id], ((row.logged_at, row.duration_minutes) for row in group))
+            for task_id, group in logs_by_task
+        }
+        for task_id in stale:
+            points = replayed.get(task_id) or replay(keys[task_id], ())
+            cache.put(keys[task_id], points)
+            curves[task_id] = points
+
+    until_ts = utc_timestamp(until)
+    return {
+        task.id: extend_curve(
+            keys[task.id],
+            curves[task.id],
+            utc_timestamp(task.completed_at) if task.completed_at else until_ts,
+        )
+        for task in tasks
+    }
+
+
+def points_to_response(points: list[Point]) -> list[dict]:
+    return [
+        {"at": datetime.fromtimestamp(at, timezone.utc), "impact": impact}
+        for at, impact in points
+    ]
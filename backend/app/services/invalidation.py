@@ -0,0 +1,303 @@
+import logging
+import os
+import select
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Protocol
+
+from sqlalchemy import Engine, text
+
+from app.config import settings
+from app.database import engine
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Postgres NOTIFY channel
+CHANNEL = "busyness_invalidation"
+
+# Longest wait between reconnection attempts
+MAX_RECONNECT_SECONDS = 30.0
+
+# How often listener threads wake up to check for shutdown and lost sockets
+POLL_SECONDS = 0.5
+
+
+class Subscriber(Protocol):
+    def invalidate(self, user_id: int) -> None:
+        """Drop anything cached for `user_id`."""
+
+    def set_connected(self, connected: bool) -> None:
+        """
+        Called when the bus loses or regains its connection. Invalidations may have
+        been missed either way, so subscribers should drop everything; while
+        disconnected they should not cache at all.
+        """
+
+
+class Transport(Protocol):
+    def open(self) -> None: ...
+
+    def close(self) -> None: ...
+
+    def send(self, payload: str) -> None: ...
+
+    def wake(self) -> None:
+        """Make a pending `receive` return early."""
+
+    def receive(self, timeout: float) -> list[str]:
+        """Payloads that arrived within `timeout`; raises OSError when the connection is lost."""
+
+
+class PostgresTransport:
+    """
+    LISTEN on a connection taken out of the pool for good; NOTIFY through ordinary
+    pooled connections.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._connection = None
+
+    def open(self) -> None:
+        connection = self.engine.raw_connection()
+        connection.driver_connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        self._connection = connection
+
+    def close(self) -> None:
+        if self._connection is not None:
+            # Discarded rather than returned, since it is still listening
+            self._connection.invalidate()
+            self._connection = None
+
+    def send(self, payload: str) -> None:
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+            connection.commit()
+
+    def wake(self) -> None:
+        # Every listener sees the empty notification, and ignores it
+        self.send("")
+
+    def receive(self, timeout: float) -> list[str]:
+        import psycopg2
+
+        driver = self._connection.driver_connection
+        try:
+            if select.select([driver], [], [], timeout)[0]:
+                driver.poll()
+            payloads = [notify.payload for notify in driver.notifies]
+            driver.notifies.clear()
+            return payloads
+        except psycopg2.Error as exc:
+            raise OSError(str(exc)) from exc
+
+
+class LocalTransport:
+    """
+    Unix datagram sockets in a shared directory, one per process, for workers on a
+    single host (and SQLite setups). Sending writes to every other socket there;
+    sockets of dead processes are removed when a send to them is refused.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.path: Path | None = None
+        self._socket: socket.socket | None = None
+        self._sender: socket.socket | None = None
+
+    def open(self) -> None:
+        # Named and created here rather than at import, so forked workers get their own
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock"
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(str(self.path))
+        self._socket = sock
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._sender.close()
+            self._socket = self._sender = None
+            self.path.unlink(missing_ok=True)
+
+    def send(self, payload: str) -> None:
+        data = payload.encode()
+        for peer in self.directory.glob("*.sock"):
+            if peer == self.path:
+                continue
+            try:
+                self._sender.sendto(data, str(peer))
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Nobody is bound there any more
+                peer.unlink(missing_ok=True)
+            except BlockingIOError:
+                # The peer's buffer is full; its cache TTL still bounds staleness
+                metrics.increment("invalidation_dropped")
+
+    def wake(self) -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.sendto(b"", str(self.path))
+
+    def receive(self, timeout: float) -> list[str]:
+        if not self.path.exists():
+            raise OSError(f"Socket {self.path} was removed")
+        if not select.select([self._socket], [], [], timeout)[0]:
+            return []
+        payloads = []
+        while True:
+            try:
+                payloads.append(self._socket.recv(512, socket.MSG_DONTWAIT).decode())
+            except BlockingIOError:
+                return payloads
+
+
+class InvalidationBus:
+    """
+    Broadcast "user X changed" between worker processes so per-process caches can
+    drop what they hold for that user.
+
+    Each message carries the sender's id, so a process skips its own (it already
+    updated its caches), and the send time, so receivers record the delivery lag in
+    the `invalidation_lag_seconds` summary. A listener thread receives messages and
+    reconnects with exponential backoff; around a lost connection subscribers are
+    told to drop everything and stop caching, so while connected a cache is at most
+    one delivery lag behind another worker's write.
+    """
+
+    def __init__(self, transport: Transport):
+        self.transport = transport
+        self.origin = ""
+        self.connected = False
+        self._subscribers: list[Subscriber] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.append(subscriber)
+        subscriber.set_connected(self.connected)
+
+    def publish(self, user_id: int) -> None:
+        if not self.connected:
+            return
+        try:
+            self.transport.send(f"{user_id}:{self.origin}:{time.time():.6f}")
+            metrics.increment("invalidation_published")
+        except Exception:
+            # Receivers notice a dead connection themselves; their TTL bounds the rest
+            logger.warning("Could not publish invalidation for user %s", user_id, exc_info=True)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        # Per process: a bus created before a fork must not share its id with siblings
+        self.origin = uuid.uuid4().hex[:12]
+        self._stop.clear()
+        self._connect()
+        self._thread = threading.Thread(target=self._listen, name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            if self.connected:
+                try:
+                    self.transport.wake()
+                except Exception:
+                    pass  # It wakes up within POLL_SECONDS anyway
+            self._thread.join()
+            self._thread = None
+        self.transport.close()
+        self._set_connected(False)
+
+    def _connect(self) -> bool:
+        try:
+            self.transport.open()
+        except Exception:
+            logger.warning("Invalidation bus could not connect", exc_info=True)
+            return False
+        self._set_connected(True)
+        return True
+
+    def _set_connected(self, connected: bool) -> None:
+        self.connected = connected
+        for subscriber in self._subscribers:
+            subscriber.set_connected(connected)
+
+    def _listen(self) -> None:
+        backoff = POLL_SECONDS
+        while not self._stop.is_set():
+            if not self.connected:
+                if self._stop.wait(backoff):
+                    return
+                if not self._connect():
+                    backoff = min(backoff * 2, MAX_RECONNECT_SECONDS)
+                    continue
+                metrics.increment("invalidation_reconnects")
+                backoff = POLL_SECONDS
+            try:
+                payloads = self.transport.receive(POLL_SECONDS)
+            except OSError:
+                logger.warning("Invalidation bus lost its connection, reconnecting", exc_info=True)
+                self.transport.close()
+                self._set_connected(False)
+                continue
+            for payload in payloads:
+                self._deliver(payload)
+
+    def _deliver(self, payload: str) -> None:
+        if not payload:
+            return  # A wake-up
+        try:
+            user_id, origin, sent_at = payload.split(":")
+            user_id, sent_at = int(user_id), float(sent_at)
+        except ValueError:
+            logger.warning("Ignoring malformed invalidation %r", payload)
+            return
+        if origin == self.origin:
+            return
+        for subscriber in self._subscribers:
+            subscriber.invalidate(user_id)
+        metrics.increment("invalidation_received")
+        metrics.observe("invalidation_lag_seconds", max(0.0, time.time() - sent_at))
+
+
+def create_bus(backend: str, engine: Engine, socket_dir: str) -> InvalidationBus | None:
+    """
+    Bus for the configured backend: "postgres", "local", "off", or "auto" (Postgres
+    when `engine` is, local sockets otherwise).
+    """
+    if backend == "auto":
+        backend = "postgres" if engine.dialect.name == "postgresql" else "local"
+    if backend == "postgres":
+        return InvalidationBus(PostgresTransport(engine))
+    if backend == "local":
+        return InvalidationBus(LocalTransport(socket_dir))
+    return None
+
+
+def attach(subscriber: Subscriber, bus: InvalidationBus | None) -> None:
+    """
+    Subscribe to `bus`. With the bus off the subscriber stays disconnected, since no
+    other process's writes would ever reach it.
+    """
+    if bus is None:
+        subscriber.set_connected(False)
+    else:
+        bus.subscribe(subscriber)
+
+
+invalidation_bus = create_bus(settings.invalidation_bus, engine, settings.invalidation_socket_dir)
+
+
+def publish_invalidation(user_id: int) -> None:
+    """Tell the other processes that `user_id`'s data changed; nothing with the bus off."""
+    if invalidation_bus is not None:
+        invalidation_bus.publish(user_id)
@@ -0,0 +1,70 @@
+import threading
+import tracemalloc
+
+from app.config import settings
+
+
+class MemoryTracker:
+    """
+    tracemalloc-based allocation tracking.
+
+    Records the peak traced allocation of each request, keyed by route. tracemalloc's
+    peak and its reset are process-wide, so a request that starts while another is in
+    flight spoils both measurements: only requests that ran alone from start to
+    finish are recorded, which `begin` and `end` tell.
+    """
+
+    def __init__(self, frames: int = 10):
+        self.frames = frames
+        self.route_peaks: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._starts = 0
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def begin(self) -> int:
+        """Note a request starting; the token returned is for `end`."""
+        with self._lock:
+            self._in_flight += 1
+            self._starts += 1
+            return self._starts if self._in_flight == 1 else 0
+
+    def end(self, token: int) -> bool:
+        """Note the request ending; whether it ran alone, so its peak is its own."""
+        with self._lock:
+            self._in_flight -= 1
+            return token != 0 and token == self._starts
+
+    def record(self, route: str, peak: int) -> None:
+        with self._lock:
+            if peak > self.route_peaks.get(route, 0):
+                self.route_peaks[route] = peak
+
+    def top_sites(self, limit: int) -> list[dict]:
+        """Return the source lines holding the most currently traced memory."""
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            )
+        )
+        return [
+            {
+                "file": stat.traceback[0].filename,
+                "line": stat.traceback[0].lineno,
+                "size": stat.size,
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[:limit]
+        ]
+
+
+memory_tracker = MemoryTracker(settings.memory_tracking_frames)
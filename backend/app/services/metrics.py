@@ -0,0 +1,75 @@
+import threading
+from dataclasses import dataclass
+
+
+@dataclass
+class Summary:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+
+class Metrics:
+    """
+    In-process metrics registry.
+
+    Counters and gauges hold a single number per name and label set; summaries keep
+    count, total and max of observed values. Values are per worker process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[tuple, float] = {}
+        self._gauges: dict[tuple, float] = {}
+        self._summaries: dict[tuple, Summary] = {}
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = Summary()
+            summary.observe(value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": [_entry(key, {"value": v}) for key, v in self._counters.items()],
+                "gauges": [_entry(key, {"value": v}) for key, v in self._gauges.items()],
+                "summaries": [
+                    _entry(key, {"count": s.count, "sum": s.total, "max": s.max})
+                    for key, s in self._summaries.items()
+                ],
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted(labels.items())))
+
+
+def _entry(key: tuple, values: dict) -> dict:
+    name, labels = key
+    return {"name": name, "labels": dict(labels), **values}
+
+
+metrics = Metrics()
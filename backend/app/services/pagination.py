@@ -0,0 +1,104 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.sql.expression import ColumnElement
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    values = json.loads(raw)
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def encode_cursor(timestamp: datetime, id: int) -> str:
+    """Opaque cursor for the position after the row (timestamp, id)."""
+    return _encode([timestamp.isoformat(), id])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of `encode_cursor`; raises ValueError for malformed cursors."""
+    try:
+        timestamp, id = _decode(cursor)
+        return datetime.fromisoformat(timestamp), int(id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_score_cursor(evaluated_at: datetime, score: float, id: int) -> str:
+    """
+    Opaque cursor for the position after the row (score, id) in a ranking evaluated at
+    `evaluated_at`. Later pages rank at the same time, so time-dependent scores stay
+    comparable across pages.
+    """
+    return _encode([evaluated_at.isoformat(), score, id])
+
+
+def decode_score_cursor(cursor: str) -> tuple[datetime, float, int]:
+    """Inverse of `encode_score_cursor`; raises ValueError for malformed cursors."""
+    try:
+        evaluated_at, score, id = _decode(cursor)
+        return datetime.fromisoformat(evaluated_at), float(score), int(id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_change_cursor(change_seq: int, kind: int, id: int) -> str:
+    """Opaque cursor for the position after the change (change_seq, kind, id)."""
+    return _encode([change_seq, kind, id])
+
+
+def decode_change_cursor(cursor: str) -> tuple[int, int, int]:
+    """Inverse of `encode_change_cursor`; raises ValueError for malformed cursors."""
+    try:
+        change_seq, kind, id = _decode(cursor)
+        return int(change_seq), int(kind), int(id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def keyset_query(
+    query: Select,
+    timestamp: ColumnElement,
+    id: ColumnElement,
+    limit: int,
+    after: tuple[Any, int] | None,
+) -> Select:
+    """
+    Newest-first page of `query` after the (timestamp, id) position `after`.
+
+    Seeks with a row-value comparison instead of OFFSET, so with an index on
+    (..., timestamp, id) every page costs the same. Fetches `limit + 1` rows; see
+    `split_page`.
+    """
+    if after is not None:
+        query = query.where(tuple_(timestamp, id) < after)
+    return query.order_by(timestamp.desc(), id.desc()).limit(limit + 1)
+
+
+def split_page(
+    rows: list,
+    limit: int,
+    position: Callable[[Any], tuple],
+    encode: Callable[..., str] = encode_cursor,
+) -> tuple[list, str | None]:
+    """
+    Trim the extra row fetched by `keyset_query` and return (rows, next_cursor), the
+    cursor being `encode(*position(last_row))`.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode(*position(rows[-1]))
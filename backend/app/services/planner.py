@@ -0,0 +1,94 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+# Task counts up to this are planned exactly, larger sets greedily
+EXACT_MAX_TASKS = 500
+
+# Effort granularity of the exact planner (6 minutes)
+RESOLUTION_HOURS = 0.1
+
+
+@dataclass
+class Plan:
+    """Indices of the chosen tasks, best score first."""
+
+    indices: list[int]
+    total_effort: float
+    total_score: float
+    method: str
+
+
+def plan_exact(efforts: np.ndarray, scores: np.ndarray, hours: float) -> list[int]:
+    """
+    Optimal 0/1 knapsack by dynamic programming over the budget in RESOLUTION_HOURS
+    units, O(tasks x budget units). Efforts are rounded up to whole units, so the plan
+    never exceeds the budget and is optimal whenever efforts are multiples of the
+    resolution.
+    """
+    capacity = int(math.floor(hours / RESOLUTION_HOURS + 1e-9))
+    weights = np.ceil(efforts / RESOLUTION_HOURS - 1e-9).astype(np.int64)
+
+    best = np.zeros(capacity + 1)
+    taken = np.zeros((len(weights), capacity + 1), dtype=bool)
+    for i, (weight, score) in enumerate(zip(weights.tolist(), scores.tolist())):
+        if weight > capacity or score <= 0:
+            continue
+        with_task = best[: capacity + 1 - weight] + score
+        improves = with_task > best[weight:]
+        taken[i, weight:] = improves
+        best[weight:] = np.where(improves, with_task, best[weight:])
+
+    chosen = []
+    remaining = capacity
+    for i in range(len(weights) - 1, -1, -1):
+        if taken[i, remaining]:
+            chosen.append(i)
+            remaining -= weights[i]
+    return chosen
+
+
+def plan_greedy(efforts: np.ndarray, scores: np.ndarray, hours: float) -> list[int]:
+    """
+    Take tasks by score per hour while they fit, or the single best task if that
+    scores more. The better of the two is at least half the optimum: the greedy
+    prefix plus the first task that did not fit already beats the fractional
+    optimum, and that task alone is no better than the best single task.
+    """
+    fits = (efforts <= hours + 1e-9) & (scores > 0)
+    candidates = np.flatnonzero(fits)
+    if len(candidates) == 0:
+        return []
+
+    ratios = scores[candidates] / efforts[candidates]
+    effort_list = efforts.tolist()
+    score_list = scores.tolist()
+    chosen = []
+    total_effort = 0.0
+    total_score = 0.0
+    for i in candidates[np.argsort(-ratios, kind="stable")].tolist():
+        if total_effort + effort_list[i] <= hours + 1e-9:
+            chosen.append(i)
+            total_effort += effort_list[i]
+            total_score += score_list[i]
+
+    best_single = int(candidates[np.argmax(scores[candidates])])
+    if scores[best_single] > total_score:
+        return [best_single]
+    return chosen
+
+
+def plan_tasks(efforts: np.ndarray, scores: np.ndarray, hours: float) -> Plan:
+    """Choose the tasks with the highest total score that fit in `hours`."""
+    if len(efforts) <= EXACT_MAX_TASKS:
+        method, chosen = "exact", plan_exact(efforts, scores, hours)
+    else:
+        method, chosen = "greedy", plan_greedy(efforts, scores, hours)
+    chosen.sort(key=lambda i: -scores[i])
+    return Plan(
+        indices=chosen,
+        total_effort=float(efforts[chosen].sum()) if chosen else 0.0,
+        total_score=float(scores[chosen].sum()) if chosen else 0.0,
+        method=method,
+    )
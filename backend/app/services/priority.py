@@ -1,9 +1,162 @@
+import math
+from abc import ABC, abstractmethod
 from datetime import datetime, timezone
 
+import numpy as np
+from sqlalchemy import case, func
+from sqlalchemy.sql.expression import ColumnElement
+
+from app.config import settings
 from app.models.task import Task
+from app.services.task_writes import clamp_impact
+
+# Days left (either way) beyond which the exponential curves count as flat, keeping
+# exp() in range in SQL, where Postgres raises on overflow and underflow
+URGENCY_HORIZON_DAYS = 60.0
+
+
+class ScoringModel(ABC):
+    """
+    How a task's priority score follows from its current impact, its effort and the
+    days left before its deadline, in three forms that must agree: `score` for one
+    task, `scores` over numpy arrays and `score_sql` as a SQL expression. The shared
+    conformance test (tests/test_scoring_models.py) checks every registered model.
+
+    The score is impact / effort (effort at least 0.1), times an urgency multiplier
+    when there is a deadline, clamped to 0-10. Models differ in the urgency, and
+    subclasses give its three forms. Impact itself is stored, and grows at
+    `not_doing_hourly_rate` whichever model scores it.
+    """
+
+    name: str
+
+    @abstractmethod
+    def urgency(self, days_left: float) -> float:
+        ...
+
+    @abstractmethod
+    def urgencies(self, days_left: np.ndarray) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def urgency_sql(self, days_left: ColumnElement) -> ColumnElement:
+        ...
+
+    def score(self, impact: float, effort: float, days_left: float | None) -> float:
+        """Priority of one task; `days_left` is None without a deadline."""
+        priority = impact / max(0.1, effort)
+        if days_left is not None:
+            priority *= self.urgency(days_left)
+        return max(0.0, min(10.0, priority))
+
+    def scores(self, impact: np.ndarray, effort: np.ndarray, days_left: np.ndarray) -> np.ndarray:
+        """Priorities of many tasks; the arrays broadcast, and NaN days left means no deadline."""
+        priorities = impact / np.maximum(0.1, effort)
+        has_deadline = ~np.isnan(days_left)
+        if has_deadline.all():
+            priorities *= self.urgencies(days_left)
+        elif has_deadline.any():
+            has_deadline = np.broadcast_to(has_deadline, priorities.shape)
+            days_left = np.broadcast_to(days_left, priorities.shape)
+            priorities[has_deadline] *= self.urgencies(days_left[has_deadline])
+        return np.clip(priorities, 0.0, 10.0, out=priorities)
+
+    def score_sql(
+        self, impact: ColumnElement, effort: ColumnElement, days_left: ColumnElement
+    ) -> ColumnElement:
+        """SQL priority; `days_left` is NULL without a deadline."""
+        effort = case((effort < 0.1, 0.1), else_=effort)
+        urgency = case((days_left.is_(None), 1.0), else_=self.urgency_sql(days_left))
+        return clamp_impact(impact / effort * urgency)
+
+
+class HyperbolicUrgency(ScoringModel):
+    """1 + 1/days left, with at least 0.1 days: up to 11x once the deadline is near or past."""
+
+    name = "hyperbolic"
+
+    def urgency(self, days_left: float) -> float:
+        return 1 + 1 / max(0.1, days_left)
+
+    def urgencies(self, days_left: np.ndarray) -> np.ndarray:
+        return 1 + 1 / np.maximum(0.1, days_left)
+
+    def urgency_sql(self, days_left: ColumnElement) -> ColumnElement:
+        return case((days_left < 0.1, 11.0), else_=1 + 1 / days_left)
+
+
+class ExponentialUrgency(ScoringModel):
+    """
+    1 + peak * exp(-days left / scale_days): the boost decays exponentially with the
+    time left, so far deadlines barely count and near ones count sooner.
+    """
+
+    name = "exponential"
+
+    def __init__(self, peak: float = 10.0, scale_days: float = 1.0):
+        self.peak = peak
+        self.scale_days = scale_days
+
+    def urgency(self, days_left: float) -> float:
+        days_left = max(0.0, min(URGENCY_HORIZON_DAYS, days_left))
+        return 1 + self.peak * math.exp(-days_left / self.scale_days)
+
+    def urgencies(self, days_left: np.ndarray) -> np.ndarray:
+        days_left = np.clip(days_left, 0.0, URGENCY_HORIZON_DAYS)
+        return 1 + self.peak * np.exp(-days_left / self.scale_days)
+
+    def urgency_sql(self, days_left: ColumnElement) -> ColumnElement:
+        days_left = case(
+            (days_left < 0.0, 0.0),
+            (days_left > URGENCY_HORIZON_DAYS, URGENCY_HORIZON_DAYS),
+            else_=days_left,
+        )
+        return 1 + self.peak * func.exp(-days_left / self.scale_days)
+
+
+class SigmoidUrgency(ScoringModel):
+    """
+    1 + peak / (1 + exp((days left - midpoint_days) / width_days)): little urgency
+    until the deadline gets close, then a steep rise that levels off at 1 + peak.
+    """
+
+    name = "sigmoid"
+
+    def __init__(self, peak: float = 10.0, midpoint_days: float = 1.0, width_days: float = 0.5):
+        self.peak = peak
+        self.midpoint_days = midpoint_days
+        self.width_days = width_days
+
+    def urgency(self, days_left: float) -> float:
+        days_left = max(-URGENCY_HORIZON_DAYS, min(URGENCY_HORIZON_DAYS, days_left))
+        return 1 + self.peak / (1 + math.exp((days_left - self.midpoint_days) / self.width_days))
+
+    def urgencies(self, days_left: np.ndarray) -> np.ndarray:
+        days_left = np.clip(days_left, -URGENCY_HORIZON_DAYS, URGENCY_HORIZON_DAYS)
+        return 1 + self.peak / (1 + np.exp((days_left - self.midpoint_days) / self.width_days))
+
+    def urgency_sql(self, days_left: ColumnElement) -> ColumnElement:
+        days_left = case(
+            (days_left < -URGENCY_HORIZON_DAYS, -URGENCY_HORIZON_DAYS),
+            (days_left > URGENCY_HORIZON_DAYS, URGENCY_HORIZON_DAYS),
+            else_=days_left,
+        )
+        return 1 + self.peak / (1 + func.exp((days_left - self.midpoint_days) / self.width_days))
+
+
+SCORING_MODELS: dict[str, ScoringModel] = {
+    model.name: model for model in (HyperbolicUrgency(), ExponentialUrgency(), SigmoidUrgency())
+}
 
 
-def update_task_impact(task: Task) -> float:
+def scoring_model(name: str | None = None) -> ScoringModel:
+    """The model called `name` (a user's choice), else the configured default."""
+    return SCORING_MODELS.get(name) or SCORING_MODELS[settings.scoring_model]
+
+
+def update_task_impact(
+    task: Task, now: datetime | None = None, model: ScoringModel | None = None
+) -> float:
     """
     Update and return the current impact for a task.
 
@@ -11,10 +164,24 @@ def update_task_impact(task: Task) -> float:
     Updates the task's impact and last_updated fields.
     Returns the priority score (impact with deadline multiplier applied).
 
-    The impact is clamped between 0 and 10.
+    The impact is clamped between 0 and 10. `now` is the evaluation time (default: current time).
+    """
+    now = now or datetime.now(timezone.utc)
+
+    # Update task fields
+    task.impact = impact_at(task, now)
+    task.last_updated = now
+
+    return calculate_priority_score(task, now, model)
+
+
+def impact_at(task: Task, now: datetime) -> float:
     """
-    now = datetime.now(timezone.utc)
+    Impact of a task at `now` without modifying it.
 
+    Calculates: impact + (hours_since_last_update * not_doing_hourly_rate), clamped between 0 and 10.
+    Rates are non-negative, so this equals any sequence of clamped updates up to `now`.
+    """
     # Calculate hours since last update
     last_updated = task.last_updated
     if last_updated.tzinfo is None:
@@ -23,46 +190,56 @@ def update_task_impact(task: Task) -> float:
 
     hours_since_update = (now - last_updated).total_seconds() / 3600
 
-    # Update impact based on time elapsed
-    new_impact = task.impact + (hours_since_update * task.not_doing_hourly_rate)
-
     # Clamp between 0 and 10
-    new_impact = max(0.0, min(10.0, new_impact))
-
-    # Update task fields
-    task.impact = new_impact
-    task.last_updated = now
+    return max(0.0, min(10.0, task.impact + (hours_since_update * task.not_doing_hourly_rate)))
 
-    return calculate_priority_score(task)
 
-
-def calculate_priority_score(task: Task) -> float:
+def calculate_priority_score(
+    task: Task, now: datetime | None = None, model: ScoringModel | None = None
+) -> float:
     """
     Calculate priority score from impact and effort, applying deadline multiplier if applicable.
 
-    Priority = (impact / effort) * (1 + 1/days_before_deadline) if deadline exists
+    Priority = (impact / effort) * urgency(days_before_deadline) if deadline exists
     Otherwise: priority = impact / effort
-    """
-    # Prevent division by zero
-    effort = max(0.1, task.effort)
-    base_priority = task.impact / effort
 
+    The urgency is the scoring `model`'s (default: the configured one); the default
+    hyperbolic model uses 1 + 1/days_before_deadline. Days before deadline are counted
+    from `now` (default: current time).
+    """
+    days_until_deadline = None
     if task.deadline:
-        now = datetime.now(timezone.utc)
+        now = now or datetime.now(timezone.utc)
         deadline = task.deadline
         if deadline.tzinfo is None:
             deadline = deadline.replace(tzinfo=timezone.utc)
-
         days_until_deadline = (deadline - now).total_seconds() / 86400
-        # Ensure minimum of 0.1 days to prevent division by zero/negative
-        days_until_deadline = max(0.1, days_until_deadline)
-        base_priority *= 1 + (1 / days_until_deadline)
 
-    # Clamp between 0 and 10
-    return max(0.0, min(10.0, base_priority))
+    return (model or scoring_model()).score(task.impact, task.effort, days_until_deadline)
+
+
+def priority_scores(
+    impact: np.ndarray,
+    not_doing_hourly_rate: np.ndarray,
+    effort: np.ndarray,
+    deadline: np.ndarray,
+    last_updated: np.ndarray,
+    now: float,
+    model: ScoringModel | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (impacts, priority scores) of many tasks at once: `impact_at` and
+    `calculate_priority_score` at `now` over parallel arrays, one element per task.
+
+    Timestamps are UTC seconds, and a NaN deadline means none.
+    """
+    hours = (now - last_updated) / 3600
+    impacts = np.clip(impact + hours * not_doing_hourly_rate, 0.0, 10.0)
+    priorities = (model or scoring_model()).scores(impacts, effort, (deadline - now) / 86400)
+    return impacts, priorities
 
 
-def apply_activity_to_impact(task: Task, duration_minutes: int) -> None:
+def apply_activity_to_impact(task: Task, duration_minutes: int, now: datetime | None = None) -> None:
     """
     Apply activity (time spent doing the task) to adjust impact.
 
@@ -70,9 +247,10 @@ def apply_activity_to_impact(task: Task, duration_minutes: int) -> None:
     1. If impact_set_to is set: directly set impact to that value
     2. Else if doing_hourly_rate is set: impact -= (hours_spent * doing_hourly_rate)
 
-    Also updates last_updated to current time.
+    The activity applies to the impact grown since the last update, capped at 10 as
+    `impact_at` gives it. Also updates last_updated to `now` (default: current time).
     """
-    now = datetime.now(timezone.utc)
+    now = now or datetime.now(timezone.utc)
 
     # First, update impact based on time since last update (time not doing)
     last_updated = task.last_updated
@@ -80,7 +258,7 @@ def apply_activity_to_impact(task: Task, duration_minutes: int) -> None:
         last_updated = last_updated.replace(tzinfo=timezone.utc)
 
     hours_since_update = (now - last_updated).total_seconds() / 3600
-    task.impact += hours_since_update * task.not_doing_hourly_rate
+    task.impact = max(0.0, min(10.0, task.impact + hours_since_update * task.not_doing_hourly_rate))
 
     # Apply the completion behavior
     if task.impact_set_to is not None:
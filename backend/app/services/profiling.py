@@ -0,0 +1,191 @@
+import contextvars
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+from app.config import settings
+
+# Set for the duration of a profiled request. Context variables are copied into
+# the threadpool work items that run sync dependencies and endpoints, which lets
+# the sampler recognise worker threads that are busy with this request.
+profiling_marker: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "profiling_marker", default=None
+)
+
+PROFILE_SUFFIX = ".speedscope.json"
+
+
+class StackSampler:
+    """
+    Sampling profiler for a single request.
+
+    A background thread periodically inspects the stacks of all threads and keeps
+    the ones that belong to the profiled request:
+    - on the event loop thread, stacks that contain the request's root frame
+      (the coroutine is only on the stack while it is being stepped)
+    - on worker threads, stacks running a work item whose context carries the marker
+
+    Identical stacks are aggregated, so memory is bounded by the number of distinct
+    stacks rather than by the request duration.
+    """
+
+    def __init__(
+        self,
+        marker: str,
+        root_frame: FrameType,
+        interval: float,
+        max_seconds: float,
+    ):
+        self.marker = marker
+        self.root_frame = root_frame
+        self.loop_thread = threading.get_ident()
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks: Counter[tuple[tuple[str, str, int], ...]] = Counter()
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        deadline = self.started_at + self.max_seconds
+        while not self._stop.wait(self.interval):
+            if time.perf_counter() > deadline:
+                return
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = self._collect(ident, frame)
+                if stack:
+                    self.stacks[stack] += 1
+
+    def _collect(self, ident: int, frame: FrameType) -> tuple[tuple[str, str, int], ...] | None:
+        frames = []
+        belongs = False
+        current: FrameType | None = frame
+        while current is not None:
+            frames.append(current)
+            if ident == self.loop_thread:
+                if current is self.root_frame:
+                    belongs = True
+                    break
+            elif _runs_marked_context(current, self.marker):
+                belongs = True
+                break
+            current = current.f_back
+        if not belongs:
+            return None
+        return tuple(
+            (f.f_code.co_name, f.f_code.co_filename, f.f_lineno) for f in reversed(frames)
+        )
+
+    def to_speedscope(self, name: str) -> dict:
+        """Export the aggregated samples in speedscope's sampled profile format."""
+        frame_index: dict[tuple[str, str, int], int] = {}
+        frames: list[dict] = []
+        samples: list[list[int]] = []
+        weights: list[float] = []
+        interval_ms = self.interval * 1000
+
+        for stack, count in self.stacks.most_common():
+            indices = []
+            for key in stack:
+                if key not in frame_index:
+                    frame_index[key] = len(frames)
+                    frames.append({"name": key[0], "file": key[1], "line": key[2]})
+                indices.append(frame_index[key])
+            samples.append(indices)
+            weights.append(count * interval_ms)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "busyness-api",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+def _runs_marked_context(frame: FrameType, marker: str) -> bool:
+    # anyio's worker loop executes each item as `context.run(func, *args)`
+    if frame.f_code.co_name != "run":
+        return False
+    context = frame.f_locals.get("context")
+    return isinstance(context, contextvars.Context) and context.get(profiling_marker) == marker
+
+
+class ProfileStore:
+    """Bounded on-disk ring of captured profiles; the oldest files are removed first."""
+
+    _name_pattern = re.compile(r"^[\w.-]+$")
+
+    def __init__(self, directory: str, max_files: int):
+        # At least the profile just saved is kept, so its X-Profile-Id can be fetched
+        if max_files < 1:
+            raise ValueError(f"PROFILING_MAX_FILES must be at least 1, got {max_files}")
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def new_name(self, method: str, path: str) -> str:
+        slug = re.sub(r"[^\w]+", "_", path).strip("_") or "root"
+        return f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}-{method.lower()}-{slug[:60]}"
+
+    def save(self, name: str, profile: dict) -> Path:
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{name}{PROFILE_SUFFIX}"
+            path.write_text(json.dumps(profile))
+            for stale in self._files()[: -self.max_files]:
+                stale.unlink(missing_ok=True)
+        return path
+
+    def entries(self) -> list[dict]:
+        return [
+            {
+                "name": path.name[: -len(PROFILE_SUFFIX)],
+                "size": path.stat().st_size,
+            }
+            for path in reversed(self._files())
+        ]
+
+    def path_for(self, name: str) -> Path | None:
+        if not self._name_pattern.match(name):
+            return None
+        path = self.directory / f"{name}{PROFILE_SUFFIX}"
+        return path if path.is_file() else None
+
+    def _files(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        # Names start with a millisecond timestamp, so lexical order is age order
+        return sorted(self.directory.glob(f"*{PROFILE_SUFFIX}"))
+
+
+profile_store = ProfileStore(settings.profiling_dir, settings.profiling_max_files)
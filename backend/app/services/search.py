@@ -0,0 +1,111 @@
+import re
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Select, case, column, func, literal, literal_column, select, table
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ColumnElement
+
+from app.models.task import Task
+from app.services.pagination import keyset_query
+from app.services.priority import ScoringModel, scoring_model
+from app.services.task_writes import clamp_impact, hours_between
+
+# Words beyond this are ignored, which bounds the cost of a query
+MAX_SEARCH_TERMS = 16
+
+_TERM_RE = re.compile(r"\w+")
+
+_tasks_fts = table("tasks_fts", column("rowid"))
+
+
+def search_terms(query: str) -> list[str]:
+    """Words of a free-text query, lowercased; punctuation and operators are dropped."""
+    return [term.lower() for term in _TERM_RE.findall(query)][:MAX_SEARCH_TERMS]
+
+
+def priority_expression(now: datetime, model: ScoringModel | None = None) -> ColumnElement:
+    """
+    SQL expression for the priority score at `now`: active tasks' impact grown as in
+    `update_task_impact`, then `calculate_priority_score` with the scoring `model`.
+    """
+    now = literal(now, DateTime)
+    impact = case(
+        (
+            Task.completed_at.is_(None),
+            clamp_impact(Task.impact + hours_between(now, Task.last_updated) * Task.not_doing_hourly_rate),
+        ),
+        else_=Task.impact,
+    )
+    # NULL without a deadline
+    days_left = hours_between(Task.deadline, now) / 24.0
+    return (model or scoring_model()).score_sql(impact, Task.effort, days_left)
+
+
+def _postgres_match(terms: list[str]) -> tuple[ColumnElement, ColumnElement]:
+    tsquery = func.to_tsquery("english", " & ".join(f"{term}:*" for term in terms))
+    search_vector = literal_column("tasks.search_vector")
+    # Normalization 32 maps the rank to rank / (rank + 1), i.e. into [0, 1)
+    return search_vector.op("@@")(tsquery), func.ts_rank_cd(search_vector, tsquery, 32, type_=Float)
+
+
+def _sqlite_match(terms: list[str]) -> tuple[ColumnElement, ColumnElement]:
+    fts = literal_column("tasks_fts")
+    # bm25 is negative, better matches lower; title hits weigh twice description hits
+    rank = -func.bm25(fts, 10.0, 5.0, type_=Float)
+    return fts.op("MATCH")(" ".join(f'"{term}"*' for term in terms)), rank / (rank + 1)
+
+
+def search_query(
+    dialect: str,
+    user_id: int,
+    terms: list[str],
+    now: datetime,
+    relevance_weight: float,
+    include_completed: bool = False,
+    model: ScoringModel | None = None,
+) -> Select:
+    """
+    Tasks of `user_id` matching every term (as a prefix), with their text relevance
+    and a score blending it with the priority at `now`:
+
+        score = relevance_weight * relevance + (1 - relevance_weight) * priority / 10
+
+    Both parts lie in [0, 1]. Matching uses the GIN-indexed `search_vector` on
+    Postgres and the `tasks_fts` FTS5 table on SQLite.
+    """
+    if dialect == "postgresql":
+        matches, relevance = _postgres_match(terms)
+        query = select(Task)
+    else:
+        matches, relevance = _sqlite_match(terms)
+        query = select(Task).join(_tasks_fts, _tasks_fts.c.rowid == Task.id)
+
+    relevance = relevance.label("relevance")
+    priority = priority_expression(now, model)
+    score = (relevance_weight * relevance + (1 - relevance_weight) * priority / 10.0).label("score")
+    query = query.add_columns(relevance, score).where(Task.user_id == user_id, matches)
+    if not include_completed:
+        query = query.where(Task.completed_at.is_(None))
+    return query
+
+
+def search_tasks(
+    db: Session,
+    user_id: int,
+    terms: list[str],
+    now: datetime,
+    relevance_weight: float,
+    limit: int,
+    after: tuple[float, int] | None = None,
+    include_completed: bool = False,
+    model: ScoringModel | None = None,
+) -> list:
+    """
+    One page of (task, relevance, score) rows, best score first, after the (score, id)
+    position `after`. Fetches `limit + 1` rows, like `keyset_query`.
+    """
+    query = search_query(
+        db.get_bind().dialect.name, user_id, terms, now, relevance_weight, include_completed, model
+    )
+    score = query.selected_columns.score
+    return db.execute(keyset_query(query, score, Task.id, limit, after)).all()
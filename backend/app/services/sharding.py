@@ -0,0 +1,243 @@
+import logging
+from dataclasses import dataclass, field
+
+from sqlalchemy import Table, delete, or_, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.database import ShardRouter, shard_of, shard_router
+from app.models.archive import ArchivedTask
+from app.models.task import Task, TaskLog
+from app.models.tombstone import TaskTombstone
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# A user's rows on their shard, parents first
+SHARDED_MODELS = (Task, ArchivedTask, TaskLog, TaskTombstone)
+# Rows that are never updated once written
+IMMUTABLE_MODELS = (TaskLog, TaskTombstone)
+
+# Sequences of the sharded tables' ids, which must not collide across shards
+ID_SEQUENCES = ("tasks_id_seq", "task_logs_id_seq", "task_tombstones_id_seq")
+
+
+class MoveError(Exception):
+    pass
+
+
+def add_shard_user(db: Session, user: User, shard: int) -> None:
+    """
+    Give `user` a row in the `users` table of shard `shard` (a session on it), for the
+    foreign keys and the change sequence. Nothing to do on shard 0, where the user's
+    own row serves.
+    """
+    if shard != 0:
+        db.merge(User(id=user.id, email=user.email, shard=shard))
+
+
+def assign_shard(db: Session, user: User, router: ShardRouter = shard_router) -> None:
+    """Place a new user (flushed, so it has an id) on a shard and set up their row there."""
+    user.shard = router.place(user.id)
+    if user.shard != 0:
+        shard_db = router.session(user.shard)
+        try:
+            add_shard_user(shard_db, user, user.shard)
+            shard_db.commit()
+        finally:
+            shard_db.close()
+
+
+def _upsert(db: Session, table: Table, rows: list[dict], immutable: bool) -> None:
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(table)
+    if immutable:
+        statement = statement.on_conflict_do_nothing()
+    else:
+        statement = statement.on_conflict_do_update(
+            index_elements=[column.name for column in table.primary_key],
+            set_={
+                column.name: statement.excluded[column.name]
+                for column in table.columns
+                if not column.primary_key
+            },
+        )
+    db.execute(statement, rows)
+
+
+def _copy(source: Session, target: Session, model, criteria: list, batch_size: int) -> int:
+    """Upsert the rows of `model` matching `criteria` from `source` into `target`, by id."""
+    table = model.__table__
+    copied, after = 0, None
+    while True:
+        query = select(table).where(*criteria).order_by(table.c.id).limit(batch_size)
+        if after is not None:
+            query = query.where(table.c.id > after)
+        rows = [dict(row) for row in source.execute(query).mappings()]
+        if not rows:
+            return copied
+        _upsert(target, table, rows, model in IMMUTABLE_MODELS)
+        target.commit()
+        copied += len(rows)
+        after = rows[-1]["id"]
+
+
+def _check_ids(source: Session, target: Session, user_id: int, batch_size: int) -> None:
+    """Raise MoveError if any of the user's row ids is taken by someone else on `target`."""
+    for model in SHARDED_MODELS:
+        after = 0
+        while True:
+            ids = source.scalars(
+                select(model.id)
+                .where(model.user_id == user_id, model.id > after)
+                .order_by(model.id)
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                break
+            clash = target.scalar(
+                select(model.id)
+                .where(model.id.in_(ids), or_(model.user_id != user_id, model.user_id.is_(None)))
+                .limit(1)
+            )
+            if clash is not None:
+                raise MoveError(
+                    f"{model.__tablename__} id {clash} is taken on the target shard; "
+                    "interleave the shards' id sequences first"
+                )
+            after = ids[-1]
+    target.rollback()
+
+
+def _delete_tasks(db: Session, task_ids: list[int]) -> None:
+    db.execute(delete(TaskLog).where(TaskLog.task_id.in_(task_ids)))
+    db.execute(delete(Task).where(Task.id.in_(task_ids)))
+    db.execute(delete(ArchivedTask).where(ArchivedTask.id.in_(task_ids)))
+
+
+@dataclass
+class MoveResult:
+    source: int
+    target: int
+    copied: dict[str, int] = field(default_factory=dict)
+
+
+def move_user(
+    user_id: int, target: int, batch_size: int = 1000, router: ShardRouter = shard_router
+) -> MoveResult:
+    """
+    Move a user's tasks, archived tasks, logs and tombstones to shard `target` while
+    they keep using the app.
+
+    1. Copy every row in committed batches, as of no particular moment.
+    2. Set `shard` on the user's row in the source shard, which locks it: the user's
+       writes wait (they all update that row first) and, once it commits, fail with
+       UserMoved instead of writing to the old shard.
+    3. Copy what changed since the change_seq read before step 1, apply deletions
+       since from the tombstones, and carry the change sequence over.
+    4. Point the directory (`users.shard` in the primary) at the target.
+    5. Delete the rows from the source and commit, releasing the waiting writes.
+
+    Interrupted before the directory changes, the user stays on the source and the
+    move can be rerun; after, only unreachable leftovers remain on the source. Ids
+    must be unique across shards: see `interleave_id_sequences`. Cached task lists
+    are not touched; publish an invalidation for the user afterwards.
+    """
+    user_db = router.session(0)
+    try:
+        user = user_db.get(User, user_id)
+        if user is None:
+            raise MoveError(f"User {user_id} does not exist")
+        source = shard_of(user)
+        result = MoveResult(source, target)
+        if source == target:
+            return result
+        if not 0 <= target < len(router):
+            raise MoveError(f"Shard {target} does not exist")
+        email = user.email
+        # Shard 0 is this same database: no transaction may stay open across the move
+        user_db.rollback()
+
+        source_db, target_db = router.session(source), router.session(target)
+        try:
+            _check_ids(source_db, target_db, user_id, batch_size)
+            add_shard_user(target_db, User(id=user_id, email=email), target)
+            target_db.commit()
+
+            copied_seq = source_db.scalar(select(User.change_seq).where(User.id == user_id))
+            source_db.rollback()
+            for model in SHARDED_MODELS:
+                result.copied[model.__tablename__] = _copy(
+                    source_db, target_db, model, [model.user_id == user_id], batch_size
+                )
+
+            # Writes block from here on
+            source_db.execute(update(User).where(User.id == user_id).values(shard=target))
+            for model in SHARDED_MODELS:
+                result.copied[model.__tablename__] += _copy(
+                    source_db,
+                    target_db,
+                    model,
+                    [model.user_id == user_id, model.change_seq > copied_seq],
+                    batch_size,
+                )
+            deleted = source_db.scalars(
+                select(TaskTombstone.task_id).where(
+                    TaskTombstone.user_id == user_id, TaskTombstone.change_seq > copied_seq
+                )
+            ).all()
+            if deleted:
+                _delete_tasks(target_db, deleted)
+            change_seq, sync_floor_seq = source_db.execute(
+                select(User.change_seq, User.sync_floor_seq).where(User.id == user_id)
+            ).one()
+            # On shard 0 this is also the directory entry
+            target_db.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(change_seq=change_seq, sync_floor_seq=sync_floor_seq, shard=target)
+            )
+            target_db.commit()
+
+            if source != 0 and target != 0:
+                user_db.execute(update(User).where(User.id == user_id).values(shard=target))
+                user_db.commit()
+
+            # With the source on shard 0, the directory entry commits with these deletes
+            for model in reversed(SHARDED_MODELS):
+                source_db.execute(delete(model).where(model.user_id == user_id))
+            if source != 0:
+                source_db.execute(delete(User).where(User.id == user_id))
+            source_db.commit()
+        finally:
+            source_db.close()
+            target_db.close()
+    finally:
+        user_db.close()
+
+    logger.info("Moved user %s from shard %s to %s: %s", user_id, source, target, result.copied)
+    return result
+
+
+def interleave_id_sequences(router: ShardRouter = shard_router, stride: int = 64) -> int:
+    """
+    Make each Postgres shard's id sequences hand out ids congruent to its shard
+    number modulo `stride`, above every id in use on any shard, so rows keep their
+    ids when users move. Room for `stride` shards. Returns the first new id.
+    """
+    highest = 0
+    for engine in router.engines:
+        with engine.connect() as connection:
+            for model in SHARDED_MODELS:
+                query = text(f"SELECT coalesce(max(id), 0) FROM {model.__tablename__}")
+                highest = max(highest, connection.scalar(query))
+    base = (highest // stride + 1) * stride
+    for shard, engine in enumerate(router.engines):
+        if engine.dialect.name != "postgresql":
+            continue
+        with engine.begin() as connection:
+            for sequence in ID_SEQUENCES:
+                connection.execute(
+                    text(f"ALTER SEQUENCE {sequence} INCREMENT BY {stride} RESTART WITH {base + shard}")
+                )
+    return base
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+import anyio
+
+from app.services.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical work: while a computation for a key is in flight,
+    callers asking for the same key wait for it instead of starting their own.
+
+    The computation runs as its own task, so a waiting caller that goes away (a
+    closed connection) does not cancel it for the others. The caller that started it
+    waits for it to finish even then, since it may be using that caller's request
+    resources, such as its database session.
+
+    Nothing is kept once it finishes. Keys must change whenever the result would
+    (for example with a data version), since a caller arriving mid-flight gets the
+    result of a computation that started before it. Callers are counted in the
+    `singleflight` counter by endpoint (`name`) and result: "leader" for those that
+    computed, "coalesced" for those that shared.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is not None:
+            metrics.increment("singleflight", endpoint=self.name, result="coalesced")
+            return await asyncio.shield(flight)
+
+        flight = asyncio.ensure_future(compute())
+        self._flights[key] = flight
+        flight.add_done_callback(lambda done: self._finish(key, done))
+        metrics.increment("singleflight", endpoint=self.name, result="leader")
+        with anyio.CancelScope(shield=True):
+            await asyncio.wait([flight])
+        return flight.result()
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def _finish(self, key: Hashable, done: asyncio.Task) -> None:
+        if self._flights.get(key) is done:
+            del self._flights[key]
+        if not done.cancelled():
+            # Retrieved here so an error nobody waited for is not reported as lost
+            done.exception()
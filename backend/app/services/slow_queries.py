@@ -0,0 +1,200 @@
+import logging
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import Connection, event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.services.timing import current_timings
+
+logger = logging.getLogger(__name__)
+
+# Statements safe to run again under EXPLAIN ANALYZE: reads that take no row locks
+_READ_ONLY = re.compile(r"\s*SELECT\b(?!.*\bFOR\s+(NO\s+KEY\s+)?(UPDATE|SHARE)\b)", re.I | re.S)
+
+
+def parameter_shape(parameters, executemany: bool):
+    """
+    The types of bound parameters without their values: by name or in order, and for
+    executemany the number of rows and the first row's shape.
+    """
+    if executemany:
+        rows = list(parameters)
+        return {"rows": len(rows), "each": parameter_shape(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    parameters: dict | list
+    duration_ms: float
+    recorded_at: float
+    route: str | None = None
+    user_id: int | None = None
+    # Filled in by the background explainer for sampled statements
+    plan: str | None = None
+
+
+def explain(engine: Engine, statement: str, parameters) -> str:
+    """
+    Plan of `statement` with its `parameters`, on a connection of its own: EXPLAIN
+    (ANALYZE, BUFFERS) for Postgres reads, which runs them again, plain EXPLAIN for
+    other Postgres statements and EXPLAIN QUERY PLAN on SQLite. Rolled back after.
+    """
+    postgres = engine.dialect.name == "postgresql"
+    if not postgres:
+        prefix = "EXPLAIN QUERY PLAN "
+    elif _READ_ONLY.match(statement):
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+    else:
+        prefix = "EXPLAIN "
+    with engine.connect() as connection:
+        connection.execution_options(slow_query_log=False)
+        try:
+            if postgres:
+                timeout_ms = int(settings.slow_query_explain_timeout_seconds * 1000)
+                connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+            rows = connection.exec_driver_sql(prefix + statement, parameters).all()
+        finally:
+            connection.rollback()
+    # Postgres gives one line of text per row, SQLite (id, parent, notused, detail)
+    return "\n".join(row[-1] for row in rows)
+
+
+class SlowQueryLog:
+    """
+    The most recent statements of this process slower than `threshold_ms`.
+
+    Each keeps its parameter types (not values), route and user id. A share
+    `explain_rate` of them get their plan captured by a background thread, so the
+    request that ran them does not wait. At most `max_pending` statements wait to be
+    explained; more are left without a plan rather than queued.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float | None,
+        size: int,
+        explain_rate: float,
+        max_pending: int = 16,
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain_rate = explain_rate
+        self._entries: deque[SlowQuery] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._pending: queue.Queue = queue.Queue(max_pending)
+        self._thread: threading.Thread | None = None
+
+    def record(
+        self, engine: Engine, statement: str, parameters, executemany: bool, seconds: float
+    ) -> SlowQuery:
+        timings = current_timings()
+        entry = SlowQuery(
+            statement,
+            parameter_shape(parameters, executemany),
+            round(seconds * 1000, 3),
+            time.time(),
+            route=timings.route if timings else None,
+            user_id=timings.user_id if timings else None,
+        )
+        with self._lock:
+            self._entries.append(entry)
+        if not executemany and random.random() < self.explain_rate:
+            self._explain_later(engine, entry, parameters)
+        return entry
+
+    def entries(self) -> list[dict]:
+        """Recorded statements, newest first."""
+        with self._lock:
+            return [asdict(entry) for entry in reversed(self._entries)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def join(self) -> None:
+        """Wait until the plans queued so far are captured."""
+        self._pending.join()
+
+    def _explain_later(self, engine: Engine, entry: SlowQuery, parameters) -> None:
+        try:
+            self._pending.put_nowait((engine, entry, parameters))
+        except queue.Full:
+            return
+        with self._lock:
+            # Started on first use, so each worker process gets its own after a fork
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="slow-query-explain", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            engine, entry, parameters = self._pending.get()
+            try:
+                entry.plan = explain(engine, entry.statement, parameters)
+            except Exception:
+                logger.warning("Could not explain slow statement", exc_info=True)
+            finally:
+                self._pending.task_done()
+
+
+slow_query_log = SlowQueryLog(
+    settings.slow_query_threshold_ms,
+    settings.slow_query_log_size,
+    settings.slow_query_explain_rate,
+)
+
+
+def _logged(conn: Connection) -> bool:
+    return slow_query_log.threshold_ms is not None and conn.get_execution_options().get(
+        "slow_query_log", True
+    )
+
+
+@event.listens_for(Engine, "begin")
+def _begin(conn):
+    # SET LOCAL lasts until the end of the transaction
+    conn.info.pop("route_statement_timeout", None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if settings.route_statement_timeouts and conn.dialect.name == "postgresql":
+        timings = current_timings()
+        timeout = timings and settings.route_statement_timeouts.get(timings.route)
+        if timeout and "route_statement_timeout" not in conn.info:
+            # On a cursor of its own: `cursor` may be a server-side one, good for one query
+            with conn.connection.cursor() as setter:
+                setter.execute(f"SET LOCAL statement_timeout = {int(timeout * 1000)}")
+            conn.info["route_statement_timeout"] = timeout
+    if _logged(conn):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("slow_query_start")
+    if not starts or not _logged(conn):
+        return
+    seconds = time.perf_counter() - starts.pop()
+    if seconds * 1000 >= slow_query_log.threshold_ms:
+        slow_query_log.record(conn.engine, statement, parameters, executemany, seconds)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    starts = connection.info.get("slow_query_start") if connection else None
+    if starts:
+        starts.pop()
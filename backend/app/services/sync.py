@@ -0,0 +1,173 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ColumnElement
+
+from app.models.archive import ArchivedTask
+from app.models.task import Task, TaskLog
+from app.models.tombstone import TaskTombstone
+from app.models.user import User
+from app.services.pagination import encode_change_cursor
+
+# Changes sharing a change_seq (a completion and its log) are ordered by kind, then id
+TASK, LOG, TOMBSTONE = 0, 1, 2
+# Kind of a position after every change with its change_seq
+END = 3
+
+STREAMS = ((TASK, Task), (TASK, ArchivedTask), (LOG, TaskLog), (TOMBSTONE, TaskTombstone))
+
+
+class UserMoved(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Your tasks are being moved, try again",
+            headers={"Retry-After": "1"},
+        )
+
+
+class CursorExpired(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_410_GONE,
+            detail="Deletions since this cursor are no longer kept, sync from the start",
+        )
+
+
+def next_change_seq(db: Session, user_id: int) -> int:
+    """
+    Take the user's next change sequence number, to stamp on the rows a write changes.
+
+    Increments `users.change_seq` in the write's transaction, so the user's row stays
+    locked until it commits: one user's writes commit in sequence order, and whoever
+    reads change_seq N can already see every change numbered up to N. Also stamps
+    `users.last_write_at`, which keeps the user's reads off lagging replicas. Raises
+    UserMoved when the user's tasks are no longer on the session's shard.
+    """
+    change_seq = db.execute(
+        update(User)
+        .where(User.id == user_id, User.shard == db.info.get("shard", 0))
+        .values(change_seq=User.change_seq + 1, last_write_at=datetime.now(timezone.utc))
+        .returning(User.change_seq)
+    ).scalar_one_or_none()
+    if change_seq is None:
+        raise UserMoved()
+    return change_seq
+
+
+def record_deletion(db: Session, user_id: int, task_id: int, now: datetime | None = None) -> None:
+    """Leave a tombstone for a deleted task, so syncing clients drop it too."""
+    db.execute(
+        insert(TaskTombstone).values(
+            user_id=user_id,
+            task_id=task_id,
+            change_seq=next_change_seq(db, user_id),
+            deleted_at=now or datetime.now(timezone.utc),
+        )
+    )
+
+
+@dataclass
+class ChangePage:
+    tasks: list
+    logs: list[TaskLog]
+    deleted: list[int]
+    next_cursor: str
+    has_more: bool
+
+
+def _after(model, kind: int, after: tuple[int, int, int]) -> ColumnElement:
+    """Rows of a `kind` stream past the (change_seq, kind, id) position `after`."""
+    change_seq, after_kind, after_id = after
+    if kind > after_kind:
+        return model.change_seq >= change_seq
+    if kind < after_kind:
+        return model.change_seq > change_seq
+    return tuple_(model.change_seq, model.id) > (change_seq, after_id)
+
+
+def changes_since(
+    db: Session, user_id: int, after: tuple[int, int, int] | None, limit: int
+) -> ChangePage:
+    """
+    Up to `limit` of a user's changes past the (change_seq, kind, id) position `after`,
+    oldest first: tasks (hot and archived) and logs written since, and tombstones of
+    tasks deleted since. Everything from the start when `after` is None.
+
+    Each stream is a keyset query on its (user_id, change_seq, id) index, so the work
+    depends on the number of changes, not on how many tasks the user has. Only
+    changes up to the user's change_seq read first are returned: those are committed,
+    whereas a later write may be half visible to the separate stream queries. Raises
+    CursorExpired when tombstones past `after` have been compacted away.
+    """
+    latest, floor = db.execute(
+        select(User.change_seq, User.sync_floor_seq).where(User.id == user_id)
+    ).one()
+    if after is not None and after[0] < floor:
+        raise CursorExpired()
+
+    changes = []
+    for kind, model in STREAMS:
+        query = select(model).where(model.user_id == user_id, model.change_seq <= latest)
+        if after is not None:
+            query = query.where(_after(model, kind, after))
+        query = query.order_by(model.change_seq, model.id).limit(limit + 1)
+        changes.extend(((row.change_seq, kind, row.id), row) for row in db.scalars(query))
+    changes.sort(key=lambda change: change[0])
+
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if has_more:
+        position = changes[-1][0]
+    else:
+        # Caught up: start after everything numbered up to `latest`, never going back
+        position = max((latest, END, 0), after or (0, 0, 0))
+
+    page = ChangePage([], [], [], encode_change_cursor(*position), has_more)
+    for (_, kind, _), row in changes:
+        if kind == TASK:
+            page.tasks.append(row)
+        elif kind == LOG:
+            page.logs.append(row)
+        else:
+            page.deleted.append(row.task_id)
+    return page
+
+
+def compact_tombstones(
+    db: Session, older_than: timedelta, batch_size: int, now: datetime | None = None
+) -> int:
+    """
+    Delete tombstones older than `now - older_than`, in committed batches of
+    `batch_size`. Each user's `sync_floor_seq` is first raised past their deleted
+    tombstones, so cursors from before them get CursorExpired instead of silently
+    missing deletions. Returns the number deleted.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - older_than
+    removed = 0
+    while True:
+        rows = db.execute(
+            select(TaskTombstone.id, TaskTombstone.user_id, TaskTombstone.change_seq)
+            .where(TaskTombstone.deleted_at < cutoff)
+            .order_by(TaskTombstone.deleted_at)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return removed
+
+        floors: dict[int, int] = {}
+        for _, user_id, change_seq in rows:
+            floors[user_id] = max(floors.get(user_id, 0), change_seq)
+        for user_id, change_seq in floors.items():
+            db.execute(
+                update(User)
+                .where(User.id == user_id, User.sync_floor_seq < change_seq)
+                .values(sync_floor_seq=change_seq)
+            )
+        db.execute(delete(TaskTombstone).where(TaskTombstone.id.in_([row.id for row in rows])))
+        db.commit()
+        removed += len(rows)
@@ -0,0 +1,327 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Iterable
+
+import numpy as np
+
+from app.config import settings
+from app.models.task import Task, TaskType
+from app.services.forecast import utc_timestamp
+from app.services.metrics import metrics
+from app.services.priority import ScoringModel, priority_scores
+
+# Columns of `TaskSnapshot.values`; timestamps are UTC seconds and NaN stands for NULL
+COLUMNS = (
+    "id",
+    "version",
+    "endless",
+    "impact",
+    "effort",
+    "not_doing_hourly_rate",
+    "doing_hourly_rate",
+    "impact_set_to",
+    "deadline",
+    "created_at",
+    "last_updated",
+)
+_COL = {name: i for i, name in enumerate(COLUMNS)}
+_TIMESTAMPS = ("deadline", "created_at", "last_updated")
+# Task columns a snapshot is built from
+TEXT_COLUMNS = ("title", "description")
+SNAPSHOT_COLUMNS = (*(name for name in COLUMNS if name != "endless"), "task_type", *TEXT_COLUMNS)
+
+
+def _row(task: Task) -> list[float]:
+    row = []
+    for name in COLUMNS:
+        if name == "endless":
+            value = task.task_type == TaskType.ENDLESS
+        else:
+            value = getattr(task, name)
+            if value is not None and name in _TIMESTAMPS:
+                value = utc_timestamp(value)
+        row.append(np.nan if value is None else float(value))
+    return row
+
+
+def _datetime(timestamp: float) -> datetime:
+    # Naive UTC, as the columns are read from the database
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+def _optional(value: float) -> float | None:
+    return None if np.isnan(value) else value
+
+
+class CachedTask:
+    """A task's snapshot row and texts, captured before the write that produced it commits."""
+
+    __slots__ = ("id", "version", "completed", "row", "title", "description")
+
+    def __init__(self, task: Task):
+        self.id = task.id
+        self.version = task.version
+        self.completed = task.completed_at is not None
+        self.row = _row(task)
+        self.title = task.title
+        self.description = task.description
+
+
+class TaskSnapshot:
+    """
+    A user's active tasks as parallel columns: numbers and timestamps in one float64
+    matrix (a row per task) and the texts in tuples. About a third of the memory of
+    one object per task, and scored for all rows at once.
+    """
+
+    __slots__ = ("values", "titles", "descriptions", "loaded_at", "size")
+
+    def __init__(self, values: np.ndarray, titles: tuple, descriptions: tuple, loaded_at: float):
+        self.values = values
+        self.titles = titles
+        self.descriptions = descriptions
+        self.loaded_at = loaded_at
+        # `values` owns its data, so its size includes the matrix
+        self.size = (
+            sys.getsizeof(self)
+            + sys.getsizeof(values)
+            + sys.getsizeof(titles)
+            + sum(sys.getsizeof(text) for text in titles)
+            + sys.getsizeof(descriptions)
+            + sum(sys.getsizeof(text) for text in descriptions if text is not None)
+        )
+
+    @classmethod
+    def from_tasks(cls, tasks: Iterable[Task], loaded_at: float) -> "TaskSnapshot":
+        """
+        Snapshot of tasks, or of rows with their `SNAPSHOT_COLUMNS`; texts missing from
+        the rows are None.
+        """
+        tasks = list(tasks)
+        values = np.empty((len(tasks), len(COLUMNS)))
+        for i, task in enumerate(tasks):
+            values[i] = _row(task)
+        return cls(
+            values,
+            tuple(getattr(task, "title", None) for task in tasks),
+            tuple(getattr(task, "description", None) for task in tasks),
+            loaded_at,
+        )
+
+    def with_task(self, task: CachedTask) -> "TaskSnapshot | None":
+        """
+        Copy with `task`'s row replaced or added. None when the snapshot already holds
+        a newer version of it.
+        """
+        (match,) = np.nonzero(self.values[:, _COL["id"]] == task.id)
+        titles, descriptions = list(self.titles), list(self.descriptions)
+        if len(match):
+            i = int(match[0])
+            if self.values[i, _COL["version"]] > task.version:
+                return None
+            values = self.values.copy()
+            values[i] = task.row
+            titles[i], descriptions[i] = task.title, task.description
+        else:
+            values = np.vstack([self.values, [task.row]])
+            titles.append(task.title)
+            descriptions.append(task.description)
+        return TaskSnapshot(values, tuple(titles), tuple(descriptions), self.loaded_at)
+
+    def scores(
+        self, now: datetime, model: ScoringModel | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (impacts, priority scores) of every row at `now`: `update_task_impact` and
+        `calculate_priority_score` with the scoring `model` over all rows at once.
+        """
+        v = self.values
+        return priority_scores(
+            v[:, _COL["impact"]],
+            v[:, _COL["not_doing_hourly_rate"]],
+            v[:, _COL["effort"]],
+            v[:, _COL["deadline"]],
+            v[:, _COL["last_updated"]],
+            utc_timestamp(now),
+            model,
+        )
+
+    def responses(self, now: datetime, impacts: np.ndarray, priorities: np.ndarray) -> list[dict]:
+        """Task response dicts with the `scores` at `now`, highest priority first."""
+        rows = self.values.tolist()
+        responses = []
+        for i in np.argsort(-priorities, kind="stable").tolist():
+            row = rows[i]
+            responses.append(
+                {
+                    "id": int(row[_COL["id"]]),
+                    "title": self.titles[i],
+                    "description": self.descriptions[i],
+                    "task_type": TaskType.ENDLESS if row[_COL["endless"]] else TaskType.ENDING,
+                    "impact": float(impacts[i]),
+                    "effort": row[_COL["effort"]],
+                    "not_doing_hourly_rate": row[_COL["not_doing_hourly_rate"]],
+                    "doing_hourly_rate": _optional(row[_COL["doing_hourly_rate"]]),
+                    "impact_set_to": _optional(row[_COL["impact_set_to"]]),
+                    "deadline": None if np.isnan(row[_COL["deadline"]]) else _datetime(row[_COL["deadline"]]),
+                    "created_at": _datetime(row[_COL["created_at"]]),
+                    "last_updated": now,
+                    "completed_at": None,
+                    "priority_score": float(priorities[i]),
+                    "version": int(row[_COL["version"]]),
+                }
+            )
+        return responses
+
+
+class TaskCache:
+    """
+    LRU of each user's active tasks as `TaskSnapshot`s, bounded by user count and
+    approximate bytes.
+
+    Writes go through `put` and `invalidate` after they commit, and other processes'
+    writes arrive as `invalidate` calls from the invalidation bus. A load that
+    overlaps a write for the same user is not stored (see `begin_load`). Snapshots
+    also expire after `ttl_seconds`, a backstop for invalidations that never arrive.
+    """
+
+    def __init__(self, max_users: int, max_bytes: int, ttl_seconds: float):
+        self.max_users = max_users
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._snapshots: OrderedDict[int, TaskSnapshot] = OrderedDict()
+        self._loads: dict[int, object] = {}
+        self._bytes = 0
+        # Off while the invalidation bus is disconnected
+        self.enabled = True
+        # Per-user data versions: the sequence number of the user's last write, for the
+        # most recently written users, and a floor at or above any other user's
+        self._versions: OrderedDict[int, int] = OrderedDict()
+        self._sequence = 0
+        self._version_floor = 0
+
+    def get(self, user_id: int) -> TaskSnapshot | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            snapshot = self._snapshots.get(user_id)
+            if snapshot is not None and time.monotonic() - snapshot.loaded_at > self.ttl_seconds:
+                self._remove(user_id)
+                snapshot = None
+            if snapshot is not None:
+                self._snapshots.move_to_end(user_id)
+        metrics.increment("task_cache", result="hit" if snapshot is not None else "miss")
+        return snapshot
+
+    def version(self, user_id: int) -> int:
+        """
+        A number that changes whenever a write for `user_id` is applied here, locally
+        or from the invalidation bus (it may also change without one).
+        """
+        with self._lock:
+            return self._versions.get(user_id, self._version_floor)
+
+    def begin_load(self, user_id: int) -> object:
+        """Token to pass to `finish_load`; any write for the user meanwhile voids it."""
+        token = object()
+        with self._lock:
+            self._loads[user_id] = token
+        return token
+
+    def finish_load(self, user_id: int, token: object, tasks: Iterable[Task]) -> TaskSnapshot:
+        """Snapshot `tasks` and cache it unless a write happened since `begin_load`."""
+        snapshot = TaskSnapshot.from_tasks(tasks, time.monotonic())
+        with self._lock:
+            if self.enabled and self._loads.get(user_id) is token:
+                del self._loads[user_id]
+                self._remove(user_id)
+                self._store(user_id, snapshot)
+        return snapshot
+
+    def put(self, user_id: int, task: CachedTask) -> None:
+        """
+        Apply a committed write of `task` to its owner's snapshot, if cached. A task
+        that is no longer active drops the snapshot.
+        """
+        if task.completed:
+            self.invalidate(user_id)
+            return
+        with self._lock:
+            self._loads.pop(user_id, None)
+            self._written(user_id)
+            snapshot = self._snapshots.get(user_id)
+            if snapshot is None:
+                return
+            updated = snapshot.with_task(task)
+            if updated is not None:
+                self._remove(user_id)
+                self._store(user_id, updated)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._loads.pop(user_id, None)
+            self._written(user_id)
+            if self._remove(user_id):
+                metrics.increment("task_cache_invalidations")
+
+    def set_connected(self, connected: bool) -> None:
+        """Invalidation bus state changes; invalidations may have been missed either way."""
+        with self._lock:
+            self.enabled = connected
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+            self._loads.clear()
+            self._bytes = 0
+            self._sequence += 1
+            self._versions.clear()
+            self._version_floor = self._sequence
+            self._report()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"users": len(self._snapshots), "bytes": self._bytes}
+
+    def _written(self, user_id: int) -> None:
+        self._sequence += 1
+        self._versions[user_id] = self._sequence
+        self._versions.move_to_end(user_id)
+        if len(self._versions) > self.max_users:
+            _, forgotten = self._versions.popitem(last=False)
+            self._version_floor = max(self._version_floor, forgotten)
+
+    def _store(self, user_id: int, snapshot: TaskSnapshot) -> None:
+        self._snapshots[user_id] = snapshot
+        self._bytes += snapshot.size
+        while self._snapshots and (
+            len(self._snapshots) > self.max_users or self._bytes > self.max_bytes
+        ):
+            _, evicted = self._snapshots.popitem(last=False)
+            self._bytes -= evicted.size
+            metrics.increment("task_cache_evictions")
+        self._report()
+
+    def _remove(self, user_id: int) -> bool:
+        snapshot = self._snapshots.pop(user_id, None)
+        if snapshot is None:
+            return False
+        self._bytes -= snapshot.size
+        self._report()
+        return True
+
+    def _report(self) -> None:
+        metrics.set_gauge("task_cache_users", len(self._snapshots))
+        metrics.set_gauge("task_cache_bytes", self._bytes)
+
+
+task_cache = TaskCache(
+    max_users=settings.task_cache_max_users,
+    max_bytes=settings.task_cache_max_bytes,
+    ttl_seconds=settings.task_cache_ttl_seconds,
+)
@@ -0,0 +1,197 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, case, insert, literal, select, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.models.task import Task, TaskLog, TaskType
+
+
+class hours_between(FunctionElement):
+    """Hours elapsed from `start` to `end` as a float, compiled per dialect."""
+
+    type = Float()
+    inherit_cache = True
+    name = "hours_between"
+
+
+@compiles(hours_between)
+def _compile_hours_between(element, compiler, **kw):
+    end, start = list(element.clauses)
+    return f"EXTRACT(EPOCH FROM ({compiler.process(end, **kw)} - {compiler.process(start, **kw)})) / 3600"
+
+
+@compiles(hours_between, "sqlite")
+def _compile_hours_between_sqlite(element, compiler, **kw):
+    end, start = list(element.clauses)
+    return f"(julianday({compiler.process(end, **kw)}) - julianday({compiler.process(start, **kw)})) * 24"
+
+
+class clamp_impact(FunctionElement):
+    """Clamp an impact expression to the 0-10 range."""
+
+    type = Float()
+    inherit_cache = True
+    name = "clamp_impact"
+
+
+@compiles(clamp_impact)
+def _compile_clamp_impact(element, compiler, **kw):
+    return f"GREATEST(0.0, LEAST(10.0, {compiler.process(element.clauses, **kw)}))"
+
+
+@compiles(clamp_impact, "sqlite")
+def _compile_clamp_impact_sqlite(element, compiler, **kw):
+    return f"max(0.0, min(10.0, {compiler.process(element.clauses, **kw)}))"
+
+
+def grown_impact(now: datetime | ColumnElement) -> ColumnElement:
+    """
+    SQL expression for the impact `impact_at` computes: the stored impact plus its growth
+    since `last_updated`, clamped to 0-10. Impact is only stored on writes, so every
+    write that moves `last_updated` must store this first.
+    """
+    if isinstance(now, datetime):
+        now = literal(now, DateTime)
+    return clamp_impact(
+        Task.impact + hours_between(now, Task.last_updated) * Task.not_doing_hourly_rate
+    )
+
+
+def impact_after_activity(duration_minutes: int, now: datetime | ColumnElement) -> ColumnElement:
+    """
+    SQL expression for the impact `apply_activity_to_impact` computes.
+
+    Column references in an UPDATE's SET clause read the row's values from before the
+    statement, so this matches the Python service applied to the stored row. The
+    activity applies to the grown impact capped at 10, as shown in lists.
+    """
+    grown = grown_impact(now)
+    return clamp_impact(
+        case(
+            (Task.impact_set_to.is_not(None), Task.impact_set_to),
+            (
+                Task.doing_hourly_rate.is_not(None),
+                grown - (duration_minutes / 60) * Task.doing_hourly_rate,
+            ),
+            else_=grown,
+        )
+    )
+
+
+def completion_values(duration_minutes: int | None, now: datetime) -> dict:
+    """
+    SET clause completing a task: ending tasks get `completed_at`, endless tasks have
+    the logged activity applied to their impact.
+    """
+    now = literal(now, DateTime)
+    values = {
+        "completed_at": case((Task.task_type == TaskType.ENDING, now), else_=Task.completed_at),
+        "version": Task.version + 1,
+    }
+    if duration_minutes is not None:
+        is_endless = Task.task_type == TaskType.ENDLESS
+        values["impact"] = case(
+            (is_endless, impact_after_activity(duration_minutes, now)), else_=Task.impact
+        )
+        values["last_updated"] = case((is_endless, now), else_=Task.last_updated)
+    return values
+
+
+def insert_task(db: Session, values: dict) -> Task:
+    """INSERT ... RETURNING the new task."""
+    return db.scalars(insert(Task).values(**values).returning(Task)).one()
+
+
+def update_task_fields(
+    db: Session,
+    task_id: int,
+    user_id: int,
+    values: dict,
+    now: datetime,
+    expected_versions: set[int] | None = None,
+) -> Task | None:
+    """
+    UPDATE ... RETURNING the task with `values` applied.
+
+    Unless `values` sets the impact, the growth up to `now` is stored with the new
+    `last_updated`, so it is not lost. Returns None when the task does not exist or
+    its version is not in `expected_versions`.
+    """
+    stmt = update(Task).where(Task.id == task_id, Task.user_id == user_id)
+    if expected_versions is not None:
+        stmt = stmt.where(Task.version.in_(expected_versions))
+    if values.get("impact") is None:
+        values = {**values, "impact": grown_impact(now)}
+    stmt = stmt.values(**values, last_updated=now, version=Task.version + 1).returning(Task)
+    return db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+
+
+def completion_with_log_query(
+    criteria: list, values: dict, duration_minutes: int, now: datetime, change_seq: int = 0
+):
+    """
+    Postgres statement that completes the task and inserts its log, selecting the
+    updated row: WITH updated AS (UPDATE ... RETURNING), inserted_log AS (INSERT ...
+    SELECT FROM updated) SELECT FROM updated.
+    """
+    updated = (
+        update(Task.__table__)
+        .where(*criteria)
+        .values(**values)
+        .returning(*Task.__table__.c)
+        .cte("updated")
+    )
+    log = insert(TaskLog).from_select(
+        ["task_id", "user_id", "change_seq", "duration_minutes", "logged_at"],
+        select(
+            updated.c.id,
+            updated.c.user_id,
+            literal(change_seq),
+            literal(duration_minutes),
+            literal(now, DateTime),
+        ).where(updated.c.task_type == TaskType.ENDLESS),
+    )
+    return select(aliased(Task, updated)).add_cte(log.cte("inserted_log"))
+
+
+def complete_task(
+    db: Session,
+    task_id: int,
+    user_id: int,
+    now: datetime,
+    duration_minutes: int | None = None,
+    change_seq: int = 0,
+) -> Task | None:
+    """
+    Complete an ending task or log time on an endless one, returning the updated task.
+
+    On Postgres the update and the log insert are a single statement (a data-modifying
+    CTE); SQLite cannot use UPDATE in a CTE, so there the log is a second INSERT in the
+    same transaction. Without `duration_minutes` only ending tasks match. The task and
+    its log are stamped with `change_seq`. Returns None when no task matched.
+    """
+    criteria = [Task.id == task_id, Task.user_id == user_id]
+    if duration_minutes is None:
+        criteria.append(Task.task_type == TaskType.ENDING)
+    values = completion_values(duration_minutes, now) | {"change_seq": change_seq}
+
+    if duration_minutes is not None and db.get_bind().dialect.name == "postgresql":
+        query = completion_with_log_query(criteria, values, duration_minutes, now, change_seq)
+        return db.scalars(query, execution_options={"populate_existing": True}).one_or_none()
+
+    stmt = update(Task).where(*criteria).values(**values).returning(Task)
+    task = db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+    if task is not None and duration_minutes is not None and task.task_type == TaskType.ENDLESS:
+        db.execute(
+            insert(TaskLog).values(
+                task_id=task.id,
+                user_id=user_id,
+                change_seq=change_seq,
+                duration_minutes=duration_minutes,
+                logged_at=now,
+            )
+        )
+    return task
@@ -0,0 +1,84 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class RequestTimings:
+    """Per-request phase durations (seconds) and database statement count."""
+
+    phases: dict[str, float] = field(default_factory=dict)
+    db_count: int = 0
+    user_id: int | None = None
+    peak_memory_bytes: int | None = None
+    # The request's ASGI scope, which gains the matched route once routed
+    scope: dict | None = field(default=None, repr=False)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @property
+    def route(self) -> str | None:
+        """Method and path template of the matched route, e.g. "GET /api/tasks/{task_id}"."""
+        path = getattr(self.scope.get("route"), "path", None) if self.scope else None
+        return f"{self.scope['method']} {path}" if path else None
+
+
+# The same RequestTimings object is reachable from the threadpool, since work items
+# run in a copy of the request's context that references it.
+_current_timings: contextvars.ContextVar[RequestTimings | None] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def current_timings() -> RequestTimings | None:
+    return _current_timings.get()
+
+
+def start_request(scope: dict | None = None) -> contextvars.Token:
+    return _current_timings.set(RequestTimings(scope=scope))
+
+
+def end_request(token: contextvars.Token) -> None:
+    _current_timings.reset(token)
+
+
+@contextmanager
+def phase(name: str):
+    """Add the wall time of the block to the current request's `name` phase."""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_timings.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current_timings.get()
+    starts = conn.info.get("query_start_time")
+    if timings is None or not starts:
+        return
+    timings.add("db", time.perf_counter() - starts.pop())
+    timings.db_count += 1
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+    if starts:
+        starts.pop()
@@ -0,0 +1,91 @@
+"""
+Compare response compression settings on task lists of several sizes.
+
+Usage: python benchmarks/bench_compression.py [--sizes 10,100,1000,5000] [--repeat 20]
+
+Serializes lists of synthetic tasks with sentence-like descriptions the way
+GET /api/tasks does, then reports the compressed size and compression time of each
+gzip level (and brotli quality, when brotli is installed). Compression only pays
+off when the bytes saved take longer to send than the CPU time spent; the cached
+path for ETagged responses costs a digest instead, shown on the last line.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.schemas.task import TaskResponse  # noqa: E402
+from app.services.compression import ENCODINGS, body_digest, compress  # noqa: E402
+
+WORDS = (
+    "review draft send report call plan budget team client email update fix write "
+    "read schedule meeting notes slides invoice tax return garden groceries"
+).split()
+
+SETTINGS = [("gzip", level) for level in (1, 4, 6, 9)] + (
+    [("br", quality) for quality in (1, 4, 11)] if "br" in ENCODINGS else []
+)
+
+
+def task_list(count: int) -> bytes:
+    rng = random.Random(0)
+    now = datetime.now(timezone.utc)
+    tasks = [
+        {
+            "id": i,
+            "title": " ".join(rng.choices(WORDS, k=4)).capitalize(),
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(0, 60))) or None,
+            "task_type": "ending",
+            "impact": rng.uniform(0, 10),
+            "effort": rng.choice([0.25, 0.5, 1.0, 2.0]),
+            "not_doing_hourly_rate": 0.1,
+            "created_at": now,
+            "last_updated": now,
+            "priority_score": rng.uniform(0, 10),
+        }
+        for i in range(count)
+    ]
+    adapter = TypeAdapter(list[TaskResponse])
+    return adapter.dump_json(adapter.validate_python(tasks))
+
+
+def timed(repeat: int, function, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000,5000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for count in [int(size) for size in args.sizes.split(",")]:
+        body = task_list(count)
+        print(f"{count} tasks, {len(body) / 1024:.1f} KiB")
+        for encoding, level in SETTINGS:
+            gzip_level, brotli_quality = (level, 0) if encoding == "gzip" else (6, level)
+            size = len(compress(body, encoding, gzip_level, brotli_quality))
+            seconds = timed(args.repeat, compress, body, encoding, gzip_level, brotli_quality)
+            print(
+                f"  {encoding:4} {level:2}: {size / 1024:8.1f} KiB ({size / len(body):5.1%}), "
+                f"{seconds * 1000:7.2f} ms, {len(body) / seconds / 2**20:6.0f} MiB/s"
+            )
+        seconds = timed(args.repeat, body_digest, body)
+        print(f"  cached   : digest {seconds * 1000:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
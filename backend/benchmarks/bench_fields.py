@@ -0,0 +1,103 @@
+"""
+Compare full task lists with sparse fieldsets.
+
+Usage: python benchmarks/bench_fields.py [--tasks 1000] [--repeat 20]
+                                         [--fields title,priority_score,deadline]
+
+Seeds a throwaway SQLite database with one user's active and completed tasks, with
+paragraph-long descriptions, then times GET /api/tasks and /api/tasks/completed the
+way the endpoints build them: the full response against `--fields`. The active list
+is read with the task cache off, so every call queries the database like a cache
+miss does. Reports response bytes and median milliseconds.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def seed(task_count: int):
+    """Create the schema, a user and `task_count` active and completed tasks each."""
+    from datetime import datetime, timedelta, timezone
+
+    from app.database import Base, SessionLocal, engine
+    from app.models.task import Task
+    from app.models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password=None)
+    db.add(user)
+    db.flush()
+    now = datetime.now(timezone.utc)
+    description = "Notes on what needs doing and why it matters. " * 12
+    db.add_all(
+        Task(
+            title=f"Task {i}",
+            description=description,
+            impact=i % 10,
+            user_id=user.id,
+            completed_at=now - timedelta(minutes=i) if completed else None,
+        )
+        for completed in (False, True)
+        for i in range(task_count)
+    )
+    db.commit()
+    return db, user.id
+
+
+def timed(repeat: int, function) -> tuple[float, int]:
+    timings, size = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(function())
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--fields", default="title,priority_score,deadline")
+    args = parser.parse_args()
+
+    database = Path(tempfile.mkdtemp()) / "bench_fields.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    from app.api.tasks import get_completed_tasks, task_list_json
+    from app.api.dependencies import FieldParams, PageParams
+    from app.services.task_cache import task_cache
+
+    db, user_id = seed(args.tasks)
+    user = type("BenchUser", (), {"id": user_id})()
+    task_cache.enabled = False
+    page = PageParams(cursor=None, limit=200)
+
+    endpoints = {
+        "GET /api/tasks": lambda fields: lambda: task_list_json(
+            db, user_id, FieldParams(fields).fields
+        ),
+        "GET /api/tasks/completed": lambda fields: lambda: get_completed_tasks(
+            page, FieldParams(fields), None, db, user
+        ).body,
+    }
+    print(f"{args.tasks} active and {args.tasks} completed tasks, fields={args.fields}")
+    for name, call in endpoints.items():
+        full_seconds, full_size = timed(args.repeat, call(None))
+        sparse_seconds, sparse_size = timed(args.repeat, call(args.fields))
+        print(f"  {name}")
+        print(f"    all fields: {full_size / 1024:8.1f} KiB, {full_seconds * 1000:7.2f} ms")
+        print(
+            f"    sparse    : {sparse_size / 1024:8.1f} KiB, {sparse_seconds * 1000:7.2f} ms "
+            f"({sparse_size / full_size:.0%} of the bytes, {sparse_seconds / full_seconds:.0%} of the time)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Time the priority forecast for a tasks x steps grid.
+
+Usage: python benchmarks/bench_forecast.py [--tasks 1000] [--steps 1000] [--k 5]
+                                           [--repeat 20]
+
+Reports the best and median time for scoring the grid, selecting the per-step
+top-k and finding crossovers, which is the work GET /api/tasks/forecast does
+before serializing the response.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.models.task import Task  # noqa: E402
+from app.models.user import User  # noqa: E402,F401 - configures Task.user
+from app.services.forecast import forecast_scores  # noqa: E402
+
+
+def make_tasks(count: int, now: datetime) -> list[Task]:
+    rng = random.Random(0)
+    return [
+        Task(
+            id=i + 1,
+            impact=rng.uniform(0, 10),
+            effort=rng.uniform(0.1, 8),
+            not_doing_hourly_rate=rng.uniform(0, 0.5),
+            last_updated=now - timedelta(hours=rng.uniform(0, 48)),
+            deadline=now + timedelta(days=rng.uniform(0, 14)) if rng.random() < 0.3 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    tasks = make_tasks(args.tasks, now)
+    step = timedelta(hours=1)
+    horizon = step * (args.steps - 1)
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        forecast = forecast_scores(tasks, now, horizon, step)
+        top_rows, _ = forecast.top_k(args.k)
+        crossovers = forecast.crossovers(top_rows)
+        timings.append(time.perf_counter() - start)
+
+    print(f"{args.tasks} tasks x {args.steps} steps, top {args.k}, {len(crossovers)} crossovers")
+    print(f"best {min(timings) * 1000:.1f} ms, median {statistics.median(timings) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Time the task planner on random task sets.
+
+Usage: python benchmarks/bench_planner.py [--tasks 5000] [--hours 8] [--repeat 50]
+
+Reports planning time for the given task count (greedy above EXACT_MAX_TASKS)
+and for EXACT_MAX_TASKS tasks, which is the slowest exact case.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.planner import EXACT_MAX_TASKS, plan_tasks  # noqa: E402
+
+
+def bench(count: int, hours: float, repeat: int) -> None:
+    rng = random.Random(0)
+    efforts = np.array([rng.choice([0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0]) for _ in range(count)])
+    scores = np.array([rng.uniform(0, 10) for _ in range(count)])
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        plan = plan_tasks(efforts, scores, hours)
+        timings.append(time.perf_counter() - start)
+
+    print(
+        f"{count} tasks, {hours}h ({plan.method}): {len(plan.indices)} chosen, "
+        f"best {min(timings) * 1000:.2f} ms, median {statistics.median(timings) * 1000:.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--hours", type=float, default=8.0)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    bench(args.tasks, args.hours, args.repeat)
+    bench(EXACT_MAX_TASKS, args.hours, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
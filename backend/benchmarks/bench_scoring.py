@@ -0,0 +1,103 @@
+"""
+Compare the scalar, NumPy and SQL forms of each scoring model.
+
+Usage: python benchmarks/bench_scoring.py [--tasks 10000] [--repeat 10]
+
+Seeds a throwaway SQLite database with one user's active tasks, a third of them with
+deadlines from a week overdue to two months out, then scores them all with every
+model in SCORING_MODELS: `calculate_priority_score` task by task, the task cache's
+batch `scores`, and `priority_expression` in a query. Reports median milliseconds and
+tasks per second.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def seed(task_count: int):
+    """Create the schema, a user and `task_count` active tasks."""
+    import random
+    from datetime import datetime, timedelta, timezone
+
+    from app.database import Base, SessionLocal, engine
+    from app.models.task import Task
+    from app.models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password=None)
+    db.add(user)
+    db.flush()
+    rng = random.Random(0)
+    now = datetime.now(timezone.utc)
+    db.add_all(
+        Task(
+            title=f"Task {i}",
+            impact=rng.uniform(0, 10),
+            effort=rng.choice([0.05, 0.5, 1.0, 4.0]),
+            not_doing_hourly_rate=rng.uniform(0, 0.5),
+            last_updated=now - timedelta(hours=rng.uniform(0, 48)),
+            deadline=now + timedelta(days=rng.uniform(-7, 60)) if i % 3 == 0 else None,
+            user_id=user.id,
+        )
+        for i in range(task_count)
+    )
+    db.commit()
+    return db, user.id
+
+
+def timed(repeat: int, function) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    database = Path(tempfile.mkdtemp()) / "bench_scoring.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    from datetime import datetime, timezone
+
+    from sqlalchemy import select
+
+    from app.models.task import Task
+    from app.services.priority import SCORING_MODELS, calculate_priority_score
+    from app.services.search import priority_expression
+    from app.services.task_cache import TaskSnapshot
+
+    db, user_id = seed(args.tasks)
+    tasks = db.scalars(select(Task).where(Task.user_id == user_id)).all()
+    snapshot = TaskSnapshot.from_tasks(tasks, time.time())
+    now = datetime.now(timezone.utc)
+
+    print(f"{args.tasks} active tasks")
+    for name, model in SCORING_MODELS.items():
+        forms = {
+            "scalar": lambda: [calculate_priority_score(task, now, model) for task in tasks],
+            "numpy ": lambda: snapshot.scores(now, model),
+            "sql   ": lambda: db.execute(
+                select(Task.id, priority_expression(now, model)).where(Task.user_id == user_id)
+            ).all(),
+        }
+        print(f"  {name}")
+        for form, call in forms.items():
+            seconds = timed(args.repeat, call)
+            print(f"    {form}: {seconds * 1000:8.2f} ms ({args.tasks / seconds:12,.0f} tasks/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Time task search queries for a user with many tasks.
+
+Usage: python benchmarks/bench_search.py [--tasks 100000] [--repeat 50] [--limit 50]
+
+Seeds a throwaway SQLite database (or the database at DATABASE_URL, which should
+be an empty scratch database) with one user and `--tasks` tasks whose titles and
+descriptions are drawn from a Zipf-distributed vocabulary, then times the first
+page of searches for words of decreasing frequency and a two-word query. Every
+match is ranked, so the cost grows with the number of matching tasks.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+VOCABULARY_SIZE = 5000
+
+# Synthetic fixed-width words, so none is a prefix of another: "w0000" is the most
+# frequent, "w4999" the rarest
+WORDS = [f"w{rank:04d}" for rank in range(VOCABULARY_SIZE)]
+
+QUERIES = ["w0000", "w0010", "w0100", "w1000", "w0010 w0100"]
+
+
+def seed(task_count: int) -> int:
+    from app.database import Base, SessionLocal, engine
+    from app.models.task import Task
+    from app.models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password=None)
+    db.add(user)
+    db.flush()
+    user_id = user.id
+
+    rng = random.Random(0)
+    # Zipf-like word frequencies, so some queries match far more tasks than others
+    weights = [1 / (rank + 10) for rank in range(len(WORDS))]
+    for start in range(0, task_count, 10000):
+        db.bulk_insert_mappings(
+            Task,
+            [
+                {
+                    "title": " ".join(rng.choices(WORDS, weights, k=3)),
+                    "description": " ".join(rng.choices(WORDS, weights, k=12)),
+                    "user_id": user_id,
+                    "impact": rng.uniform(0, 10),
+                    "effort": rng.choice([0.25, 0.5, 1.0, 2.0, 4.0]),
+                }
+                for _ in range(start, min(start + 10000, task_count))
+            ],
+        )
+    db.commit()
+    db.close()
+    return user_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_search.db"
+
+    from app.config import settings
+    from app.database import SessionLocal
+    from app.services.search import search_terms, search_tasks
+    start = time.perf_counter()
+    user_id = seed(args.tasks)
+    print(f"Seeded {args.tasks} tasks in {time.perf_counter() - start:.1f} s")
+
+    db = SessionLocal()
+    for query in QUERIES:
+        terms = search_terms(query)
+        now = datetime.now(timezone.utc)
+        matches = len(
+            search_tasks(db, user_id, terms, now, settings.search_relevance_weight, args.tasks)
+        )
+        timings = []
+        for _ in range(args.repeat):
+            began = time.perf_counter()
+            rows = search_tasks(
+                db, user_id, terms, datetime.now(timezone.utc),
+                settings.search_relevance_weight, args.limit,
+            )
+            timings.append(time.perf_counter() - began)
+        print(
+            f"{query!r:12} {matches:6} matches, {len(rows):3} rows, best {min(timings) * 1000:.2f} ms, "
+            f"median {statistics.median(timings) * 1000:.2f} ms"
+        )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Compare the development server setup with the production gunicorn profile.
+
+Usage: python benchmarks/bench_serving.py [--requests 2000] [--concurrency 32]
+                                          [--workers 4] [--tasks 50]
+
+Each server runs against a throwaway SQLite database seeded with one user and
+`--tasks` active tasks. Authenticated GET /api/tasks requests are fired with
+bounded concurrency and throughput and latency percentiles are reported.
+Point DATABASE_URL at Postgres to benchmark against a real database.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def seed(database_url: str, task_count: int) -> str:
+    """Create the schema, a user and tasks; return a bearer token for the user."""
+    os.environ["DATABASE_URL"] = database_url
+    from app.database import Base, SessionLocal, engine
+    from app.models.task import Task
+    from app.models.user import User
+    from app.services.auth import create_access_token
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password=None)
+    db.add(user)
+    db.flush()
+    db.add_all(Task(title=f"Task {i}", description="x" * 200, user_id=user.id) for i in range(task_count))
+    db.commit()
+    db.close()
+    return create_access_token({"sub": "bench@example.com"})
+
+
+def start_server(command: list[str], env: dict, port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server did not start: {' '.join(command)}")
+
+
+async def load(port: int, token: str, total: int, concurrency: int) -> tuple[float, list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get("/api/tasks")
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}",
+        headers={"Authorization": f"Bearer {token}"},
+        limits=limits,
+        timeout=30,
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return elapsed, latencies, errors
+
+
+def percentile(values: list[float], pct: float) -> float:
+    return statistics.quantiles(values, n=100)[int(pct) - 1] if len(values) > 1 else values[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = os.environ.get("DATABASE_URL") or f"sqlite:///{tmp}/bench.db"
+        token = seed(database_url, args.tasks)
+        env = {**os.environ, "DATABASE_URL": database_url, "ENVIRONMENT": "production"}
+        port = str(args.port)
+        setups = {
+            "uvicorn --reload (current)": (
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", port, "--reload"],
+                env,
+            ),
+            f"gunicorn x{args.workers} (production)": (
+                [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+                {**env, "PORT": port, "WEB_CONCURRENCY": str(args.workers)},
+            ),
+        }
+
+        print(f"{args.requests} requests, concurrency {args.concurrency}, {args.tasks} tasks")
+        for name, (command, server_env) in setups.items():
+            process = start_server(command, server_env, args.port)
+            try:
+                asyncio.run(load(args.port, token, min(100, args.requests), args.concurrency))
+                elapsed, latencies, errors = asyncio.run(
+                    load(args.port, token, args.requests, args.concurrency)
+                )
+            finally:
+                process.terminate()
+                process.wait()
+            print(
+                f"{name:32} {args.requests / elapsed:8.1f} req/s  "
+                f"p50 {percentile(latencies, 50) * 1000:7.1f} ms  "
+                f"p99 {percentile(latencies, 99) * 1000:7.1f} ms  errors {errors}"
+            )
+
+
+if __name__ == "__main__":
+    main()
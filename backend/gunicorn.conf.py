@@ -0,0 +1,44 @@
+"""
+Gunicorn settings for production serving.
+
+Run with: gunicorn -c gunicorn.conf.py app.main:app
+
+Every value can be overridden through the environment variable named next to it.
+"""
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Async workers each use a whole core; Heroku sets WEB_CONCURRENCY per dyno size
+workers = _env_int("WEB_CONCURRENCY", os.cpu_count() or 1)
+
+# Import the app once in the master so workers fork with the code already loaded;
+# post_fork drops any database connections inherited from the master
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# Recycle workers after a jittered number of requests to bound memory creep
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 2000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", 200)
+
+# On SIGTERM workers stop accepting and drain in-flight requests for up to this long
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+timeout = _env_int("GUNICORN_TIMEOUT", 60)
+
+# Longer than typical load balancer idle timeouts so the proxy closes connections first
+keepalive = _env_int("GUNICORN_KEEPALIVE", 75)
+backlog = _env_int("GUNICORN_BACKLOG", 2048)
+
+accesslog = None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    from app.database import dispose_engine
+
+    dispose_engine()
@@ -1,14 +1,23 @@
+import os
+import tempfile
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
-from app.database import Base, get_db
+# Set before the app is imported: its own engine points at a Postgres tests don't have
+os.environ["INVALIDATION_BUS"] = "local"
+os.environ["INVALIDATION_SOCKET_DIR"] = tempfile.mkdtemp(prefix="busyness-invalidation-")
+
+from app.api.dependencies import get_db
+from app.database import Base, get_user_db
 from app.main import app
 
 
 from app.models.user import User
 from app.services.auth import get_current_user
+from app.services.task_cache import task_cache
 
 # Use SQLite for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -49,12 +58,15 @@ def db():
     finally:
         db.close()
         Base.metadata.drop_all(bind=engine)
+        # User ids are reused by the next test's database
+        task_cache.clear()
 
 
 @pytest.fixture(scope="function")
 def client(db):
     """Create a test client with database and auth override."""
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_user_db] = override_get_db
     app.dependency_overrides[get_current_user] = override_get_current_user
     with TestClient(app) as c:
         yield c
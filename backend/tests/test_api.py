@@ -1,4 +1,7 @@
 from datetime import datetime, timedelta, timezone
+import json
+import logging
+
 import pytest
 
 
@@ -137,7 +140,7 @@ class TestTasksEndpoints:
 
         # Verify in completed tasks
         completed_response = client.get("/api/tasks/completed")
-        completed_ids = [t["id"] for t in completed_response.json()]
+        completed_ids = [t["id"] for t in completed_response.json()["items"]]
         assert task_id in completed_ids
 
     def test_log_time_for_endless_task(self, client):
@@ -163,7 +166,7 @@ class TestTasksEndpoints:
         # Verify log created
         logs_response = client.get(f"/api/tasks/{task_id}/logs")
         assert logs_response.status_code == 200
-        logs = logs_response.json()
+        logs = logs_response.json()["items"]
         assert len(logs) == 1
         assert logs[0]["duration_minutes"] == 120
 
@@ -231,3 +234,26 @@ class TestTasksEndpoints:
         # Note: In tests the time difference is minimal, so we just verify the endpoint works
         response = client.get("/api/tasks")
         assert response.status_code == 200
+
+
+class TestServerTiming:
+    """Tests for the Server-Timing header and access log."""
+
+    def test_header_has_phase_breakdown(self, client):
+        client.post("/api/tasks", json={"title": "Timed"})
+        response = client.get("/api/tasks")
+        header = response.headers["server-timing"]
+
+        phases = {entry.split(";")[0].strip() for entry in header.split(",")}
+        assert {"db", "scoring", "build", "serialize", "total"} <= phases
+        assert 'queries"' in header
+
+    def test_access_log_records_timings(self, client, caplog):
+        with caplog.at_level(logging.INFO, logger="app.access"):
+            client.get("/api/tasks")
+
+        records = [json.loads(r.getMessage()) for r in caplog.records if r.name == "app.access"]
+        assert records[-1]["path"] == "/api/tasks"
+        assert records[-1]["status"] == 200
+        assert records[-1]["db_count"] >= 1
+        assert "db_ms" in records[-1]
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.archive import ArchivedTask
+from app.models.task import Task, TaskLog, TaskType
+from app.services.archive import archive_completed_tasks
+from app.services.pagination import decode_cursor, encode_cursor
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def add_completed(db, days_ago, **fields):
+    task = Task(
+        title=f"Done {days_ago}d ago",
+        user_id=1,
+        completed_at=NOW - timedelta(days=days_ago),
+        **fields,
+    )
+    db.add(task)
+    db.commit()
+    return task.id, task.completed_at
+
+
+def completed_ids(client, limit):
+    ids, cursor = [], None
+    while True:
+        params = {"limit": limit} | ({"cursor": cursor} if cursor else {})
+        page = client.get("/api/tasks/completed", params=params).json()
+        ids += [task["id"] for task in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+class TestArchiveJob:
+    """Tests for moving old completed tasks to the archive table."""
+
+    def test_moves_only_old_completed_ending_tasks(self, db):
+        old_id, _ = add_completed(db, 200)
+        recent_id, _ = add_completed(db, 10)
+        endless_id, _ = add_completed(db, 300, task_type=TaskType.ENDLESS)
+        active = Task(title="Active", user_id=1)
+        db.add(active)
+        db.commit()
+        active_id = active.id
+
+        moved = archive_completed_tasks(db, timedelta(days=90), batch_size=10, now=NOW)
+
+        assert moved == 1
+        assert {t.id for t in db.query(Task)} == {recent_id, active_id, endless_id}
+        archived = db.query(ArchivedTask).one()
+        assert (archived.id, archived.title) == (old_id, "Done 200d ago")
+
+    def test_batches_until_done(self, db):
+        for days in range(100, 125):
+            add_completed(db, days)
+        assert archive_completed_tasks(db, timedelta(days=90), batch_size=4, now=NOW) == 25
+        assert db.query(Task).count() == 0
+        assert archive_completed_tasks(db, timedelta(days=90), batch_size=4, now=NOW) == 0
+
+    def test_keeps_tasks_with_logs(self, db):
+        task_id, _ = add_completed(db, 200)
+        db.add(TaskLog(task_id=task_id, duration_minutes=5))
+        db.commit()
+        assert archive_completed_tasks(db, timedelta(days=90), batch_size=10, now=NOW) == 0
+
+
+class TestCompletedPagination:
+    """Tests for keyset pagination of /completed across hot and archived tasks."""
+
+    def test_pages_span_hot_and_archive(self, client, db):
+        tasks = [add_completed(db, days) for days in (1, 400, 50, 200, 3, 120, 90)]
+        archive_completed_tasks(db, timedelta(days=100), batch_size=10, now=NOW)
+        assert db.query(ArchivedTask).count() == 3
+
+        newest_first = [task_id for task_id, _ in sorted(tasks, key=lambda t: t[1], reverse=True)]
+        assert completed_ids(client, limit=3) == newest_first
+        assert completed_ids(client, limit=100) == newest_first
+
+    def test_same_timestamp_ties_by_id(self, client, db):
+        for _ in range(5):
+            add_completed(db, 1)
+        ids = completed_ids(client, limit=2)
+        assert ids == sorted(ids, reverse=True) and len(ids) == 5
+
+    def test_invalid_cursor(self, client):
+        assert client.get("/api/tasks/completed?cursor=not-a-cursor").status_code == 400
+
+    def test_limit_capped(self, client):
+        assert client.get("/api/tasks/completed?limit=10000").status_code == 422
+
+    def test_delete_archived_task(self, client, db):
+        task_id, _ = add_completed(db, 400)
+        archive_completed_tasks(db, timedelta(days=90), batch_size=10, now=NOW)
+
+        assert client.delete(f"/api/tasks/{task_id}").status_code == 204
+        assert db.query(ArchivedTask).count() == 0
+        assert client.delete(f"/api/tasks/{task_id}").status_code == 404
+
+
+class TestCursor:
+    """Tests for opaque pagination cursors."""
+
+    def test_round_trip(self):
+        at = datetime(2026, 1, 2, 3, 4, 5, 678)
+        assert decode_cursor(encode_cursor(at, 42)) == (at, 42)
+
+    @pytest.mark.parametrize("cursor", ["", "!!!", "bnVsbA"])
+    def test_malformed(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
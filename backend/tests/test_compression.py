@@ -0,0 +1,142 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware
+from app.services.compression import CompressedCache, compress, compressed_cache, negotiate
+from app.services.metrics import metrics
+
+
+def counters(name):
+    return {
+        tuple(c["labels"].values()): c["value"] for c in metrics.snapshot()["counters"] if c["name"] == name
+    }
+
+
+class TestNegotiate:
+    """Tests for Accept-Encoding negotiation."""
+
+    def test_preference_and_q_values(self):
+        available = ("br", "gzip")
+        assert negotiate("gzip, deflate, br", available) == "br"
+        assert negotiate("gzip", available) == "gzip"
+        assert negotiate("br;q=0.5, gzip", available) == "gzip"
+        assert negotiate("br;q=0, *", available) == "gzip"
+        assert negotiate("identity", available) is None
+        assert negotiate("", available) is None
+        assert negotiate("gzip;q=0", ("gzip",)) is None
+
+
+class TestCompressedCache:
+    """Tests for the compressed body LRU."""
+
+    def test_bounded_by_bytes(self):
+        cache = CompressedCache(max_bytes=10)
+        cache.put(b"a", "gzip", b"12345")
+        cache.put(b"b", "gzip", b"12345")
+        cache.get(b"a", "gzip")
+        cache.put(b"c", "gzip", b"12345")
+
+        assert cache.get(b"b", "gzip") is None
+        assert cache.get(b"a", "gzip") == b"12345"
+        assert cache.get(b"a", "br") is None
+        cache.put(b"d", "gzip", b"x" * 11)
+        assert cache.get(b"d", "gzip") is None
+
+    def test_gzip_output_is_a_function_of_the_input(self):
+        data = b"same bytes " * 100
+        assert compress(data, "gzip", 6, 4) == compress(data, "gzip", 6, 4)
+        assert gzip.decompress(compress(data, "gzip", 6, 4)) == data
+
+
+class TestCompressionMiddleware:
+    """Tests for compressing app responses."""
+
+    def test_large_lists_compressed_small_bodies_not(self, client):
+        for i in range(20):
+            client.post("/api/tasks", json={"title": f"Task {i}", "description": "Long description " * 20})
+
+        response = client.get("/api/tasks", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(response.content) / 5
+        assert len(response.json()) == 20
+
+        assert "content-encoding" not in client.get("/health").headers
+        plain = client.get("/api/tasks", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert len(plain.json()) == 20
+
+    def test_completed_pages_compressed_once(self, client):
+        compressed_cache.clear()
+        for i in range(20):
+            task = client.post(
+                "/api/tasks", json={"title": f"Task {i}", "description": "Long description " * 20}
+            ).json()
+            client.post(f"/api/tasks/{task['id']}/complete")
+        metrics.reset()
+
+        first = client.get("/api/tasks/completed", headers={"Accept-Encoding": "gzip"})
+        second = client.get("/api/tasks/completed", headers={"Accept-Encoding": "gzip"})
+
+        assert first.headers["content-encoding"] == "gzip"
+        assert first.headers["etag"] == second.headers["etag"]
+        assert first.content == second.content
+        assert counters("compression_cache") == {("miss",): 1, ("hit",): 1}
+
+        revalidated = client.get(
+            "/api/tasks/completed", headers={"If-None-Match": first.headers["etag"]}
+        )
+        assert revalidated.status_code == 304
+
+    def test_compressed_etags_are_weak(self, client):
+        for i in range(20):
+            task = client.post(
+                "/api/tasks", json={"title": f"Task {i}", "description": "Long description " * 20}
+            ).json()
+            client.post(f"/api/tasks/{task['id']}/complete")
+
+        compressed = client.get("/api/tasks/completed", headers={"Accept-Encoding": "gzip"})
+        plain = client.get("/api/tasks/completed", headers={"Accept-Encoding": "identity"})
+        assert compressed.headers["etag"] == f"W/{plain.headers['etag']}"
+
+        # Either validator revalidates either representation
+        for tag in (compressed.headers["etag"], plain.headers["etag"]):
+            revalidated = client.get(
+                "/api/tasks/completed", headers={"Accept-Encoding": "gzip", "If-None-Match": tag}
+            )
+            assert revalidated.status_code == 304
+            assert revalidated.headers["etag"] == compressed.headers["etag"]
+            unencoded = client.get(
+                "/api/tasks/completed", headers={"Accept-Encoding": "identity", "If-None-Match": tag}
+            )
+            assert (unencoded.status_code, unencoded.headers["etag"]) == (304, plain.headers["etag"])
+
+    def test_streamed_bodies_compressed_incrementally(self):
+        streaming = FastAPI()
+
+        @streaming.get("/stream")
+        def stream():
+            return StreamingResponse((b"chunk %d\n" % i for i in range(1000)), media_type="text/plain")
+
+        app = CompressionMiddleware(streaming, minimum_size=1024, gzip_level=6, brotli_quality=4)
+        response = TestClient(app).get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text.count("chunk") == 1000
+
+    def test_brotli_when_installed(self):
+        pytest.importorskip("brotli")
+        plain = FastAPI()
+
+        @plain.get("/text")
+        def text():
+            return {"text": "compressible " * 200}
+
+        app = CompressionMiddleware(plain, minimum_size=1024, gzip_level=6, brotli_quality=4)
+        response = TestClient(app).get("/text", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+        assert response.json() == {"text": "compressible " * 200}
@@ -0,0 +1,119 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.models.task import Task, TaskLog, TaskType
+from app.services.concurrency import parse_if_match
+
+WORKERS = 8
+COMPLETES = 40
+UPDATES = 20
+
+# Each 6-minute log on the stress task lowers impact by exactly 0.1
+LOG_MINUTES = 6
+IMPACT_PER_LOG = 0.1
+
+# Generous floor for requests per second under contention on SQLite
+MIN_THROUGHPUT = 20
+
+
+def create_stress_task(client):
+    response = client.post(
+        "/api/tasks",
+        json={
+            "title": "Contended",
+            "task_type": "endless",
+            "impact": 10.0,
+            "not_doing_hourly_rate": 0.0,
+            "doing_hourly_rate": 1.0,
+        },
+    )
+    return response.json()["id"]
+
+
+class TestOptimisticConcurrency:
+    """Tests for version-checked task writes."""
+
+    def test_version_increments_on_write(self, client):
+        task = client.post("/api/tasks", json={"title": "Versioned"}).json()
+        assert task["version"] == 1
+
+        response = client.put(f"/api/tasks/{task['id']}", json={"title": "Renamed"})
+        assert response.json()["version"] == 2
+        assert response.headers["etag"] == '"2"'
+
+    def test_if_match_current_version(self, client):
+        task = client.post("/api/tasks", json={"title": "Versioned"}).json()
+        etag = client.get(f"/api/tasks/{task['id']}").headers["etag"]
+
+        response = client.put(
+            f"/api/tasks/{task['id']}", json={"title": "Renamed"}, headers={"If-Match": etag}
+        )
+        assert response.status_code == 200
+
+    def test_get_leaves_etag_and_sync_cursor(self, client):
+        task = client.post(
+            "/api/tasks", json={"title": "Growing", "impact": 2.0, "not_doing_hourly_rate": 1.0}
+        ).json()
+        cursor = client.get("/api/tasks/changes").json()["next_cursor"]
+
+        first, second = (client.get(f"/api/tasks/{task['id']}") for _ in range(2))
+        assert first.headers["etag"] == second.headers["etag"] == '"1"'
+        assert second.json()["impact"] > 2.0
+        assert client.get("/api/tasks/changes", params={"since": cursor}).json()["tasks"] == []
+
+        response = client.put(
+            f"/api/tasks/{task['id']}", json={"title": "Renamed"}, headers={"If-Match": first.headers["etag"]}
+        )
+        assert response.status_code == 200
+
+    def test_if_match_stale_version(self, client):
+        task = client.post("/api/tasks", json={"title": "Versioned"}).json()
+        client.put(f"/api/tasks/{task['id']}", json={"title": "Renamed"})
+
+        response = client.put(
+            f"/api/tasks/{task['id']}", json={"title": "Stale"}, headers={"If-Match": '"1"'}
+        )
+        assert response.status_code == 412
+        assert client.get(f"/api/tasks/{task['id']}").json()["title"] == "Renamed"
+
+    def test_parse_if_match(self):
+        assert parse_if_match(None) is None
+        assert parse_if_match("*") is None
+        assert parse_if_match('"3", W/"4"') == {3, 4}
+
+
+class TestConcurrencyStress:
+    """Parallel completes and updates on one task must not lose any log's effect."""
+
+    def test_parallel_completes_and_updates(self, client, db):
+        task_id = create_stress_task(client)
+
+        def complete(_):
+            return client.post(
+                f"/api/tasks/{task_id}/complete", json={"duration_minutes": LOG_MINUTES}
+            ).status_code
+
+        def update(i):
+            return client.put(f"/api/tasks/{task_id}", json={"title": f"Contended {i}"}).status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            complete_results = pool.map(complete, range(COMPLETES))
+            update_results = pool.map(update, range(UPDATES))
+            complete_statuses = list(complete_results)
+            update_statuses = list(update_results)
+        elapsed = time.perf_counter() - start
+
+        # Retries are bounded, so a request may give up with 409 but never half-apply
+        assert set(complete_statuses) <= {200, 409}
+        assert set(update_statuses) <= {200, 409}
+        logged = complete_statuses.count(200)
+        assert logged >= COMPLETES * 0.75
+
+        db.expire_all()
+        task = db.get(Task, task_id)
+        assert db.query(TaskLog).filter(TaskLog.task_id == task_id).count() == logged
+        assert abs(task.impact - (10.0 - logged * IMPACT_PER_LOG)) < 1e-6
+        assert task.task_type == TaskType.ENDLESS
+
+        assert (COMPLETES + UPDATES) / elapsed > MIN_THROUGHPUT
@@ -0,0 +1,143 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from app.database import Base, ShardRouter, engine_options
+from app.models.digest import TaskDigest
+from app.models.task import Task
+from app.models.user import User
+from app.services.digest import build_digests, prune_digests
+from app.services.priority import calculate_priority_score, impact_at, scoring_model
+
+DAY = date(2026, 10, 19)
+NOW = datetime(2026, 10, 19, 6, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def router(tmp_path):
+    urls = [f"sqlite:///{tmp_path}/shard{shard}.db" for shard in range(2)]
+    router = ShardRouter(create_engine(urls[0], **engine_options(urls[0])), urls[1:])
+    for engine in router.engines:
+        Base.metadata.create_all(bind=engine)
+    yield router
+    for engine in router.engines:
+        engine.dispose()
+
+
+def seed(router, users=12, tasks=7):
+    """
+    Users alternating between the two shards, each with `tasks` active tasks and a
+    completed one. Returns each user's expected top 5 task ids.
+    """
+    expected = {}
+    with router.session(0) as directory:
+        for n in range(users):
+            user = User(id=n + 1, email=f"user{n}@example.com", shard=n % 2)
+            directory.add(user)
+            directory.commit()
+            with router.session(user.shard) as db:
+                if user.shard:
+                    db.add(User(id=user.id, email=user.email, shard=user.shard))
+                rows = [
+                    Task(
+                        title=f"Task {n}.{i}",
+                        user_id=user.id,
+                        impact=(n * 7 + i * 3) % 10,
+                        effort=1 + i % 3,
+                        not_doing_hourly_rate=0.01 * i,
+                        deadline=NOW + timedelta(days=i) if i % 2 else None,
+                        last_updated=NOW - timedelta(hours=n + i),
+                    )
+                    for i in range(tasks)
+                ]
+                db.add_all(rows)
+                db.add(Task(title="Done", user_id=user.id, impact=10, completed_at=NOW))
+                db.commit()
+                ranked = sorted(rows, key=lambda t: (-score(t), t.id))
+                expected[user.id] = [t.id for t in ranked[:5]]
+    return expected
+
+
+def score(task, model=None):
+    grown = Task(impact=impact_at(task, NOW), effort=task.effort, deadline=task.deadline)
+    return calculate_priority_score(grown, NOW, model)
+
+
+def digests(router):
+    found = {}
+    for shard in range(len(router)):
+        with router.session(shard) as db:
+            for row in db.scalars(select(TaskDigest).order_by(TaskDigest.user_id, TaskDigest.rank)):
+                found.setdefault(row.user_id, []).append(row.task_id)
+    return found
+
+
+class TestBuildDigests:
+    """Tests for the batch top-k digest job."""
+
+    def test_top_k_per_user_matches_priority_service(self, router):
+        expected = seed(router)
+        stats = build_digests(DAY, 5, chunk_size=4, now=NOW, router=router)
+
+        assert digests(router) == expected
+        assert (stats.users, stats.tasks, stats.digests) == (12, 84, 60)
+
+    def test_tasks_are_left_untouched(self, router):
+        seed(router, users=2)
+        with router.session(0) as db:
+            before = db.execute(select(Task.id, Task.impact, Task.last_updated, Task.version)).all()
+        build_digests(DAY, 5, chunk_size=4, now=NOW, router=router)
+        with router.session(0) as db:
+            after = db.execute(select(Task.id, Task.impact, Task.last_updated, Task.version)).all()
+        assert after == before
+
+    def test_resumes_after_interruption(self, router):
+        expected = seed(router)
+
+        def interrupt(shard, stats):
+            if stats.users == 4:
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            build_digests(DAY, 5, chunk_size=2, now=NOW, router=router, progress=interrupt)
+        stats = build_digests(DAY, 5, chunk_size=2, now=NOW, router=router)
+
+        # Two chunks of shard 0 (users 1, 3, 5 and 7) were committed
+        assert stats.users == 8
+        assert digests(router) == expected
+        assert build_digests(DAY, 5, chunk_size=2, now=NOW, router=router).users == 0
+        assert build_digests(DAY, 5, chunk_size=2, now=NOW, router=router, restart=True).users == 12
+
+    def test_process_pool_gives_the_same_digests(self, router):
+        expected = seed(router)
+        stats = build_digests(DAY, 5, chunk_size=3, workers=2, now=NOW, router=router)
+
+        assert stats.users == 12
+        assert digests(router) == expected
+
+    def test_users_own_scoring_model(self, router):
+        expected = seed(router, users=4)
+        with router.session(0) as db:
+            db.get(User, 4).scoring_model = "sigmoid"
+            db.commit()
+        with router.session(1) as db:
+            model = scoring_model("sigmoid")
+            ranked = sorted(
+                db.scalars(select(Task).where(Task.user_id == 4, Task.completed_at.is_(None))),
+                key=lambda t: (-score(t, model), t.id),
+            )
+            assert expected[4] != [t.id for t in ranked[:5]]
+            expected[4] = [t.id for t in ranked[:5]]
+
+        build_digests(DAY, 5, chunk_size=4, now=NOW, router=router)
+        assert digests(router) == expected
+
+    def test_prune_old_days(self, router):
+        seed(router, users=2)
+        for day in (DAY - timedelta(days=8), DAY):
+            build_digests(day, 5, chunk_size=4, now=NOW, router=router)
+
+        with router.session(0) as db:
+            assert prune_digests(db, DAY - timedelta(days=7), batch_size=2) == 5
+            assert set(db.scalars(select(TaskDigest.digest_date))) == {DAY}
@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import event
+
+from app.services.fields import TASK_FIELDS
+from app.services.task_cache import task_cache
+from tests.conftest import engine
+
+
+@pytest.fixture
+def selects():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT"):
+            executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def uncached():
+    task_cache.enabled = False
+    yield
+    task_cache.enabled = True
+
+
+def add_tasks(client, count, complete=False):
+    for i in range(count):
+        task = client.post(
+            "/api/tasks",
+            json={"title": f"Task {i}", "description": "Long description " * 20, "impact": i % 10},
+        ).json()
+        if complete:
+            client.post(f"/api/tasks/{task['id']}/complete")
+
+
+class TestSparseFieldsets:
+    """Tests for the `fields` parameter of list endpoints."""
+
+    def test_default_response_has_every_field(self, client):
+        add_tasks(client, 2)
+        assert [list(task) for task in client.get("/api/tasks").json()] == [list(TASK_FIELDS)] * 2
+
+    def test_only_requested_fields_in_the_same_order(self, client):
+        add_tasks(client, 5)
+        full = client.get("/api/tasks").json()
+        sparse = client.get("/api/tasks?fields=title,priority_score").json()
+
+        assert [list(task) for task in sparse] == [["title", "id", "priority_score"]] * 5
+        assert [(t["id"], t["title"]) for t in sparse] == [(t["id"], t["title"]) for t in full]
+
+    def test_unknown_field_rejected(self, client):
+        response = client.get("/api/tasks?fields=title,secret")
+        assert response.status_code == 400
+        assert "secret" in response.json()["detail"]
+        assert client.get("/api/tasks/completed?fields=hashed_password").status_code == 400
+
+    def test_uncached_list_skips_unrequested_columns(self, client, selects, uncached):
+        add_tasks(client, 3)
+        selects.clear()
+        tasks = client.get("/api/tasks?fields=title,impact").json()
+
+        assert len(tasks) == 3 and all(list(task) == ["title", "impact", "id"] for task in tasks)
+        (query,) = [s for s in selects if "FROM tasks" in s]
+        assert "tasks.title" in query and "tasks.description" not in query
+
+    def test_completed_page_projects_columns(self, client, selects):
+        add_tasks(client, 3, complete=True)
+        full = client.get("/api/tasks/completed").json()["items"]
+        selects.clear()
+        page = client.get("/api/tasks/completed?fields=completed_at,priority_score").json()
+
+        assert page["items"] == [
+            {"id": t["id"], "completed_at": t["completed_at"], "priority_score": t["priority_score"]}
+            for t in full
+        ]
+        queries = [s for s in selects if "completed_at IS NOT NULL" in s]
+        assert len(queries) == 2
+        assert all("description" not in q and "title" not in q for q in queries)
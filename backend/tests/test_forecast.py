@@ -0,0 +1,130 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.models.task import Task
+from app.services.forecast import forecast_scores, parse_duration
+from app.services.priority import update_task_impact
+
+# 1k tasks x 1k steps, scoring plus top-k and crossovers
+FORECAST_BUDGET_SECONDS = 0.1
+
+
+def random_tasks(count, now, seed=0):
+    rng = random.Random(seed)
+    return [
+        Task(
+            id=i + 1,
+            title=f"Task {i}",
+            impact=rng.uniform(0, 10),
+            effort=rng.choice([0.05, 0.5, 1.0, 4.0]),
+            not_doing_hourly_rate=rng.uniform(0, 0.5),
+            last_updated=now - timedelta(hours=rng.uniform(0, 48)),
+            deadline=now + timedelta(days=rng.uniform(-1, 10)) if rng.random() < 0.4 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def scalar_score(task, at):
+    copy = Task(
+        impact=task.impact,
+        effort=task.effort,
+        not_doing_hourly_rate=task.not_doing_hourly_rate,
+        last_updated=task.last_updated,
+        deadline=task.deadline,
+    )
+    return update_task_impact(copy, at)
+
+
+class TestParseDuration:
+    """Tests for forecast horizon/step parsing."""
+
+    def test_units(self):
+        assert parse_duration("30m") == timedelta(minutes=30)
+        assert parse_duration("1h") == timedelta(hours=1)
+        assert parse_duration("7d") == timedelta(days=7)
+        assert parse_duration("2w") == timedelta(weeks=2)
+
+    @pytest.mark.parametrize("value", ["", "7", "0h", "1y", "-1d", "1.5h"])
+    def test_invalid(self, value):
+        with pytest.raises(ValueError):
+            parse_duration(value)
+
+
+class TestForecastScores:
+    """The vectorized forecast must agree with the scalar scoring functions."""
+
+    def test_matches_scalar_scoring(self):
+        now = datetime.now(timezone.utc)
+        tasks = random_tasks(50, now)
+        forecast = forecast_scores(tasks, now, timedelta(days=3), timedelta(hours=6))
+
+        assert forecast.scores.shape == (50, 13)
+        for row, task in enumerate(tasks):
+            for column, at in enumerate(forecast.times):
+                assert forecast.scores[row, column] == pytest.approx(scalar_score(task, at), abs=1e-9)
+
+    def test_top_k_and_crossover(self):
+        now = datetime.now(timezone.utc)
+        steady = Task(id=1, impact=5.0, effort=1.0, not_doing_hourly_rate=0.0, last_updated=now)
+        rising = Task(id=2, impact=1.0, effort=1.0, not_doing_hourly_rate=1.0, last_updated=now)
+        forecast = forecast_scores([rising, steady], now, timedelta(hours=8), timedelta(hours=1))
+
+        top_rows, top_scores = forecast.top_k(1)
+        assert [forecast.task_ids[r[0]] for r in top_rows] == [1, 1, 1, 1, 1, 2, 2, 2, 2]
+        assert top_scores[0, 0] == 5.0
+        # Equal at 4h: the lower id keeps the rank until 5h
+        assert forecast.crossovers(top_rows) == [(5, 0, 1, 0)]
+
+    def test_step_limit(self):
+        now = datetime.now(timezone.utc)
+        with pytest.raises(ValueError):
+            forecast_scores([], now, timedelta(weeks=52), timedelta(minutes=1))
+
+    def test_thousand_by_thousand_under_budget(self):
+        now = datetime.now(timezone.utc)
+        tasks = random_tasks(1000, now)
+
+        def run():
+            start = time.perf_counter()
+            forecast = forecast_scores(tasks, now, timedelta(minutes=999), timedelta(minutes=1))
+            top_rows, _ = forecast.top_k(5)
+            forecast.crossovers(top_rows)
+            return time.perf_counter() - start, forecast
+
+        elapsed, forecast = min((run() for _ in range(3)), key=lambda result: result[0])
+        assert forecast.scores.shape == (1000, 1000)
+        assert np.isfinite(forecast.scores).all()
+        assert elapsed < FORECAST_BUDGET_SECONDS
+
+
+class TestForecastEndpoint:
+    """Tests for GET /api/tasks/forecast."""
+
+    def test_forecast(self, client):
+        client.post("/api/tasks", json={"title": "Steady", "impact": 5.0, "not_doing_hourly_rate": 0.0})
+        rising = client.post(
+            "/api/tasks", json={"title": "Rising", "impact": 1.0, "not_doing_hourly_rate": 1.0}
+        ).json()
+
+        response = client.get("/api/tasks/forecast?horizon=1d&step=1h&k=1")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["step_seconds"] == 3600
+        assert len(data["steps"]) == 25
+        assert data["steps"][-1]["top"][0]["task_id"] == rising["id"]
+        assert [c["task_id"] for c in data["crossovers"]] == [rising["id"]]
+        assert data["crossovers"][0]["rank"] == 1
+
+    def test_no_tasks(self, client):
+        data = client.get("/api/tasks/forecast?horizon=2h&step=1h").json()
+        assert [step["top"] for step in data["steps"]] == [[], [], []]
+        assert data["crossovers"] == []
+
+    def test_invalid_parameters(self, client):
+        assert client.get("/api/tasks/forecast?horizon=soon").status_code == 400
+        assert client.get("/api/tasks/forecast?horizon=52w&step=1m").status_code == 400
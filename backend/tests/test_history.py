@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.task import Task
+from app.services.history import CurveCache, CurveKey, downsample, extend_curve, replay, replay_tasks
+from app.services.metrics import metrics
+from app.services.priority import apply_activity_to_impact
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+HOUR = 3600
+
+
+def key(**overrides):
+    values = {
+        "task_id": 1,
+        "last_log_id": None,
+        "start": START.timestamp(),
+        "initial_impact": 5.0,
+        "not_doing_hourly_rate": 1.0,
+        "doing_hourly_rate": 2.0,
+        "impact_set_to": None,
+    }
+    values.update(overrides)
+    return CurveKey(**values)
+
+
+def relative(points):
+    return [(round((t - START.timestamp()) / HOUR, 6), round(v, 6)) for t, v in points]
+
+
+class TestReplay:
+    """Tests for rebuilding impact curves from logs."""
+
+    def test_growth_log_and_cap(self):
+        curve_key = key()
+        points = replay(curve_key, [(START + timedelta(hours=2), 60)])
+        assert relative(points) == [(0, 5), (2, 7), (2, 5)]
+
+        extended = extend_curve(curve_key, points, (START + timedelta(hours=8)).timestamp())
+        assert relative(extended) == [(0, 5), (2, 7), (2, 5), (7, 10), (8, 10)]
+
+    def test_impact_set_to(self):
+        points = replay(key(impact_set_to=1.0, doing_hourly_rate=None), [(START + timedelta(hours=1), 30)])
+        assert relative(points)[-1] == (1, 1)
+
+    def test_clamped_at_zero(self):
+        points = replay(key(doing_hourly_rate=10.0), [(START + timedelta(hours=1), 120)])
+        assert relative(points)[-1] == (1, 0)
+
+    def test_matches_service_below_cap(self):
+        task = Task(
+            impact=2.0,
+            not_doing_hourly_rate=0.5,
+            doing_hourly_rate=1.0,
+            last_updated=START,
+        )
+        logs = [(START + timedelta(hours=h), minutes) for h, minutes in [(1, 30), (3, 90), (4, 15)]]
+        for logged_at, minutes in logs:
+            apply_activity_to_impact(task, minutes, logged_at)
+
+        points = replay(key(initial_impact=2.0, not_doing_hourly_rate=0.5, doing_hourly_rate=1.0), logs)
+        assert points[-1][1] == pytest.approx(task.impact)
+
+    def test_matches_service_across_cap(self):
+        task = Task(impact=8.0, not_doing_hourly_rate=1.0, doing_hourly_rate=2.0, last_updated=START)
+        logs = [(START + timedelta(hours=h), minutes) for h, minutes in [(7, 60), (8, 360), (20, 30)]]
+        impacts = []
+        for logged_at, minutes in logs:
+            apply_activity_to_impact(task, minutes, logged_at)
+            impacts.append(task.impact)
+
+        # Activity applies to the growth capped at 10 (10 - 2, 9 - 12, 10 - 1), as in the service
+        assert impacts == [8.0, 0.0, 9.0]
+        replayed = [replay(key(initial_impact=8.0), logs[: n + 1])[-1][1] for n in range(len(logs))]
+        assert replayed == pytest.approx(impacts)
+        assert relative(replay(key(initial_impact=8.0), logs)) == [
+            (0, 8), (2, 10), (7, 10), (7, 8), (8, 9), (8, 0), (18, 10), (20, 10), (20, 9)
+        ]
+
+
+class TestDownsample:
+    """Tests for largest-triangle-three-buckets downsampling."""
+
+    def test_keeps_endpoints_and_peak(self):
+        points = [(float(t), 0.0) for t in range(100)]
+        points[50] = (50.0, 10.0)
+        sampled = downsample(points, 10)
+        assert len(sampled) == 10
+        assert sampled[0] == points[0] and sampled[-1] == points[-1]
+        assert (50.0, 10.0) in sampled
+
+    def test_short_curve_unchanged(self):
+        points = [(0.0, 1.0), (1.0, 2.0)]
+        assert downsample(points, 10) == points
+
+
+class TestReplayTasks:
+    """Tests for batch replay and memoization."""
+
+    def test_memoized_until_new_log(self, client, db):
+        task_id = client.post("/api/tasks", json={"title": "Endless", "task_type": "endless"}).json()["id"]
+        client.post(f"/api/tasks/{task_id}/complete", json={"duration_minutes": 30})
+        cache = CurveCache()
+        metrics.reset()
+
+        def run():
+            db.expire_all()
+            task = db.get(Task, task_id)
+            return replay_tasks(db, [task], datetime.now(timezone.utc), cache)[task_id]
+
+        run()
+        run()
+        client.post(f"/api/tasks/{task_id}/complete", json={"duration_minutes": 30})
+        curve = run()
+
+        counters = {
+            c["labels"]["result"]: c["value"]
+            for c in metrics.snapshot()["counters"]
+            if c["name"] == "impact_history_cache"
+        }
+        assert counters == {"miss": 2, "hit": 1}
+        # Creation, then two logs with a point before and after each, then now
+        assert len(curve) == 6
+
+    def test_history_endpoints(self, client):
+        endless = client.post(
+            "/api/tasks",
+            json={"title": "Endless", "task_type": "endless", "impact": 8.0, "doing_hourly_rate": 2.0},
+        ).json()
+        client.post("/api/tasks", json={"title": "Ending"})
+        client.post(f"/api/tasks/{endless['id']}/complete", json={"duration_minutes": 60})
+
+        response = client.get(f"/api/tasks/{endless['id']}/history")
+        assert response.status_code == 200
+        points = response.json()["points"]
+        assert points[0]["impact"] == 8.0
+        current = client.get(f"/api/tasks/{endless['id']}").json()["impact"]
+        assert points[-1]["impact"] == pytest.approx(current, abs=1e-3)
+
+        histories = client.get("/api/tasks/history?points=3").json()
+        assert [h["task_id"] for h in histories] == [endless["id"], endless["id"] + 1]
+        assert all(len(h["points"]) <= 3 for h in histories)
+
+    def test_history_not_found(self, client):
+        assert client.get("/api/tasks/999/history").status_code == 404
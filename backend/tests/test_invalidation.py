@@ -0,0 +1,149 @@
+import socket
+import time
+
+import pytest
+
+from app.config import settings
+from app.services.invalidation import InvalidationBus, LocalTransport, attach, create_bus
+from app.services.metrics import metrics
+from app.services.task_cache import TaskCache, task_cache
+
+# Longest acceptable delay between a publish and another process acting on it
+STALENESS_BOUND_SECONDS = 0.5
+
+
+class Recorder:
+    def __init__(self):
+        self.invalidated = []
+        self.states = []
+
+    def invalidate(self, user_id):
+        self.invalidated.append(user_id)
+
+    def set_connected(self, connected):
+        self.states.append(connected)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def counter(name):
+    return sum(c["value"] for c in metrics.snapshot()["counters"] if c["name"] == name)
+
+
+@pytest.fixture
+def buses(tmp_path):
+    started = []
+
+    def make():
+        bus = InvalidationBus(LocalTransport(str(tmp_path)))
+        recorder = Recorder()
+        bus.subscribe(recorder)
+        bus.start()
+        started.append(bus)
+        return bus, recorder
+
+    yield make
+    for bus in started:
+        bus.stop()
+
+
+class TestInvalidationBus:
+    """Tests for delivery, staleness and reconnection over local sockets."""
+
+    def test_delivered_to_other_processes_within_bound(self, buses):
+        sender, own = buses()
+        _, other = buses()
+        metrics.reset()
+
+        published = time.monotonic()
+        sender.publish(7)
+        assert wait_for(lambda: other.invalidated == [7])
+        assert time.monotonic() - published < STALENESS_BOUND_SECONDS
+
+        (lag,) = [s for s in metrics.snapshot()["summaries"] if s["name"] == "invalidation_lag_seconds"]
+        assert lag["count"] == 1 and lag["max"] < STALENESS_BOUND_SECONDS
+        # The sender already updated its own caches
+        assert own.invalidated == []
+
+    def test_reconnects_after_losing_socket(self, buses):
+        sender, _ = buses()
+        receiver, recorder = buses()
+        metrics.reset()
+
+        receiver.transport.path.unlink()
+        assert wait_for(lambda: counter("invalidation_reconnects") == 1)
+        assert recorder.states == [False, True, False, True]
+
+        sender.publish(3)
+        assert wait_for(lambda: recorder.invalidated == [3])
+
+    def test_dead_peer_socket_removed(self, buses, tmp_path):
+        bus, _ = buses()
+        dead = tmp_path / "1-dead.sock"
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.bind(str(dead))
+
+        bus.publish(1)
+        assert not dead.exists()
+
+    def test_nothing_published_while_disconnected(self, tmp_path):
+        bus = InvalidationBus(LocalTransport(str(tmp_path)))
+        metrics.reset()
+        bus.publish(1)
+        assert counter("invalidation_published") == 0
+
+    def test_stop_is_prompt(self, buses):
+        bus, recorder = buses()
+        started = time.monotonic()
+        bus.stop()
+        assert time.monotonic() - started < 0.2
+        assert recorder.states == [False, True, False]
+
+
+class TestTaskCacheSubscription:
+    """The task list cache follows the bus."""
+
+    def test_disabled_while_disconnected(self):
+        cache = TaskCache(max_users=10, max_bytes=10**6, ttl_seconds=60)
+        cache.finish_load(1, cache.begin_load(1), [])
+        cache.set_connected(False)
+
+        assert cache.get(1) is None
+        cache.finish_load(1, cache.begin_load(1), [])
+        assert cache.stats()["users"] == 0
+
+        cache.set_connected(True)
+        cache.finish_load(1, cache.begin_load(1), [])
+        assert cache.get(1) is not None
+
+    def test_disabled_with_bus_off(self):
+        bus = create_bus("off", None, settings.invalidation_socket_dir)
+        cache = TaskCache(max_users=10, max_bytes=10**6, ttl_seconds=60)
+        attach(cache, bus)
+
+        cache.finish_load(1, cache.begin_load(1), [])
+        assert bus is None
+        assert cache.get(1) is None
+
+    def test_app_writes_and_peer_invalidations(self, client):
+        peer = InvalidationBus(LocalTransport(settings.invalidation_socket_dir))
+        recorder = Recorder()
+        peer.subscribe(recorder)
+        peer.start()
+        try:
+            client.post("/api/tasks", json={"title": "First"})
+            assert wait_for(lambda: recorder.invalidated == [1], STALENESS_BOUND_SECONDS)
+
+            client.get("/api/tasks")
+            assert task_cache.stats()["users"] == 1
+            peer.publish(1)
+            assert wait_for(lambda: task_cache.stats()["users"] == 0, STALENESS_BOUND_SECONDS)
+        finally:
+            peer.stop()
@@ -0,0 +1,119 @@
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import admin
+from app.main import app
+from app.middleware.memory import MemoryTrackingMiddleware
+from app.models.task import Task
+from app.services import auth as auth_service
+from app.services.memory import MemoryTracker
+from app.services.metrics import metrics
+from app.services.task_cache import task_cache
+
+# Peak bytes allocated per task while serving GET /api/tasks
+LIST_MEMORY_BUDGET_PER_TASK = 8 * 1024
+
+
+@pytest.fixture
+def tracing():
+    already_tracing = tracemalloc.is_tracing()
+    yield
+    if not already_tracing:
+        tracemalloc.stop()
+
+
+def add_tasks(db, count):
+    db.add_all(
+        Task(title=f"Task {i}", description="x" * 200, impact=5.0, user_id=1)
+        for i in range(count)
+    )
+    db.commit()
+
+
+class TestMemoryTracking:
+    """Tests for tracemalloc-based request memory tracking."""
+
+    def test_records_route_peak(self, client, tracing):
+        tracker = MemoryTracker()
+        metrics.reset()
+        tracked = TestClient(MemoryTrackingMiddleware(app, tracker=tracker))
+
+        tracked.post("/api/tasks", json={"title": "Tracked"})
+        tracked.get("/api/tasks")
+
+        assert tracker.route_peaks["/api/tasks"] > 0
+        summaries = {
+            (s["name"], s["labels"]["route"]) for s in metrics.snapshot()["summaries"]
+        }
+        assert ("request_peak_memory_bytes", "/api/tasks") in summaries
+
+    def test_overlapping_requests_not_recorded(self):
+        tracker = MemoryTracker()
+        alone = tracker.begin()
+        assert tracker.end(alone)
+
+        first = tracker.begin()
+        second = tracker.begin()
+        assert not tracker.end(second)
+        assert not tracker.end(first)
+
+        # Another request starting and finishing during this one still reset the peak
+        third = tracker.begin()
+        assert not tracker.end(tracker.begin())
+        assert not tracker.end(third)
+        assert tracker.end(tracker.begin())
+
+    def test_admin_memory_endpoint(self, client, tracing, monkeypatch):
+        monkeypatch.setattr(auth_service.settings, "admin_emails", ["test@example.com"])
+        tracker = MemoryTracker()
+        tracker.start()
+        tracker.record("/api/tasks", 1234)
+        monkeypatch.setattr(admin, "memory_tracker", tracker)
+
+        response = client.get("/api/admin/memory?limit=5")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["route_peaks"] == {"/api/tasks": 1234}
+        assert len(data["top_sites"]) <= 5
+
+    def test_admin_memory_disabled(self, client, monkeypatch):
+        monkeypatch.setattr(auth_service.settings, "admin_emails", ["test@example.com"])
+        if tracemalloc.is_tracing():
+            pytest.skip("tracemalloc is enabled for the whole test run")
+        assert client.get("/api/admin/memory").status_code == 409
+
+
+class TestListMemoryBudget:
+    """Regression guard for memory held while listing tasks."""
+
+    def measure(self, client, count):
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        response = client.get("/api/tasks")
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+
+        assert len(response.json()) == count
+        return peak / count
+
+    def test_list_memory_per_task(self, client, db, tracing):
+        count = 500
+        add_tasks(db, count)
+        client.get("/api/tasks")  # warm up imports and caches
+
+        # Measured on a miss, which loads every task from the database
+        task_cache.clear()
+        metrics.reset()
+        assert self.measure(client, count) < LIST_MEMORY_BUDGET_PER_TASK
+        # And on the hit that follows, served from the cached snapshot
+        assert self.measure(client, count) < LIST_MEMORY_BUDGET_PER_TASK
+
+        lookups = {
+            c["labels"]["result"]: c["value"]
+            for c in metrics.snapshot()["counters"]
+            if c["name"] == "task_cache"
+        }
+        assert lookups == {"miss": 1, "hit": 1}
@@ -0,0 +1,93 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app import online_migrations
+from app.cli.check_migrations import check, check_source
+
+RISKY = '''
+revision = "011"
+
+
+def upgrade():
+    op.create_table("labels", sa.Column("id", sa.Integer()))
+    op.create_index("ix_labels_id", "labels", ["id"])
+    op.create_index("ix_tasks_title", "tasks", ["title"])
+    op.alter_column("tasks", "title", nullable=False)
+    op.execute("ALTER TABLE tasks ADD CONSTRAINT fk FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute("ALTER TABLE tasks ADD CONSTRAINT ok FOREIGN KEY (user_id) REFERENCES users (id) NOT VALID")
+    op.execute(f"CREATE INDEX CONCURRENTLY ix_{name} ON tasks (title)")
+    # migration-check: ignore - a handful of rows
+    op.create_index("ix_users_email", "users", ["email"])
+    rebuild()
+
+
+def rebuild():
+    op.execute("ALTER TABLE task_logs RENAME TO task_logs_old")
+
+
+def downgrade():
+    op.create_index("ix_tasks_title", "tasks", ["title"])
+'''
+
+
+class TestCheckMigrations:
+    """Tests for the locking-migration check."""
+
+    def test_flags_locking_operations(self):
+        findings = check_source(RISKY, Path("011.py"))
+        assert [(f.line, f.rule) for f in findings] == [
+            (8, "create-index"),
+            (9, "set-not-null"),
+            (10, "constraint"),
+            (19, "rename-table"),
+        ]
+
+    def test_current_migrations_pass(self):
+        assert check() == []
+
+
+class TestOnlineMigrations:
+    """The helpers run as plain operations outside Postgres."""
+
+    def operations(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path}/migrate.db")
+        connection = engine.connect()
+        connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, size INTEGER, label TEXT)"))
+        connection.execute(
+            text("INSERT INTO items (id, size) VALUES " + ", ".join(f"({i}, {i})" for i in range(1, 8)))
+        )
+        connection.commit()
+        return connection, Operations(MigrationContext.configure(connection))
+
+    def test_backfill_in_batches(self, tmp_path, monkeypatch):
+        connection, operations = self.operations(tmp_path)
+        pauses = []
+        monkeypatch.setattr(online_migrations.time, "sleep", lambda seconds: pauses.append(seconds))
+
+        with Operations.context(operations.migration_context):
+            updated = online_migrations.backfill(
+                "items", "label = 'big'", "size > 2", batch_size=2, pause_seconds=0.5
+            )
+
+        assert updated == 5
+        assert pauses == [0.5, 0.5, 0.5]
+        labels = connection.execute(text("SELECT id FROM items WHERE label = 'big'")).scalars().all()
+        assert labels == [3, 4, 5, 6, 7]
+
+    def test_index_falls_back_to_plain_create(self, tmp_path):
+        connection, operations = self.operations(tmp_path)
+        with Operations.context(operations.migration_context):
+            online_migrations.create_index_concurrently("ix_items_size", "items", ["size"])
+        indexes = connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))
+        assert indexes.scalars().all() == ["ix_items_size"]
+
+    def test_lock_timeouts_recognised(self):
+        timeout = OperationalError("ALTER TABLE", {}, SimpleNamespace(pgcode="55P03"))
+        other = OperationalError("ALTER TABLE", {}, SimpleNamespace(pgcode="40P01"))
+        assert online_migrations.is_lock_timeout(timeout)
+        assert not online_migrations.is_lock_timeout(other)
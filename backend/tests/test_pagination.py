@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, text
+
+from app.models.task import Task, TaskLog
+from app.services.pagination import keyset_query
+from tests.conftest import engine
+
+START = datetime(2026, 1, 1)
+
+
+def add_logs(db, count):
+    task = Task(title="Endless", task_type="endless", user_id=1)
+    db.add(task)
+    db.flush()
+    # Pairs of logs share a timestamp so the id tie-breaker matters
+    db.add_all(
+        TaskLog(task_id=task.id, duration_minutes=i + 1, logged_at=START + timedelta(hours=i // 2))
+        for i in range(count)
+    )
+    db.commit()
+    return task.id
+
+
+def all_pages(client, url, limit):
+    items, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": limit} | ({"cursor": cursor} if cursor else {})
+        page = client.get(url, params=params).json()
+        items += page["items"]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items, pages
+
+
+class TestLogPagination:
+    """Tests for keyset pagination of /{task_id}/logs."""
+
+    def test_pages_cover_all_logs_in_order(self, client, db):
+        task_id = add_logs(db, 25)
+        logs, pages = all_pages(client, f"/api/tasks/{task_id}/logs", limit=4)
+
+        assert pages == 7
+        assert len({log["id"] for log in logs}) == 25
+        positions = [(log["logged_at"], log["id"]) for log in logs]
+        assert positions == sorted(positions, reverse=True)
+
+    def test_exact_multiple_has_no_empty_page(self, client, db):
+        task_id = add_logs(db, 8)
+        page = client.get(f"/api/tasks/{task_id}/logs?limit=8").json()
+        assert len(page["items"]) == 8 and page["next_cursor"] is None
+
+    def test_limit_and_cursor_validated(self, client, db):
+        task_id = add_logs(db, 1)
+        assert client.get(f"/api/tasks/{task_id}/logs?limit=0").status_code == 422
+        assert client.get(f"/api/tasks/{task_id}/logs?limit=201").status_code == 422
+        assert client.get(f"/api/tasks/{task_id}/logs?cursor=%%%").status_code == 400
+
+    def test_deep_page_seeks_by_index(self, db):
+        add_logs(db, 2)
+        query = keyset_query(
+            select(TaskLog).where(TaskLog.task_id == 1),
+            TaskLog.logged_at,
+            TaskLog.id,
+            limit=50,
+            after=(START + timedelta(days=500), 10_000),
+        )
+        compiled = query.compile(engine, compile_kwargs={"literal_binds": True})
+        with engine.connect() as conn:
+            plan = " ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+        assert "ix_task_logs_task_logged" in plan
+        assert "TEMP B-TREE" not in plan
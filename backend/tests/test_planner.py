@@ -0,0 +1,94 @@
+import itertools
+import random
+import time
+
+import numpy as np
+import pytest
+
+from app.services import planner
+from app.services.planner import plan_exact, plan_greedy, plan_tasks
+
+# Greedy planning of 5k tasks
+PLAN_BUDGET_SECONDS = 0.01
+
+
+def random_items(count, seed):
+    rng = random.Random(seed)
+    efforts = np.array([rng.choice([0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 4.0]) for _ in range(count)])
+    scores = np.array([rng.uniform(0, 10) for _ in range(count)])
+    return efforts, scores
+
+
+def brute_force(efforts, scores, hours):
+    best = 0.0
+    for size in range(len(efforts) + 1):
+        for subset in itertools.combinations(range(len(efforts)), size):
+            if efforts[list(subset)].sum() <= hours + 1e-9:
+                best = max(best, scores[list(subset)].sum())
+    return best
+
+
+class TestPlanner:
+    """Tests for the time-budget planner."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_exact_matches_brute_force(self, seed):
+        efforts, scores = random_items(10, seed)
+        chosen = plan_exact(efforts, scores, 3.0)
+        assert efforts[chosen].sum() <= 3.0 + 1e-9
+        assert scores[chosen].sum() == pytest.approx(brute_force(efforts, scores, 3.0))
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_greedy_within_half_of_optimum(self, seed):
+        efforts, scores = random_items(60, seed)
+        optimum = scores[plan_exact(efforts, scores, 2.5)].sum()
+        chosen = plan_greedy(efforts, scores, 2.5)
+        assert efforts[chosen].sum() <= 2.5 + 1e-9
+        assert scores[chosen].sum() >= optimum / 2
+
+    def test_greedy_falls_back_to_best_single_task(self):
+        efforts = np.array([0.1, 3.0])
+        scores = np.array([1.0, 9.0])
+        assert plan_greedy(efforts, scores, 3.0) == [1]
+
+    def test_switches_method_by_task_count(self, monkeypatch):
+        efforts, scores = random_items(20, 0)
+        assert plan_tasks(efforts, scores, 2.0).method == "exact"
+        monkeypatch.setattr(planner, "EXACT_MAX_TASKS", 10)
+        assert plan_tasks(efforts, scores, 2.0).method == "greedy"
+
+    def test_nothing_fits(self):
+        plan = plan_tasks(np.array([5.0]), np.array([9.0]), 1.0)
+        assert plan.indices == [] and plan.total_score == 0.0
+
+    def test_five_thousand_tasks_under_budget(self):
+        efforts, scores = random_items(5000, 0)
+
+        def run():
+            start = time.perf_counter()
+            plan = plan_tasks(efforts, scores, 8.0)
+            return time.perf_counter() - start, plan
+
+        elapsed, plan = min((run() for _ in range(5)), key=lambda result: result[0])
+        assert plan.method == "greedy"
+        assert plan.total_effort <= 8.0 + 1e-9
+        assert elapsed < PLAN_BUDGET_SECONDS
+
+
+class TestPlanEndpoint:
+    """Tests for GET /api/tasks/plan."""
+
+    def test_plan(self, client):
+        client.post("/api/tasks", json={"title": "Big", "impact": 9.0, "effort": 3.0})
+        client.post("/api/tasks", json={"title": "Small A", "impact": 4.0, "effort": 1.0})
+        client.post("/api/tasks", json={"title": "Small B", "impact": 4.0, "effort": 1.0})
+        client.post("/api/tasks", json={"title": "Small C", "impact": 3.0, "effort": 1.0})
+
+        data = client.get("/api/tasks/plan?hours=3").json()
+        assert data["method"] == "exact"
+        assert sorted(t["title"] for t in data["tasks"]) == ["Small A", "Small B", "Small C"]
+        assert data["total_effort"] == pytest.approx(3.0)
+
+    def test_hours_required(self, client):
+        assert client.get("/api/tasks/plan").status_code == 422
+        assert client.get("/api/tasks/plan?hours=0").status_code == 422
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import admin
+from app.main import app
+from app.middleware.profiling import ProfilingMiddleware
+from app.services import auth as auth_service
+from app.services.profiling import ProfileStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileStore(str(tmp_path), max_files=2)
+
+
+class TestProfileStore:
+    """Tests for the on-disk profile ring."""
+
+    def test_ring_keeps_newest_files(self, store):
+        names = []
+        for i in range(4):
+            name = store.new_name("GET", f"/api/tasks/{i}")
+            store.save(name, {"n": i})
+            names.append(name)
+            time.sleep(0.002)
+
+        listed = [p["name"] for p in store.entries()]
+        assert listed == [names[3], names[2]]
+        assert store.path_for(names[0]) is None
+
+    def test_rejects_path_traversal(self, store):
+        assert store.path_for("../etc/passwd") is None
+
+    def test_keeps_at_least_one_file(self, tmp_path):
+        with pytest.raises(ValueError):
+            ProfileStore(str(tmp_path), max_files=0)
+
+        store = ProfileStore(str(tmp_path), max_files=1)
+        for i in range(3):
+            name = store.new_name("GET", f"/api/tasks/{i}")
+            store.save(name, {"n": i})
+            time.sleep(0.002)
+        assert [p["name"] for p in store.entries()] == [name]
+
+
+class TestProfilingMiddleware:
+    """Tests for on-demand request profiling."""
+
+    def test_unflagged_request_not_profiled(self, client, store):
+        profiled = TestClient(ProfilingMiddleware(app, store=store, token="secret"))
+        response = profiled.get("/api/tasks")
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+        assert store.entries() == []
+
+    def test_wrong_token_not_profiled(self, client, store):
+        profiled = TestClient(ProfilingMiddleware(app, store=store, token="secret"))
+        response = profiled.get("/api/tasks", headers={"X-Profile": "nope"})
+        assert "x-profile-id" not in response.headers
+
+    def test_header_flag_stores_profile(self, client, store):
+        profiled = TestClient(ProfilingMiddleware(app, store=store, token="secret"))
+        response = profiled.get("/api/tasks", headers={"X-Profile": "secret"})
+        assert response.status_code == 200
+
+        name = response.headers["x-profile-id"]
+        data = json.loads(store.path_for(name).read_text())
+        assert data["profiles"][0]["type"] == "sampled"
+        assert data["name"] == "GET /api/tasks"
+
+    def test_query_flag_stores_profile(self, client, store):
+        profiled = TestClient(ProfilingMiddleware(app, store=store, token="secret"))
+        response = profiled.get("/health?profile=secret")
+        assert store.path_for(response.headers["x-profile-id"]) is not None
+
+    def test_saves_off_the_event_loop(self, client, store, monkeypatch):
+        save = store.save
+        on_loop = []
+
+        def recording_save(name, profile):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return save(name, profile)
+
+        monkeypatch.setattr(store, "save", recording_save)
+        profiled = TestClient(ProfilingMiddleware(app, store=store, token="secret"))
+        response = profiled.get("/health", headers={"X-Profile": "secret"})
+
+        assert on_loop == [False]
+        assert store.path_for(response.headers["x-profile-id"]) is not None
+
+    def test_samples_sync_endpoint_in_threadpool(self, store):
+        slow_app = FastAPI()
+
+        @slow_app.get("/slow")
+        def slow_endpoint():
+            deadline = time.perf_counter() + 0.1
+            while time.perf_counter() < deadline:
+                pass
+            return {}
+
+        profiled = TestClient(ProfilingMiddleware(slow_app, store=store, token="secret"))
+        response = profiled.get("/slow", headers={"X-Profile": "secret"})
+
+        data = json.loads(store.path_for(response.headers["x-profile-id"]).read_text())
+        frame_names = {frame["name"] for frame in data["shared"]["frames"]}
+        assert "slow_endpoint" in frame_names
+
+    def test_concurrency_limit_skips_profiling(self, client, store):
+        middleware = ProfilingMiddleware(app, store=store, token="secret", max_concurrent=1)
+        middleware.slots.acquire()
+        try:
+            response = TestClient(middleware).get("/health", headers={"X-Profile": "secret"})
+        finally:
+            middleware.slots.release()
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+
+
+class TestAdminProfilesEndpoints:
+    """Tests for retrieving profiles through the admin API."""
+
+    def test_requires_admin(self, client):
+        response = client.get("/api/admin/profiles")
+        assert response.status_code == 403
+
+    def test_list_and_download(self, client, store, monkeypatch):
+        monkeypatch.setattr(auth_service.settings, "admin_emails", ["test@example.com"])
+        monkeypatch.setattr(admin, "profile_store", store)
+        name = store.new_name("GET", "/api/tasks")
+        store.save(name, {"name": "GET /api/tasks"})
+
+        response = client.get("/api/admin/profiles")
+        assert response.status_code == 200
+        assert [p["name"] for p in response.json()] == [name]
+
+        response = client.get(f"/api/admin/profiles/{name}")
+        assert response.status_code == 200
+        assert response.json() == {"name": "GET /api/tasks"}
+
+        assert client.get("/api/admin/profiles/missing").status_code == 404
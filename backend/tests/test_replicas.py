@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.api import dependencies
+from app.database import Base, ReplicaRouter
+from app.main import app
+from app.models.task import Task, TaskType
+from app.models.user import User
+from app.services.auth import get_current_user
+from tests.conftest import TestingSessionLocal
+
+
+def make_replica(path, title):
+    """Create a SQLite stand-in for a replica holding one completed task."""
+    url = f"sqlite:///{path}"
+    router = ReplicaRouter([url], read_your_writes_seconds=60, retry_seconds=60)
+    engine = router.replicas[0].engine
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add(User(id=1, email="test@example.com", hashed_password="hashed_secret"))
+        session.add(
+            Task(
+                title=title,
+                task_type=TaskType.ENDING,
+                user_id=1,
+                completed_at=datetime.now(timezone.utc),
+            )
+        )
+        session.commit()
+    return url
+
+
+def user_from_db():
+    # As get_current_user does, so the user's last write is read back on each request
+    with TestingSessionLocal() as session:
+        return session.get(User, 1)
+
+
+@pytest.fixture
+def replica_urls(tmp_path):
+    return [
+        make_replica(tmp_path / "replica_a.db", "Replica A"),
+        make_replica(tmp_path / "replica_b.db", "Replica B"),
+    ]
+
+
+def completed_titles(client):
+    return [t["title"] for t in client.get("/api/tasks/completed").json()["items"]]
+
+
+class TestReplicaRouting:
+    """Tests for routing read-only endpoints to read replicas."""
+
+    def test_without_replicas_reads_primary(self, client):
+        create_response = client.post("/api/tasks", json={"title": "Primary"})
+        client.post(f"/api/tasks/{create_response.json()['id']}/complete")
+        assert completed_titles(client) == ["Primary"]
+
+    def test_reads_round_robin_over_replicas(self, client, replica_urls, monkeypatch):
+        monkeypatch.setattr(dependencies, "replica_router", ReplicaRouter(replica_urls, 60, 60))
+        titles = {completed_titles(client)[0] for _ in range(4)}
+        assert titles == {"Replica A", "Replica B"}
+
+    def test_read_your_writes_uses_primary(self, client, replica_urls, monkeypatch):
+        monkeypatch.setitem(app.dependency_overrides, get_current_user, user_from_db)
+        create_response = client.post("/api/tasks", json={"title": "Primary"})
+        client.post(f"/api/tasks/{create_response.json()['id']}/complete")
+
+        # A router of its own, as in another worker process: the write is on the user's row
+        router = ReplicaRouter(replica_urls, read_your_writes_seconds=60, retry_seconds=60)
+        monkeypatch.setattr(dependencies, "replica_router", router)
+        assert completed_titles(client) == ["Primary"]
+
+    def test_read_your_writes_window_expires(self, client, replica_urls, monkeypatch):
+        monkeypatch.setitem(app.dependency_overrides, get_current_user, user_from_db)
+        router = ReplicaRouter(replica_urls, read_your_writes_seconds=0, retry_seconds=60)
+        monkeypatch.setattr(dependencies, "replica_router", router)
+
+        client.post("/api/tasks", json={"title": "Primary"})
+        assert completed_titles(client)[0].startswith("Replica")
+
+    def test_unhealthy_replica_is_skipped(self, client, replica_urls, tmp_path, monkeypatch):
+        broken = f"sqlite:///{tmp_path}/missing/dir/replica.db"
+        router = ReplicaRouter([broken, replica_urls[0]], 60, 60)
+        monkeypatch.setattr(dependencies, "replica_router", router)
+
+        titles = {completed_titles(client)[0] for _ in range(3)}
+        assert titles == {"Replica A"}
+        assert router.replicas[0].down_until > 0
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.models.task import Task
+from app.services.forecast import forecast_scores
+from app.services.priority import SCORING_MODELS, calculate_priority_score, update_task_impact
+from app.services.search import priority_expression
+from app.services.task_cache import TaskSnapshot
+from tests.conftest import override_get_current_user
+
+NOW = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+NAIVE_NOW = NOW.replace(tzinfo=None)
+
+# Tiny effort, no deadline, deadlines overdue to far off (beyond the urgency horizon)
+CASES = [
+    dict(impact=2.0, not_doing_hourly_rate=0.5, last_updated=NAIVE_NOW - timedelta(hours=3)),
+    dict(impact=9.5, effort=0.05, last_updated=NAIVE_NOW),
+    dict(impact=4.0, deadline=NAIVE_NOW - timedelta(days=400)),
+    dict(impact=4.0, deadline=NAIVE_NOW - timedelta(days=1)),
+    dict(impact=1.0, deadline=NAIVE_NOW + timedelta(hours=1)),
+    dict(impact=3.0, effort=2.0, deadline=NAIVE_NOW + timedelta(days=1, hours=6)),
+    dict(impact=5.0, effort=0.5, deadline=NAIVE_NOW + timedelta(days=90)),
+    dict(impact=0.5, not_doing_hourly_rate=0.1, deadline=NAIVE_NOW + timedelta(days=3)),
+]
+
+models = pytest.mark.parametrize("model", SCORING_MODELS.values(), ids=SCORING_MODELS.keys())
+
+
+def make_tasks():
+    defaults = {"effort": 1.0, "not_doing_hourly_rate": 0.0, "last_updated": NAIVE_NOW}
+    return [
+        Task(id=i + 1, title=f"Task {i}", user_id=1, **{**defaults, **case})
+        for i, case in enumerate(CASES)
+    ]
+
+
+def scalar_score(task, now, model):
+    copy = Task(
+        impact=task.impact,
+        effort=task.effort,
+        not_doing_hourly_rate=task.not_doing_hourly_rate,
+        deadline=task.deadline,
+        last_updated=task.last_updated,
+    )
+    return update_task_impact(copy, now, model)
+
+
+@models
+class TestConformance:
+    """Every scoring model gives the same scores in its scalar, NumPy and SQL forms."""
+
+    def test_urgency_forms_agree(self, model):
+        days_left = np.array([-1e4, -61.0, -1.0, 0.0, 0.05, 0.1, 0.5, 1.0, 2.0, 30.0, 61.0, 1e4])
+        urgencies = model.urgencies(days_left)
+        assert urgencies.tolist() == pytest.approx([model.urgency(d) for d in days_left.tolist()])
+        assert np.isfinite(urgencies).all()
+        # Never less urgent as the deadline nears
+        assert (np.diff(urgencies) <= 1e-12).all()
+
+    def test_batch_matches_scalar(self, model):
+        tasks = make_tasks()
+        _, priorities = TaskSnapshot.from_tasks(tasks, 0.0).scores(NOW, model)
+
+        expected = [scalar_score(task, NOW, model) for task in tasks]
+        assert priorities.tolist() == pytest.approx(expected, abs=1e-9)
+
+    def test_forecast_matches_scalar(self, model):
+        tasks = make_tasks()
+        forecast = forecast_scores(tasks, NOW, timedelta(days=2), timedelta(hours=6), model)
+
+        for row, task in enumerate(tasks):
+            expected = [scalar_score(task, at, model) for at in forecast.times]
+            assert forecast.scores[row].tolist() == pytest.approx(expected, abs=1e-9)
+
+    def test_sql_matches_scalar(self, model, db):
+        tasks = make_tasks()
+        tasks.append(
+            Task(id=100, title="Done", user_id=1, impact=3.0, effort=1.0, completed_at=NAIVE_NOW)
+        )
+        db.add_all(tasks)
+        db.commit()
+
+        from_sql = dict(db.execute(db.query(Task.id, priority_expression(NOW, model)).statement).all())
+        for task in tasks:
+            if task.completed_at is None:
+                expected = scalar_score(task, NOW, model)
+            else:
+                expected = calculate_priority_score(task, NOW, model)
+            assert from_sql[task.id] == pytest.approx(expected, abs=1e-6), task.title
+        db.rollback()
+
+
+class TestUserScoringModel:
+    """Tests for choosing a scoring model per user."""
+
+    @pytest.fixture(autouse=True)
+    def default_model(self, monkeypatch):
+        # The overridden current user outlives the test
+        monkeypatch.setattr(override_get_current_user(), "scoring_model", None)
+
+    def titles(self, client):
+        return [task["title"] for task in client.get("/api/tasks").json()]
+
+    def test_model_changes_the_order(self, client):
+        deadline = (datetime.now(timezone.utc) + timedelta(days=1, hours=12)).isoformat()
+        client.post("/api/tasks", json={"title": "Steady", "impact": 8.0, "not_doing_hourly_rate": 0.0})
+        client.post(
+            "/api/tasks",
+            json={"title": "Due", "impact": 3.0, "not_doing_hourly_rate": 0.0, "deadline": deadline},
+        )
+        assert self.titles(client) == ["Steady", "Due"]
+
+        response = client.patch("/api/auth/me", json={"scoring_model": "exponential"})
+        assert response.status_code == 200
+        assert response.json()["scoring_model"] == "exponential"
+        assert self.titles(client) == ["Due", "Steady"]
+
+        client.patch("/api/auth/me", json={"scoring_model": None})
+        assert self.titles(client) == ["Steady", "Due"]
+
+    def test_empty_update_keeps_the_model(self, client):
+        client.patch("/api/auth/me", json={"scoring_model": "sigmoid"})
+
+        response = client.patch("/api/auth/me", json={})
+        assert response.status_code == 200
+        assert response.json()["scoring_model"] == "sigmoid"
+        assert client.get("/api/auth/me").json()["scoring_model"] == "sigmoid"
+
+    def test_unknown_model_rejected(self, client):
+        response = client.patch("/api/auth/me", json={"scoring_model": "quadratic"})
+        assert response.status_code == 400
+        assert "hyperbolic" in response.json()["detail"]
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.task import Task
+from app.models.user import User
+from app.services.priority import calculate_priority_score, update_task_impact
+from app.services.search import priority_expression, search_terms
+
+
+def add_task(db, title, description=None, **fields):
+    task = Task(title=title, description=description, user_id=1, **fields)
+    db.add(task)
+    db.commit()
+    return task.id
+
+
+def search(client, q, **params):
+    response = client.get("/api/tasks/search", params={"q": q} | params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+class TestSearchTerms:
+    """Tests for query parsing."""
+
+    def test_operators_and_punctuation_dropped(self):
+        assert search_terms('Fix "tax" OR -report* (NEAR)') == ["fix", "tax", "or", "report", "near"]
+
+    def test_terms_capped(self):
+        assert len(search_terms(" ".join(f"w{i}" for i in range(50)))) == 16
+
+
+class TestSearchEndpoint:
+    """Tests for GET /api/tasks/search."""
+
+    def test_matches_title_and_description(self, client, db):
+        in_title = add_task(db, "Prepare tax return")
+        in_description = add_task(db, "Paperwork", "Collect receipts for the tax office")
+        add_task(db, "Water plants")
+
+        ids = {item["id"] for item in search(client, "tax")["items"]}
+        assert ids == {in_title, in_description}
+
+    def test_all_terms_must_match_as_prefixes(self, client, db):
+        both = add_task(db, "Quarterly report", "Finance numbers")
+        add_task(db, "Quarterly planning")
+
+        assert [item["id"] for item in search(client, "quart fin")["items"]] == [both]
+
+    def test_index_follows_updates_and_deletes(self, client, db):
+        task_id = add_task(db, "Book flights")
+        assert client.put(f"/api/tasks/{task_id}", json={"title": "Book hotel"}).status_code == 200
+        assert search(client, "flights")["items"] == []
+        assert [item["id"] for item in search(client, "hotel")["items"]] == [task_id]
+
+        assert client.delete(f"/api/tasks/{task_id}").status_code == 204
+        assert search(client, "hotel")["items"] == []
+
+    def test_title_match_outranks_description_match(self, client, db):
+        in_description = add_task(db, "Errand", "Buy groceries")
+        in_title = add_task(db, "Groceries", "Weekly run")
+
+        items = search(client, "groceries")["items"]
+        assert [item["id"] for item in items] == [in_title, in_description]
+        assert items[0]["relevance"] > items[1]["relevance"]
+
+    def test_priority_breaks_relevance_ties(self, client, db):
+        low = add_task(db, "Clean garage", impact=1.0)
+        high = add_task(db, "Clean kitchen", impact=9.0)
+
+        items = search(client, "clean")["items"]
+        assert [item["id"] for item in items] == [high, low]
+        assert items[0]["relevance"] == items[1]["relevance"]
+        assert items[0]["score"] > items[1]["score"]
+
+    def test_completed_tasks_excluded_by_default(self, client, db):
+        add_task(db, "Renew passport", completed_at=datetime.now(timezone.utc))
+
+        assert search(client, "passport")["items"] == []
+        assert len(search(client, "passport", include_completed="true")["items"]) == 1
+
+    def test_other_users_tasks_not_returned(self, client, db):
+        db.add(User(id=2, email="other@example.com", hashed_password="x"))
+        db.add(Task(title="Secret plan", user_id=2))
+        db.commit()
+        assert search(client, "secret")["items"] == []
+
+    def test_pages_cover_all_results_in_score_order(self, client, db):
+        for i in range(11):
+            add_task(db, f"Invoice {i}", impact=float(i % 5))
+
+        items, cursor = [], None
+        while True:
+            page = search(client, "invoice", limit=3, **({"cursor": cursor} if cursor else {}))
+            items += page["items"]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len({item["id"] for item in items}) == 11
+        positions = [(item["score"], item["id"]) for item in items]
+        assert positions == sorted(positions, reverse=True)
+
+    def test_invalid_queries_rejected(self, client, db):
+        assert client.get("/api/tasks/search?q=").status_code == 422
+        assert client.get("/api/tasks/search", params={"q": "?!"}).status_code == 400
+        assert client.get("/api/tasks/search?q=x&cursor=%%%").status_code == 400
+
+
+class TestPriorityExpression:
+    """The SQL priority matches the Python scoring."""
+
+    def test_matches_update_and_calculate(self, db):
+        now = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+        naive_now = now.replace(tzinfo=None)
+        tasks = [
+            Task(title="a", impact=2.0, not_doing_hourly_rate=0.5, last_updated=naive_now - timedelta(hours=3)),
+            Task(title="b", impact=9.5, effort=0.05, last_updated=naive_now),
+            Task(title="c", impact=4.0, effort=2.0, deadline=naive_now + timedelta(days=2), last_updated=naive_now),
+            Task(title="d", impact=4.0, deadline=naive_now - timedelta(days=1), last_updated=naive_now),
+            Task(title="e", impact=3.0, completed_at=naive_now, last_updated=naive_now - timedelta(days=9)),
+        ]
+        for task in tasks:
+            task.user_id = 1
+        db.add_all(tasks)
+        db.commit()
+
+        from_sql = dict(db.execute(db.query(Task.id, priority_expression(now)).statement).all())
+        for task in tasks:
+            if task.completed_at is None:
+                expected = update_task_impact(task, now)
+            else:
+                expected = calculate_priority_score(task, now)
+            assert abs(from_sql[task.id] - expected) < 1e-6, task.title
+        db.rollback()
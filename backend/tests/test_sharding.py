@@ -0,0 +1,188 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+
+from app.api import dependencies
+from app.database import Base, ShardRouter, engine_options
+from app.main import app
+from app.models.archive import ArchivedTask
+from app.models.task import Task, TaskLog, TaskType
+from app.models.tombstone import TaskTombstone
+from app.models.user import User
+from app.services import sharding
+from app.services.auth import get_current_user
+from app.services.sharding import MoveError, add_shard_user, assign_shard, move_user
+from app.services.sync import UserMoved, next_change_seq, record_deletion
+
+
+@pytest.fixture
+def router(tmp_path):
+    urls = [f"sqlite:///{tmp_path}/shard{shard}.db" for shard in range(3)]
+    router = ShardRouter(create_engine(urls[0], **engine_options(urls[0])), urls[1:])
+    for engine in router.engines:
+        Base.metadata.create_all(bind=engine)
+    yield router
+    for engine in router.engines:
+        engine.dispose()
+
+
+def add_user(router, shard, email="user@example.com"):
+    with router.session(0) as db:
+        user = User(email=email, shard=shard)
+        db.add(user)
+        db.commit()
+        with router.session(shard) as shard_db:
+            add_shard_user(shard_db, user, shard)
+            shard_db.commit()
+        return user.id
+
+
+def write(router, shard, user_id, task_id=None, **values):
+    """Create a task (or log time on `task_id`) the way the endpoints do."""
+    with router.session(shard) as db:
+        change_seq = next_change_seq(db, user_id)
+        if task_id is None:
+            task = Task(**{"title": "Task", **values}, user_id=user_id, change_seq=change_seq)
+            db.add(task)
+            db.commit()
+            return task.id
+        db.add(
+            TaskLog(
+                task_id=task_id,
+                user_id=user_id,
+                change_seq=change_seq,
+                duration_minutes=30,
+                logged_at=datetime(2026, 1, 1),
+            )
+        )
+        db.commit()
+
+
+def counts(router, shard, user_id):
+    with router.session(shard) as db:
+        return {
+            model.__tablename__: db.scalar(
+                select(func.count()).select_from(model).where(model.user_id == user_id)
+            )
+            for model in sharding.SHARDED_MODELS
+        }
+
+
+class TestPlacement:
+    """Tests for mapping users to shards."""
+
+    def test_stable_hash_spreads_users(self, router):
+        shards = [router.place(user_id) for user_id in range(1, 301)]
+        other = ShardRouter(router.engines[0], ["sqlite://"] * 2)
+        assert shards == [other.place(user_id) for user_id in range(1, 301)]
+        assert all(shards.count(shard) > 60 for shard in range(3))
+
+    def test_new_user_gets_a_row_on_their_shard(self, router):
+        with router.session(0) as db:
+            user = User(email="new@example.com")
+            db.add(user)
+            db.flush()
+            assign_shard(db, user, router)
+            db.commit()
+            shard = user.shard
+        assert shard == router.place(user.id)
+        with router.session(shard) as shard_db:
+            assert shard_db.get(User, user.id).shard == shard
+
+    def test_requests_use_the_users_shard(self, router, monkeypatch):
+        user_id = add_user(router, 2)
+        monkeypatch.setattr(dependencies, "shard_router", router)
+        user = User(id=user_id, email="user@example.com", shard=2)
+        app.dependency_overrides[get_current_user] = lambda: user
+        try:
+            with TestClient(app) as client:
+                task = client.post("/api/tasks", json={"title": "Sharded"}).json()
+                assert [t["id"] for t in client.get("/api/tasks").json()] == [task["id"]]
+        finally:
+            app.dependency_overrides.clear()
+
+        assert counts(router, 2, user_id)["tasks"] == 1
+        assert counts(router, 0, user_id)["tasks"] == 0
+
+
+class TestMoveUser:
+    """Tests for moving a user's rows between shards."""
+
+    def seed(self, router, shard):
+        user_id = add_user(router, shard)
+        endless = write(router, shard, user_id, task_type=TaskType.ENDLESS)
+        write(router, shard, user_id, task_id=endless)
+        deleted = write(router, shard, user_id)
+        with router.session(shard) as db:
+            db.delete(db.get(Task, deleted))
+            record_deletion(db, user_id, deleted)
+            task = db.get(Task, endless)
+            columns = {
+                c.name: getattr(task, c.name)
+                for c in ArchivedTask.__table__.columns
+                if hasattr(task, c.name)
+            }
+            columns.update(id=1000, completed_at=datetime(2026, 1, 1), archived_at=datetime(2026, 2, 1))
+            db.add(ArchivedTask(**columns))
+            db.commit()
+        return user_id
+
+    def test_moves_every_row_and_the_sequence(self, router):
+        user_id = self.seed(router, 0)
+        before = counts(router, 0, user_id)
+        assert before == {"tasks": 1, "archived_tasks": 1, "task_logs": 1, "task_tombstones": 1}
+
+        for source, target in ((0, 2), (2, 1), (1, 0)):
+            result = move_user(user_id, target, batch_size=1, router=router)
+            assert (result.source, result.target) == (source, target)
+            assert counts(router, target, user_id) == before
+            assert counts(router, source, user_id) == dict.fromkeys(before, 0)
+            with router.session(0) as db:
+                assert db.get(User, user_id).shard == target
+            with router.session(target) as db:
+                assert db.get(User, user_id).change_seq == 4
+
+    def test_writes_during_the_copy_are_caught_up(self, router, monkeypatch):
+        user_id = self.seed(router, 0)
+        written, copy = [], sharding._copy
+
+        def copy_then_write(source, target, model, criteria, batch_size):
+            copied = copy(source, target, model, criteria, batch_size)
+            if model is TaskTombstone and not written:
+                # The bulk copy is done; the user keeps working before the fence
+                written.append(write(router, 0, user_id, title="Late"))
+                with router.session(0) as db:
+                    task = db.scalars(select(Task).where(Task.title == "Task")).first()
+                    db.delete(task)
+                    record_deletion(db, user_id, task.id)
+                    db.commit()
+            return copied
+
+        monkeypatch.setattr(sharding, "_copy", copy_then_write)
+        move_user(user_id, 1, router=router)
+
+        with router.session(1) as db:
+            assert db.scalars(select(Task.title).where(Task.user_id == user_id)).all() == ["Late"]
+            assert db.scalar(select(func.count()).select_from(TaskTombstone)) == 2
+            assert db.get(User, user_id).change_seq == 6
+
+    def test_old_shard_refuses_writes(self, router):
+        user_id = self.seed(router, 1)
+        move_user(user_id, 2, router=router)
+        with router.session(1) as db, pytest.raises(UserMoved):
+            next_change_seq(db, user_id)
+        with router.session(2) as db:
+            assert next_change_seq(db, user_id) == 5
+
+    def test_id_clash_aborts_before_copying(self, router):
+        user_id = self.seed(router, 0)
+        other = add_user(router, 1, email="other@example.com")
+        write(router, 1, other)
+
+        with pytest.raises(MoveError, match="tasks id"):
+            move_user(user_id, 1, router=router)
+        assert counts(router, 0, user_id)["tasks"] == 1
+        with router.session(0) as db:
+            assert db.get(User, user_id).shard == 0
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import Header
+
+from app.api import tasks as tasks_api
+from app.main import app
+from app.models.user import User
+from app.services.auth import get_current_user
+from app.services.metrics import metrics
+from app.services.singleflight import SingleFlight
+from app.services.task_cache import task_cache
+
+
+def counters():
+    return {
+        c["labels"]["result"]: c["value"]
+        for c in metrics.snapshot()["counters"]
+        if c["name"] == "singleflight"
+    }
+
+
+class TestSingleFlight:
+    """Tests for coalescing concurrent calls."""
+
+    def test_concurrent_calls_share_one_computation(self):
+        flights = SingleFlight("test")
+        calls = []
+        metrics.reset()
+
+        async def compute(key):
+            calls.append(key)
+            await asyncio.sleep(0.05)
+            return f"result {key}"
+
+        async def run():
+            return await asyncio.gather(
+                *(flights.do(key, lambda key=key: compute(key)) for key in ["a", "a", "a", "b"])
+            )
+
+        assert asyncio.run(run()) == ["result a", "result a", "result a", "result b"]
+        assert calls == ["a", "b"]
+        assert counters() == {"leader": 2, "coalesced": 2}
+        assert flights.in_flight() == 0
+
+    def test_errors_reach_every_caller(self):
+        flights = SingleFlight("test")
+
+        async def compute():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def run():
+            return await asyncio.gather(
+                flights.do("a", compute), flights.do("a", compute), return_exceptions=True
+            )
+
+        assert [type(result) for result in asyncio.run(run())] == [ValueError, ValueError]
+        assert flights.in_flight() == 0
+
+    def test_cancelled_caller_leaves_computation_running(self):
+        flights = SingleFlight("test")
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def run():
+            leader = asyncio.ensure_future(flights.do("a", compute))
+            follower = asyncio.ensure_future(flights.do("a", compute))
+            await asyncio.sleep(0.01)
+            follower.cancel()
+            return await leader, follower
+
+        result, follower = asyncio.run(run())
+        assert result == "done" and follower.cancelled()
+
+
+class TestTaskListCoalescing:
+    """Concurrent GET /api/tasks calls share one computation per user and version."""
+
+    @pytest.fixture
+    def slow_list(self, monkeypatch):
+        calls = []
+        compute = tasks_api.task_list_json
+
+        def slow(db, user_id, fields, model=None):
+            calls.append(user_id)
+            time.sleep(0.2)
+            return compute(db, user_id, fields, model)
+
+        monkeypatch.setattr(tasks_api, "task_list_json", slow)
+        return calls
+
+    def test_duplicate_requests_coalesced(self, client, slow_list):
+        client.post("/api/tasks", json={"title": "First"})
+        metrics.reset()
+
+        with ThreadPoolExecutor(4) as pool:
+            responses = list(pool.map(lambda _: client.get("/api/tasks"), range(4)))
+
+        assert slow_list == [1]
+        assert all(response.status_code == 200 for response in responses)
+        assert len({response.content for response in responses}) == 1
+        assert responses[0].json()[0]["title"] == "First"
+        assert counters() == {"leader": 1, "coalesced": 3}
+
+    def test_not_shared_between_users(self, client, slow_list):
+        def user_from_header(x_user: int = Header()):
+            return User(id=x_user, email=f"user{x_user}@example.com", is_active=True)
+
+        app.dependency_overrides[get_current_user] = user_from_header
+        with ThreadPoolExecutor(2) as pool:
+            list(pool.map(lambda user: client.get("/api/tasks", headers={"X-User": str(user)}), [1, 2]))
+
+        assert sorted(slow_list) == [1, 2]
+
+    def test_writes_change_the_version(self, client):
+        before = task_cache.version(1)
+        client.post("/api/tasks", json={"title": "First"})
+        assert task_cache.version(1) != before
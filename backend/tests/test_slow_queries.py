@@ -0,0 +1,84 @@
+from sqlalchemy import text
+
+from app.api import admin
+from app.main import app
+from app.services import auth as auth_service
+from app.services import slow_queries
+from app.services.auth import get_current_user
+from app.services.slow_queries import SlowQueryLog, parameter_shape
+from app.services.timing import current_timings
+from tests.conftest import engine, override_get_current_user
+
+
+def log_everything(monkeypatch, explain_rate=1.0):
+    log = SlowQueryLog(threshold_ms=0.0, size=50, explain_rate=explain_rate)
+    monkeypatch.setattr(slow_queries, "slow_query_log", log)
+    monkeypatch.setattr(admin, "slow_query_log", log)
+    return log
+
+
+def authenticated():
+    # As get_current_user does, which the tests override
+    current_timings().user_id = 1
+    return override_get_current_user()
+
+
+class TestSlowQueryLog:
+    """Tests for recording slow statements and their plans."""
+
+    def test_parameter_shape(self):
+        assert parameter_shape({"id": 3, "title": "x", "deadline": None}, False) == {
+            "id": "int",
+            "title": "str",
+            "deadline": "NoneType",
+        }
+        assert parameter_shape((1, 2.0), False) == ["int", "float"]
+        assert parameter_shape([(1,), (2,)], True) == {"rows": 2, "each": ["int"]}
+
+    def test_records_route_user_and_plan(self, client, monkeypatch):
+        client.post("/api/tasks", json={"title": "Secret title"})
+        log = log_everything(monkeypatch)
+        app.dependency_overrides[get_current_user] = authenticated
+
+        client.get("/api/tasks/search", params={"q": "secret"})
+        log.join()
+
+        (search,) = log.entries()
+        assert (search["route"], search["user_id"]) == ("GET /api/tasks/search", 1)
+        assert "str" in search["parameters"]
+        assert "secret" not in repr(search)
+        assert "SEARCH tasks" in search["plan"]
+
+    def test_threshold_and_sampling(self, db, monkeypatch):
+        log = log_everything(monkeypatch, explain_rate=0.0)
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        assert [entry["route"] for entry in log.entries()] == [None]
+        assert log.entries()[0]["plan"] is None
+
+        log.clear()
+        log.threshold_ms = 60_000
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        assert log.entries() == []
+
+    def test_bounded(self, db, monkeypatch):
+        log = log_everything(monkeypatch, explain_rate=0.0)
+        log._entries = type(log._entries)(maxlen=3)
+        with engine.connect() as connection:
+            for n in range(5):
+                connection.execute(text(f"SELECT {n}"))
+        assert [entry["statement"] for entry in log.entries()] == ["SELECT 4", "SELECT 3", "SELECT 2"]
+
+    def test_admin_endpoint(self, client, monkeypatch):
+        assert client.get("/api/admin/slow-queries").status_code == 403
+        monkeypatch.setattr(auth_service.settings, "admin_emails", ["test@example.com"])
+        log_everything(monkeypatch, explain_rate=0.0)
+
+        client.get("/api/tasks")
+        response = client.get("/api/admin/slow-queries?limit=1")
+        assert response.status_code == 200
+        assert [entry["route"] for entry in response.json()] == ["GET /api/tasks"]
+
+        monkeypatch.setattr(admin.slow_query_log, "threshold_ms", None)
+        assert client.get("/api/admin/slow-queries").status_code == 409
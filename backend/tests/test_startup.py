@@ -0,0 +1,70 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from app.cli.importtime import parse_importtime
+from app.services.auth import get_password_hash, verify_password
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Upper bound for `import app.main` in a fresh interpreter (about 1s today)
+IMPORT_TIME_BUDGET_SECONDS = 3.0
+
+LAZY_MODULES = ("google.oauth2", "google.auth.transport.requests", "passlib.context")
+
+
+def run_python(code: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+class TestColdStart:
+    """Tests for API startup cost."""
+
+    def test_import_time_under_budget(self):
+        elapsed = float(
+            run_python(
+                "import time; start = time.perf_counter(); import app.main; "
+                "print(time.perf_counter() - start)"
+            )
+        )
+        assert elapsed < IMPORT_TIME_BUDGET_SECONDS
+
+    def test_rarely_used_dependencies_not_imported(self):
+        loaded = run_python(
+            f"import sys, app.main; print([m for m in {LAZY_MODULES!r} if m in sys.modules])"
+        )
+        assert loaded == "[]"
+
+    def test_single_settings_instance(self):
+        from app import config
+        from app.services import auth
+
+        assert auth.settings is config.settings
+
+    def test_lazy_password_context(self):
+        hashed = get_password_hash("secret")
+        assert verify_password("secret", hashed)
+        assert not verify_password("wrong", hashed)
+
+
+class TestImportTimeReport:
+    """Tests for the import-time profiling command."""
+
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 |   app.config\n"
+            "import time:        50 |        150 | app\n"
+        )
+        records = parse_importtime(output)
+        assert [(r.module, r.self_us, r.cumulative_us, r.depth) for r in records] == [
+            ("app.config", 100, 100, 1),
+            ("app", 50, 150, 0),
+        ]
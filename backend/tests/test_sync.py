@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+from app.models.task import Task
+from app.services.archive import archive_completed_tasks
+from app.services.sync import compact_tombstones
+from tests.conftest import engine
+
+
+@pytest.fixture
+def executed():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def create(client, title, **fields):
+    return client.post("/api/tasks", json={"title": title} | fields).json()
+
+
+def changes(client, since=None, limit=None):
+    params = ({"since": since} if since else {}) | ({"limit": limit} if limit else {})
+    response = client.get("/api/tasks/changes", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+class TestChanges:
+    """Tests for GET /api/tasks/changes."""
+
+    def test_only_changes_since_cursor(self, client):
+        first, second, third = (create(client, f"Task {i}") for i in range(3))
+        full = changes(client)
+        assert [task["id"] for task in full["tasks"]] == [first["id"], second["id"], third["id"]]
+        assert full["has_more"] is False
+
+        assert changes(client, full["next_cursor"])["tasks"] == []
+
+        client.put(f"/api/tasks/{second['id']}", json={"title": "Renamed"})
+        client.post(f"/api/tasks/{third['id']}/complete")
+        fourth = create(client, "Task 3")
+        delta = changes(client, full["next_cursor"])
+
+        assert [task["id"] for task in delta["tasks"]] == [second["id"], third["id"], fourth["id"]]
+        assert delta["tasks"][0]["title"] == "Renamed"
+        assert delta["tasks"][1]["completed_at"] is not None
+        assert changes(client, delta["next_cursor"])["tasks"] == []
+
+    def test_deletions_and_logs(self, client, db):
+        ending = create(client, "Ending")
+        endless = create(client, "Endless", task_type="endless")
+        cursor = changes(client)["next_cursor"]
+
+        client.post(f"/api/tasks/{endless['id']}/complete", json={"duration_minutes": 30})
+        client.delete(f"/api/tasks/{ending['id']}")
+        delta = changes(client, cursor)
+
+        assert [task["id"] for task in delta["tasks"]] == [endless["id"]]
+        assert [(log["task_id"], log["duration_minutes"]) for log in delta["logs"]] == [
+            (endless["id"], 30)
+        ]
+        assert delta["deleted"] == [ending["id"]]
+
+    def test_archived_tasks_sync_and_delete(self, client, db):
+        task = create(client, "Archived")
+        client.post(f"/api/tasks/{task['id']}/complete")
+        cursor = changes(client)["next_cursor"]
+        archive_completed_tasks(db, timedelta(0), 100, now=datetime.now(timezone.utc) + timedelta(days=1))
+        assert db.get(Task, task["id"]) is None
+
+        assert [t["id"] for t in changes(client)["tasks"]] == [task["id"]]
+        client.delete(f"/api/tasks/{task['id']}")
+        assert changes(client, cursor)["deleted"] == [task["id"]]
+
+    def test_pages_cover_every_change_once(self, client):
+        tasks = [create(client, f"Task {i}", task_type="endless") for i in range(5)]
+        for task in tasks[:3]:
+            client.post(f"/api/tasks/{task['id']}/complete", json={"duration_minutes": 10})
+        client.delete(f"/api/tasks/{tasks[4]['id']}")
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = changes(client, cursor, limit=2)
+            seen += [("task", t["id"]) for t in page["tasks"]]
+            seen += [("log", log["id"]) for log in page["logs"]]
+            seen += [("deleted", id) for id in page["deleted"]]
+            cursor, pages = page["next_cursor"], pages + 1
+            if not page["has_more"]:
+                break
+
+        assert len(seen) == len(set(seen)) == 4 + 3 + 1
+        assert pages == 4
+
+    def test_invalid_cursor(self, client):
+        assert client.get("/api/tasks/changes?since=%%%").status_code == 400
+
+    def test_expired_cursor_after_compaction(self, client, db):
+        task = create(client, "Deleted")
+        old_cursor = changes(client)["next_cursor"]
+        client.delete(f"/api/tasks/{task['id']}")
+        current_cursor = changes(client)["next_cursor"]
+
+        later = datetime.now(timezone.utc) + timedelta(days=31)
+        assert compact_tombstones(db, timedelta(days=30), 100, now=later) == 1
+
+        assert client.get("/api/tasks/changes", params={"since": old_cursor}).status_code == 410
+        assert changes(client, current_cursor)["deleted"] == []
+        assert changes(client)["tasks"] == []
+
+    def test_work_scales_with_changes(self, client, db, executed):
+        db.add_all(Task(title=f"Old {i}", user_id=1) for i in range(300))
+        db.commit()
+        page = {"has_more": True, "next_cursor": None}
+        while page["has_more"]:
+            page = changes(client, page["next_cursor"], limit=200)
+        cursor = page["next_cursor"]
+        task = create(client, "New")
+
+        executed.clear()
+        delta = changes(client, cursor)
+        assert [t["id"] for t in delta["tasks"]] == [task["id"]]
+
+        streams = [statement for statement in executed if "change_seq >" in statement[0]]
+        assert len(streams) == 4
+        with engine.connect() as conn:
+            for statement, parameters in streams:
+                plan = " ".join(
+                    row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                )
+                assert "_user_change" in plan
+                assert "TEMP B-TREE" not in plan
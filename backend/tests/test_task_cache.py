@@ -0,0 +1,175 @@
+from datetime import datetime, timezone
+
+from app.models.task import Task
+from app.services.metrics import metrics
+from app.services.priority import update_task_impact
+from app.services.task_cache import CachedTask, TaskCache, TaskSnapshot
+
+NOW = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def make_task(id, **fields):
+    values = {
+        "title": f"Task {id}",
+        "description": None,
+        "task_type": "ending",
+        "impact": 5.0,
+        "effort": 1.0,
+        "not_doing_hourly_rate": 0.1,
+        "doing_hourly_rate": None,
+        "impact_set_to": None,
+        "deadline": None,
+        "created_at": datetime(2026, 2, 1),
+        "last_updated": datetime(2026, 3, 1, 9),
+        "completed_at": None,
+        "version": 1,
+    }
+    values.update(fields)
+    return Task(id=id, **values)
+
+
+def counters():
+    return {
+        (c["name"], c["labels"].get("result")): c["value"] for c in metrics.snapshot()["counters"]
+    }
+
+
+class TestTaskSnapshot:
+    """Tests for scoring and updating column snapshots."""
+
+    def test_scores_match_priority_service(self):
+        tasks = [
+            make_task(1, not_doing_hourly_rate=0.5),
+            make_task(2, impact=9.5, effort=0.05),
+            make_task(3, effort=2.0, deadline=datetime(2026, 3, 3, 12)),
+            make_task(4, deadline=datetime(2026, 2, 28)),
+            make_task(5, impact=9.9, not_doing_hourly_rate=1.0, doing_hourly_rate=0.5, task_type="endless"),
+        ]
+        snapshot = TaskSnapshot.from_tasks(tasks, 0.0)
+        impacts, priorities = snapshot.scores(NOW)
+        responses = snapshot.responses(NOW, impacts, priorities)
+
+        for i, task in enumerate(tasks):
+            expected_priority = update_task_impact(task, NOW)
+            assert abs(priorities[i] - expected_priority) < 1e-9
+            assert abs(impacts[i] - task.impact) < 1e-9
+
+        by_id = {response["id"]: response for response in responses}
+        assert [r["priority_score"] for r in responses] == sorted(priorities.tolist(), reverse=True)
+        assert by_id[3]["deadline"] == datetime(2026, 3, 3, 12)
+        assert by_id[5]["task_type"] == "endless" and by_id[5]["doing_hourly_rate"] == 0.5
+        assert by_id[1]["doing_hourly_rate"] is None and by_id[1]["created_at"] == datetime(2026, 2, 1)
+
+    def test_with_task_replaces_adds_and_keeps_newer(self):
+        snapshot = TaskSnapshot.from_tasks([make_task(1), make_task(2)], 0.0)
+
+        renamed = snapshot.with_task(CachedTask(make_task(2, title="Renamed", version=2)))
+        assert renamed.titles == ("Task 1", "Renamed")
+        added = renamed.with_task(CachedTask(make_task(3)))
+        assert added.values[:, 0].tolist() == [1, 2, 3]
+        assert added.with_task(CachedTask(make_task(2, title="Stale", version=1))) is None
+
+    def test_empty_snapshot(self):
+        snapshot = TaskSnapshot.from_tasks([], 0.0)
+        assert snapshot.responses(NOW, *snapshot.scores(NOW)) == []
+        assert snapshot.with_task(CachedTask(make_task(1))).titles == ("Task 1",)
+
+
+class TestTaskCache:
+    """Tests for the per-user snapshot LRU."""
+
+    def load(self, cache, user_id, tasks):
+        return cache.finish_load(user_id, cache.begin_load(user_id), tasks)
+
+    def test_hits_misses_and_write_through(self):
+        cache = TaskCache(max_users=10, max_bytes=10**6, ttl_seconds=60)
+        metrics.reset()
+        assert cache.get(1) is None
+        self.load(cache, 1, [make_task(1)])
+        cache.put(1, CachedTask(make_task(1, title="Renamed", version=2)))
+
+        assert cache.get(1).titles == ("Renamed",)
+        assert counters()[("task_cache", "hit")] == 1
+        assert counters()[("task_cache", "miss")] == 1
+
+        cache.put(1, CachedTask(make_task(1, version=3, completed_at=datetime(2026, 3, 1))))
+        assert cache.get(1) is None
+        assert counters()[("task_cache_invalidations", None)] == 1
+
+    def test_load_overlapping_a_write_is_not_stored(self):
+        cache = TaskCache(max_users=10, max_bytes=10**6, ttl_seconds=60)
+        token = cache.begin_load(1)
+        cache.put(1, CachedTask(make_task(2)))
+        snapshot = cache.finish_load(1, token, [make_task(1)])
+
+        assert snapshot.titles == ("Task 1",)
+        assert cache.get(1) is None
+
+    def test_evicts_least_recently_used_by_count_and_bytes(self):
+        cache = TaskCache(max_users=2, max_bytes=10**6, ttl_seconds=60)
+        metrics.reset()
+        for user_id in (1, 2):
+            self.load(cache, user_id, [make_task(user_id)])
+        cache.get(1)
+        self.load(cache, 3, [make_task(3)])
+        assert cache.get(2) is None and cache.get(1) is not None
+        assert counters()[("task_cache_evictions", None)] == 1
+
+        one_user = cache.stats()["bytes"] // 2
+        cache = TaskCache(max_users=100, max_bytes=one_user * 3, ttl_seconds=60)
+        for user_id in range(5):
+            self.load(cache, user_id, [make_task(user_id)])
+        assert cache.stats()["users"] == 3
+        assert cache.stats()["bytes"] <= one_user * 3
+
+    def test_expired_snapshot_reloaded(self):
+        cache = TaskCache(max_users=10, max_bytes=10**6, ttl_seconds=0)
+        self.load(cache, 1, [make_task(1)])
+        assert cache.get(1) is None
+        assert cache.stats() == {"users": 0, "bytes": 0}
+
+    def test_snapshot_size_per_task(self):
+        tasks = [make_task(i, title=f"Write the quarterly report {i}") for i in range(10)]
+        size = TaskSnapshot.from_tasks(tasks, 0.0).size
+        # 100k users with 10 such tasks each fit in the default 256 MiB
+        assert size * 100_000 < 256 * 1024 * 1024
+
+
+class TestListEndpointCache:
+    """GET /api/tasks is served from the snapshot and kept current by writes."""
+
+    def test_writes_reach_cached_list(self, client):
+        first = client.post("/api/tasks", json={"title": "First"}).json()
+        endless = client.post("/api/tasks", json={"title": "Endless", "task_type": "endless"}).json()
+        client.get("/api/tasks")
+        metrics.reset()
+
+        client.post("/api/tasks", json={"title": "Second"})
+        client.put(f"/api/tasks/{first['id']}", json={"title": "Renamed"})
+        client.post(f"/api/tasks/{endless['id']}/complete", json={"duration_minutes": 30})
+        tasks = {task["title"]: task for task in client.get("/api/tasks").json()}
+
+        assert set(tasks) == {"Renamed", "Endless", "Second"}
+        assert tasks["Renamed"]["version"] == 2
+        assert tasks["Endless"]["version"] == 2
+        assert counters()[("task_cache", "hit")] == 1
+
+        client.post(f"/api/tasks/{first['id']}/complete")
+        client.delete(f"/api/tasks/{endless['id']}")
+        assert [task["title"] for task in client.get("/api/tasks").json()] == ["Second"]
+
+    def test_cold_and_warm_lists_agree(self, client, db):
+        client.post("/api/tasks", json={"title": "Due", "deadline": "2030-01-01T00:00:00"})
+        client.post("/api/tasks", json={"title": "Endless", "task_type": "endless", "impact_set_to": 2.0})
+        cold = client.get("/api/tasks").json()
+        warm = client.get("/api/tasks").json()
+
+        for before, after in zip(cold, warm):
+            assert before.keys() == after.keys()
+            for key in ("id", "title", "task_type", "deadline", "created_at", "version", "impact_set_to"):
+                assert before[key] == after[key]
+            assert abs(before["priority_score"] - after["priority_score"]) < 1e-3
+
+        # Listing scores in memory and writes nothing back
+        db.expire_all()
+        assert {task.version for task in db.query(Task)} == {1}
@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+
+from app.models.task import Task, TaskLog, TaskType
+from app.services import task_writes
+from app.services.priority import apply_activity_to_impact
+from tests.conftest import engine
+
+# (impact, not_doing_hourly_rate, doing_hourly_rate, impact_set_to, hours_idle, duration_minutes)
+ACTIVITY_CASES = [
+    (5.0, 0.1, 1.0, None, 0.0, 30),
+    (5.0, 0.5, 1.0, None, 3.0, 60),
+    (9.0, 1.0, 0.1, None, 5.0, 10),  # grows past 10 before logging
+    (1.0, 0.0, 2.0, None, 1.0, 120),  # drops below 0
+    (7.0, 0.2, None, 3.0, 2.0, 45),
+    (4.0, 0.3, None, None, 4.0, 15),
+]
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def endless_task(impact, not_doing, doing, set_to, hours_idle, now):
+    return Task(
+        title="Endless",
+        task_type=TaskType.ENDLESS,
+        impact=impact,
+        not_doing_hourly_rate=not_doing,
+        doing_hourly_rate=doing,
+        impact_set_to=set_to,
+        last_updated=now - timedelta(hours=hours_idle),
+        user_id=1,
+    )
+
+
+def make_endless_task(db, *args):
+    task = endless_task(*args)
+    db.add(task)
+    db.commit()
+    return task
+
+
+class TestSqlActivityParity:
+    """The SQL write path must compute the same impact as the Python service."""
+
+    @pytest.mark.parametrize("case", ACTIVITY_CASES)
+    def test_log_matches_python_service(self, db, case):
+        impact, not_doing, doing, set_to, hours_idle, minutes = case
+        now = datetime.now(timezone.utc)
+        task = make_endless_task(db, impact, not_doing, doing, set_to, hours_idle, now)
+
+        expected = endless_task(impact, not_doing, doing, set_to, hours_idle, now)
+        apply_activity_to_impact(expected, minutes, now)
+
+        updated = task_writes.complete_task(db, task.id, 1, now, minutes)
+        db.commit()
+
+        assert updated.impact == pytest.approx(expected.impact, abs=1e-6)
+        assert updated.version == 2
+        assert db.query(TaskLog).filter(TaskLog.task_id == task.id).count() == 1
+
+    def test_log_on_stale_capped_task(self, client, db):
+        now = datetime.now(timezone.utc)
+        task = make_endless_task(db, 5.0, 1.0, 1.0, None, 20.0, now)
+        listed = {t["id"]: t["impact"] for t in client.get("/api/tasks").json()}
+        assert listed[task.id] == 10.0
+
+        # Two hours of activity come off the capped 10, not the uncapped 25
+        response = client.post(f"/api/tasks/{task.id}/complete", json={"duration_minutes": 120})
+        assert response.json()["impact"] == pytest.approx(8.0, abs=0.01)
+
+        expected = endless_task(5.0, 1.0, 1.0, None, 20.0, now)
+        apply_activity_to_impact(expected, 120, now)
+        assert expected.impact == pytest.approx(8.0)
+
+    def test_complete_ending_task(self, db):
+        now = datetime.now(timezone.utc)
+        task = Task(title="Ending", impact=6.0, user_id=1)
+        db.add(task)
+        db.commit()
+
+        updated = task_writes.complete_task(db, task.id, 1, now)
+        db.commit()
+
+        assert updated.completed_at is not None
+        assert updated.impact == 6.0
+        assert db.query(TaskLog).count() == 0
+
+    def test_endless_task_needs_duration(self, db):
+        now = datetime.now(timezone.utc)
+        task = make_endless_task(db, 5.0, 0.1, 1.0, None, 0.0, now)
+        assert task_writes.complete_task(db, task.id, 1, now) is None
+
+    def test_other_users_task_not_matched(self, db):
+        now = datetime.now(timezone.utc)
+        task = make_endless_task(db, 5.0, 0.1, 1.0, None, 0.0, now)
+        assert task_writes.complete_task(db, task.id, 2, now, 30) is None
+
+
+class TestUpdateKeepsGrowth:
+    """A PUT stores the impact grown since the last write along with the new last_updated."""
+
+    def stale_task(self, db):
+        task = Task(
+            title="Stale",
+            impact=2.0,
+            not_doing_hourly_rate=1.0,
+            last_updated=datetime.now(timezone.utc) - timedelta(hours=5),
+            user_id=1,
+        )
+        db.add(task)
+        db.commit()
+        return task
+
+    def test_put_without_impact(self, client, db):
+        task = self.stale_task(db)
+        listed = {t["id"]: t["impact"] for t in client.get("/api/tasks").json()}
+        assert listed[task.id] == pytest.approx(7.0, abs=0.01)
+
+        response = client.put(f"/api/tasks/{task.id}", json={"title": "renamed"})
+        assert response.json()["impact"] == pytest.approx(7.0, abs=0.01)
+        db.expire_all()
+        assert db.get(Task, task.id).impact == pytest.approx(7.0, abs=0.01)
+
+    def test_put_with_impact(self, client, db):
+        task = self.stale_task(db)
+        response = client.put(f"/api/tasks/{task.id}", json={"impact": 3.0})
+        assert response.json()["impact"] == 3.0
+
+
+class TestRoundTrips:
+    """
+    Write endpoints must not re-read the row they just wrote. Each write first takes
+    the user's next change sequence number (an UPDATE of users).
+    """
+
+    def test_create_returns_inserted_row(self, client, statements):
+        client.post("/api/tasks", json={"title": "New"})
+        assert [s.split()[0] for s in statements] == ["UPDATE", "INSERT"]
+        assert "RETURNING" in statements[1]
+
+    def test_update_returns_updated_row(self, client, statements):
+        task = client.post("/api/tasks", json={"title": "New"}).json()
+        statements.clear()
+        client.put(f"/api/tasks/{task['id']}", json={"title": "Renamed"})
+        assert [s.split()[0] for s in statements] == ["UPDATE", "UPDATE"]
+
+    def test_log_time_without_select(self, client, statements):
+        task = client.post("/api/tasks", json={"title": "New", "task_type": "endless"}).json()
+        statements.clear()
+        client.post(f"/api/tasks/{task['id']}/complete", json={"duration_minutes": 30})
+        assert [s.split()[0] for s in statements] == ["UPDATE", "UPDATE", "INSERT"]
+
+    def test_postgres_log_time_is_single_cte(self):
+        now = datetime.now(timezone.utc)
+        query = task_writes.completion_with_log_query(
+            [Task.id == 1, Task.user_id == 1],
+            task_writes.completion_values(30, now),
+            30,
+            now,
+        )
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        assert sql.startswith("WITH updated AS")
+        assert "UPDATE tasks SET" in sql
+        assert "INSERT INTO task_logs" in sql
+        assert "EXTRACT(EPOCH FROM" in sql
+        assert "GREATEST(0.0, LEAST(10.0," in sql
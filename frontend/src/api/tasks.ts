@@ -1,4 +1,4 @@
-import type { Task, TaskCreate, TaskUpdate, TaskWithLogs, TaskLog, TaskLogCreate } from '../types/task';
+import type { Task, TaskCreate, TaskUpdate, TaskWithLogs, TaskLogCreate, TaskLogPage, TaskPage } from '../types/task';
 
 const API_BASE = (import.meta.env.VITE_API_URL || '') + '/api/tasks';
 
@@ -30,11 +30,12 @@ export async function getTasks(): Promise<Task[]> {
   return handleResponse<Task[]>(response);
 }
 
-export async function getCompletedTasks(): Promise<Task[]> {
-  const response = await fetch(`${API_BASE}/completed`, {
+export async function getCompletedTasks(cursor?: string | null): Promise<TaskPage> {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+  const response = await fetch(`${API_BASE}/completed${query}`, {
     headers: getAuthHeaders(),
   });
-  return handleResponse<Task[]>(response);
+  return handleResponse<TaskPage>(response);
 }
 
 export async function getTask(id: number): Promise<TaskWithLogs> {
@@ -79,9 +80,10 @@ export async function completeTask(id: number, logData?: TaskLogCreate): Promise
   return handleResponse<Task>(response);
 }
 
-export async function getTaskLogs(id: number): Promise<TaskLog[]> {
-  const response = await fetch(`${API_BASE}/${id}/logs`, {
+export async function getTaskLogs(id: number, cursor?: string | null): Promise<TaskLogPage> {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+  const response = await fetch(`${API_BASE}/${id}/logs${query}`, {
     headers: getAuthHeaders(),
   });
-  return handleResponse<TaskLog[]>(response);
+  return handleResponse<TaskLogPage>(response);
 }
@@ -5,13 +5,15 @@ import TaskList from '../components/TaskList';
 
 export default function Completed() {
   const [tasks, setTasks] = useState<Task[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState('');
 
   const loadTasks = useCallback(async () => {
     try {
-      const data = await getCompletedTasks();
-      setTasks(data);
+      const page = await getCompletedTasks();
+      setTasks(page.items);
+      setNextCursor(page.next_cursor);
       setError('');
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load tasks');
@@ -24,6 +26,16 @@ export default function Completed() {
     loadTasks();
   }, [loadTasks]);
 
+  const handleLoadMore = async () => {
+    try {
+      const page = await getCompletedTasks(nextCursor);
+      setTasks((loaded) => [...loaded, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'Failed to load tasks');
+    }
+  };
+
   const handleDeleteTask = async (task: Task) => {
     if (!confirm(`Delete "${task.title}" permanently?`)) return;
     try {
@@ -48,7 +60,7 @@ export default function Completed() {
         <div>
           <h1 className="page-title">Completed Tasks</h1>
           <p className="page-subtitle">
-            {tasks.length} completed task{tasks.length !== 1 ? 's' : ''}
+            {tasks.length}{nextCursor ? '+' : ''} completed task{tasks.length !== 1 ? 's' : ''}
           </p>
         </div>
       </div>
@@ -64,6 +76,12 @@ export default function Completed() {
         onDelete={handleDeleteTask}
         isCompleted
       />
+
+      {nextCursor && (
+        <button className="btn btn-secondary mt-lg" onClick={handleLoadMore}>
+          Load more
+        </button>
+      )}
     </>
   );
 }
@@ -28,6 +28,16 @@ export interface TaskWithLogs extends Task {
   logs: TaskLog[];
 }
 
+export interface TaskLogPage {
+  items: TaskLog[];
+  next_cursor: string | null;
+}
+
+export interface TaskPage {
+  items: Task[];
+  next_cursor: string | null;
+}
+
 export interface TaskCreate {
   title: string;
   description?: string | null;